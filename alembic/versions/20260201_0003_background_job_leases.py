@@ -0,0 +1,28 @@
+"""background job leases for the out-of-process worker
+
+Revision ID: 20260201_0003
+Revises: 20260115_0002
+Create Date: 2026-02-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260201_0003"
+down_revision = "20260115_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("background_jobs", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("background_jobs", sa.Column("lease_owner", sa.String(length=128), nullable=True))
+    op.add_column("background_jobs", sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_background_jobs_status", "background_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_status", table_name="background_jobs")
+    op.drop_column("background_jobs", "lease_expires_at")
+    op.drop_column("background_jobs", "lease_owner")
+    op.drop_column("background_jobs", "attempts")
@@ -0,0 +1,121 @@
+"""content-addressed blob storage for source bodies
+
+Revision ID: 20260215_0004
+Revises: 20260201_0003
+Create Date: 2026-02-15 00:00:00
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260215_0004"
+down_revision = "20260201_0003"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 500
+
+sources = sa.table(
+    "sources",
+    sa.column("id", sa.Integer()),
+    sa.column("tenant_id", sa.String()),
+    sa.column("content", sa.Text()),
+    sa.column("content_sha256", sa.String()),
+    sa.column("blob_id", sa.Integer()),
+)
+content_blobs = sa.table(
+    "content_blobs",
+    sa.column("id", sa.Integer()),
+    sa.column("tenant_id", sa.String()),
+    sa.column("sha256", sa.String()),
+    sa.column("size_bytes", sa.Integer()),
+    sa.column("refcount", sa.Integer()),
+    sa.column("data", sa.LargeBinary()),
+)
+
+
+def _backfill(bind) -> None:
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(sources.c.id, sources.c.tenant_id, sources.c.content)
+            .where(sources.c.blob_id.is_(None), sources.c.id > last_id)
+            .order_by(sources.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        for source_id, tenant_id, content in rows:
+            data = (content or "").encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            blob_id = bind.execute(
+                sa.select(content_blobs.c.id).where(content_blobs.c.tenant_id == tenant_id, content_blobs.c.sha256 == digest)
+            ).scalar_one_or_none()
+            if blob_id is None:
+                blob_id = bind.execute(
+                    content_blobs.insert()
+                    .values(tenant_id=tenant_id, sha256=digest, size_bytes=len(data), refcount=1, data=data)
+                    .returning(content_blobs.c.id)
+                ).scalar_one()
+            else:
+                bind.execute(
+                    content_blobs.update()
+                    .where(content_blobs.c.id == blob_id)
+                    .values(refcount=content_blobs.c.refcount + 1)
+                )
+            bind.execute(
+                sources.update()
+                .where(sources.c.id == source_id)
+                .values(blob_id=blob_id, content_sha256=digest, content="")
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_blobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("tenant_id", sa.String(length=64), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refcount", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("tenant_id", "sha256", name="uq_content_blobs_tenant_sha256"),
+    )
+    op.create_index("ix_content_blobs_tenant_id", "content_blobs", ["tenant_id"])
+
+    with op.batch_alter_table("sources") as batch_op:
+        batch_op.add_column(sa.Column("content_sha256", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("blob_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key("fk_sources_blob_id", "content_blobs", ["blob_id"], ["id"])
+        batch_op.create_index("ix_sources_content_sha256", ["content_sha256"])
+
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        blob_text = sa.func.convert_from(content_blobs.c.data, "UTF8")
+    else:
+        blob_text = sa.cast(content_blobs.c.data, sa.Text())
+    bind.execute(
+        sources.update()
+        .where(sources.c.blob_id.is_not(None))
+        .values(
+            content=sa.select(blob_text)
+            .where(content_blobs.c.id == sources.c.blob_id)
+            .scalar_subquery()
+        )
+    )
+    with op.batch_alter_table("sources") as batch_op:
+        batch_op.drop_index("ix_sources_content_sha256")
+        batch_op.drop_constraint("fk_sources_blob_id", type_="foreignkey")
+        batch_op.drop_column("blob_id")
+        batch_op.drop_column("content_sha256")
+    op.drop_index("ix_content_blobs_tenant_id", table_name="content_blobs")
+    op.drop_table("content_blobs")
@@ -0,0 +1,25 @@
+"""composite indexes backing keyset-paginated list endpoints
+
+Revision ID: 20260301_0005
+Revises: 20260215_0004
+Create Date: 2026-03-01 00:00:00
+
+"""
+from alembic import op
+
+revision = "20260301_0005"
+down_revision = "20260215_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_sources_tenant_id_id", "sources", ["tenant_id", "id"])
+    op.create_index("ix_projects_tenant_id_id", "projects", ["tenant_id", "id"])
+    op.create_index("ix_documents_project_id_id", "documents", ["project_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_project_id_id", table_name="documents")
+    op.drop_index("ix_projects_tenant_id_id", table_name="projects")
+    op.drop_index("ix_sources_tenant_id_id", table_name="sources")
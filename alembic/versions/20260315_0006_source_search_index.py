@@ -0,0 +1,104 @@
+"""full-text search index over source names and bodies
+
+Revision ID: 20260315_0006
+Revises: 20260301_0005
+Create Date: 2026-03-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260315_0006"
+down_revision = "20260301_0005"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 500
+MAX_INDEXED_CHARS = 200000
+# Binary formats are indexed by name only; their bodies are indexed on first text extraction.
+BINARY_FILE_TYPES = {
+    "pdf",
+    "docx",
+    "xlsx",
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+sources = sa.table(
+    "sources",
+    sa.column("id", sa.Integer()),
+    sa.column("tenant_id", sa.String()),
+    sa.column("file_name", sa.String()),
+    sa.column("file_type", sa.String()),
+    sa.column("content", sa.Text()),
+    sa.column("blob_id", sa.Integer()),
+)
+content_blobs = sa.table(
+    "content_blobs",
+    sa.column("id", sa.Integer()),
+    sa.column("data", sa.LargeBinary()),
+)
+
+_INSERT = {
+    "sqlite": sa.text(
+        "INSERT INTO source_search (rowid, tenant_id, file_name, body) VALUES (:source_id, :tenant_id, :file_name, :body)"
+    ),
+    "postgresql": sa.text(
+        "INSERT INTO source_search (source_id, tenant_id, file_name, body, document) "
+        "VALUES (:source_id, :tenant_id, :file_name, :body, "
+        "setweight(to_tsvector('simple', :file_name), 'A') || setweight(to_tsvector('simple', :body), 'B'))"
+    ),
+}
+
+
+def _backfill(bind) -> None:
+    insert = _INSERT[bind.dialect.name]
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(sources.c.id, sources.c.tenant_id, sources.c.file_name, sources.c.file_type, sources.c.content, content_blobs.c.data)
+            .select_from(sources.outerjoin(content_blobs, content_blobs.c.id == sources.c.blob_id))
+            .where(sources.c.id > last_id)
+            .order_by(sources.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        params = []
+        for source_id, tenant_id, file_name, file_type, content, data in rows:
+            if (file_type or "").strip().lower() in BINARY_FILE_TYPES:
+                body = ""
+            elif data is not None:
+                body = bytes(data).decode("utf-8", errors="replace")
+            else:
+                body = content or ""
+            params.append({"source_id": source_id, "tenant_id": tenant_id, "file_name": file_name, "body": body[:MAX_INDEXED_CHARS]})
+        bind.execute(insert, params)
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE source_search USING fts5("
+            "tenant_id UNINDEXED, file_name, body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    elif bind.dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE source_search ("
+            "source_id INTEGER PRIMARY KEY REFERENCES sources (id) ON DELETE CASCADE, "
+            "tenant_id VARCHAR(64) NOT NULL, file_name VARCHAR(255) NOT NULL, body TEXT NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX ix_source_search_tenant_id ON source_search (tenant_id)")
+        op.execute("CREATE INDEX ix_source_search_document ON source_search USING GIN (document)")
+    else:
+        return
+    _backfill(bind)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS source_search")
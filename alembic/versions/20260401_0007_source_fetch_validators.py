@@ -0,0 +1,29 @@
+"""HTTP validators for conditional re-fetch of URL sources
+
+Revision ID: 20260401_0007
+Revises: 20260315_0006
+Create Date: 2026-04-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260401_0007"
+down_revision = "20260315_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sources", sa.Column("fetch_etag", sa.String(length=512), nullable=True))
+    op.add_column("sources", sa.Column("fetch_last_modified", sa.String(length=64), nullable=True))
+    # Left NULL for existing URL sources, which makes them due on the first scheduled refresh.
+    op.add_column("sources", sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_sources_tenant_id_fetched_at", "sources", ["tenant_id", "fetched_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sources_tenant_id_fetched_at", table_name="sources")
+    op.drop_column("sources", "fetched_at")
+    op.drop_column("sources", "fetch_last_modified")
+    op.drop_column("sources", "fetch_etag")
@@ -0,0 +1,74 @@
+"""compress stored blob bodies behind a codec marker
+
+Revision ID: 20260415_0008
+Revises: 20260401_0007
+Create Date: 2026-04-15 00:00:00
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260415_0008"
+down_revision = "20260401_0007"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 500
+# Frozen copies of the runtime defaults (CONTENT_COMPRESSION_MIN_BYTES, ZlibCodec level) at the time of this revision.
+COMPRESS_MIN_BYTES = 1024
+ZLIB_LEVEL = 6
+
+content_blobs = sa.table(
+    "content_blobs",
+    sa.column("id", sa.Integer()),
+    sa.column("size_bytes", sa.Integer()),
+    sa.column("codec", sa.String()),
+    sa.column("data", sa.LargeBinary()),
+)
+
+
+def _rewrite(bind, *, codec: str, convert) -> None:
+    # Keyset over ids with one transaction-sized chunk at a time, so big tables never load at once.
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(content_blobs.c.id, content_blobs.c.data)
+            .where(content_blobs.c.codec == codec, content_blobs.c.id > last_id)
+            .order_by(content_blobs.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        for blob_id, data in rows:
+            converted = convert(bytes(data))
+            if converted is not None:
+                bind.execute(
+                    content_blobs.update()
+                    .where(content_blobs.c.id == blob_id)
+                    .values(codec=converted[0], data=converted[1])
+                )
+        last_id = rows[-1][0]
+
+
+def _compress(data: bytes) -> tuple[str, bytes] | None:
+    if len(data) < COMPRESS_MIN_BYTES:
+        return None
+    compressed = zlib.compress(data, ZLIB_LEVEL)
+    if len(compressed) >= len(data):
+        return None
+    return "zlib", compressed
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content_blobs",
+        sa.Column("codec", sa.String(length=16), nullable=False, server_default="identity"),
+    )
+    _rewrite(op.get_bind(), codec="identity", convert=_compress)
+
+
+def downgrade() -> None:
+    _rewrite(op.get_bind(), codec="zlib", convert=lambda data: ("identity", zlib.decompress(data)))
+    op.drop_column("content_blobs", "codec")
@@ -0,0 +1,30 @@
+"""per-tenant redaction policies
+
+Revision ID: 20260501_0009
+Revises: 20260415_0008
+Create Date: 2026-05-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260501_0009"
+down_revision = "20260415_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "redaction_policies",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("tenant_id", sa.String(length=64), nullable=False),
+        sa.Column("rules_json", sa.Text(), nullable=False, server_default="{}"),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("tenant_id", name="uq_redaction_policies_tenant_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("redaction_policies")
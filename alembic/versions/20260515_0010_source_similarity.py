@@ -0,0 +1,39 @@
+"""minhash signatures and lsh bands for near-duplicate lookup
+
+Revision ID: 20260515_0010
+Revises: 20260501_0009
+Create Date: 2026-05-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260515_0010"
+down_revision = "20260501_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing sources get their rows the next time they are indexed (upload, refresh or reindex);
+    # run `python -m backend.reindex signatures` after upgrading to backfill them in chunks.
+    op.create_table(
+        "source_signatures",
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("sources.id"), primary_key=True),
+        sa.Column("tenant_id", sa.String(length=64), nullable=False),
+        sa.Column("signature", sa.LargeBinary(), nullable=False),
+    )
+    op.create_table(
+        "source_lsh_bands",
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("sources.id"), primary_key=True),
+        sa.Column("band", sa.Integer(), primary_key=True),
+        sa.Column("tenant_id", sa.String(length=64), nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_source_lsh_bands_tenant_id_bucket", "source_lsh_bands", ["tenant_id", "bucket"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_source_lsh_bands_tenant_id_bucket", table_name="source_lsh_bands")
+    op.drop_table("source_lsh_bands")
+    op.drop_table("source_signatures")
@@ -0,0 +1,36 @@
+"""source passages for per-project bm25 retrieval
+
+Revision ID: 20260601_0011
+Revises: 20260515_0010
+Create Date: 2026-06-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260601_0011"
+down_revision = "20260515_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing sources get their passages the next time they are indexed (refresh or text extraction);
+    # run `python -m backend.reindex passages` after upgrading to backfill them in chunks.
+    op.create_table(
+        "source_passages",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("sources.id"), nullable=False),
+        sa.Column("tenant_id", sa.String(length=64), nullable=False),
+        sa.Column("ordinal", sa.Integer(), nullable=False),
+        sa.Column("start_char", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("terms", sa.LargeBinary(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+    )
+    op.create_index("ix_source_passages_source_id", "source_passages", ["source_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_source_passages_source_id", table_name="source_passages")
+    op.drop_table("source_passages")
@@ -0,0 +1,31 @@
+"""batch item fingerprints for incremental project batches
+
+Revision ID: 20260615_0012
+Revises: 20260601_0011
+Create Date: 2026-06-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260615_0012"
+down_revision = "20260601_0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing items have no fingerprint, so the first incremental run of a project recomputes everything.
+    op.add_column("batch_items", sa.Column("content_sha256", sa.String(length=64), nullable=True))
+    op.add_column("batch_items", sa.Column("extractor_version", sa.String(length=64), nullable=True))
+    op.add_column("batch_items", sa.Column("error", sa.String(length=64), nullable=True))
+    op.add_column("batch_items", sa.Column("redactions", sa.Integer(), nullable=True))
+    op.create_index("ix_batch_items_document_id_id", "batch_items", ["document_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_batch_items_document_id_id", table_name="batch_items")
+    op.drop_column("batch_items", "redactions")
+    op.drop_column("batch_items", "error")
+    op.drop_column("batch_items", "extractor_version")
+    op.drop_column("batch_items", "content_sha256")
@@ -0,0 +1,42 @@
+"""batch run state, progress counters and resume checkpoint
+
+Revision ID: 20260701_0013
+Revises: 20260615_0012
+Create Date: 2026-07-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260701_0013"
+down_revision = "20260615_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing runs keep status "completed"; their counters stay 0 since they predate progress tracking.
+    op.add_column("batch_runs", sa.Column("summary_chars", sa.Integer(), nullable=True))
+    op.add_column("batch_runs", sa.Column("incremental", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("batch_runs", sa.Column("total_items", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("batch_runs", sa.Column("processed_items", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("batch_runs", sa.Column("reused_items", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("batch_runs", sa.Column("last_document_id", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("batch_runs", sa.Column("error", sa.String(length=64), nullable=True))
+    op.add_column("batch_runs", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+    # SQLite cannot ALTER a column default in place; batch mode recreates the table there.
+    with op.batch_alter_table("batch_runs") as batch_op:
+        batch_op.alter_column("status", server_default="pending")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("batch_runs") as batch_op:
+        batch_op.alter_column("status", server_default="completed")
+    op.drop_column("batch_runs", "updated_at")
+    op.drop_column("batch_runs", "error")
+    op.drop_column("batch_runs", "last_document_id")
+    op.drop_column("batch_runs", "reused_items")
+    op.drop_column("batch_runs", "processed_items")
+    op.drop_column("batch_runs", "total_items")
+    op.drop_column("batch_runs", "incremental")
+    op.drop_column("batch_runs", "summary_chars")
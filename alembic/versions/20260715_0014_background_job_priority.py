@@ -0,0 +1,26 @@
+"""background job priority class and per-tenant running index
+
+Revision ID: 20260715_0014
+Revises: 20260701_0013
+Create Date: 2026-07-15 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260715_0014"
+down_revision = "20260701_0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Queued jobs from before priorities become "batch" (1), except URL refreshes which are re-index work.
+    op.add_column("background_jobs", sa.Column("priority", sa.Integer(), nullable=False, server_default="1"))
+    op.execute("UPDATE background_jobs SET priority = 2 WHERE job_type = 'url_source_refresh'")
+    op.create_index("ix_background_jobs_tenant_id_status", "background_jobs", ["tenant_id", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_tenant_id_status", table_name="background_jobs")
+    op.drop_column("background_jobs", "priority")
@@ -0,0 +1,22 @@
+"""background job checkpoint for resumable url batch ingest
+
+Revision ID: 20260801_0015
+Revises: 20260715_0014
+Create Date: 2026-08-01 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20260801_0015"
+down_revision = "20260715_0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("background_jobs", sa.Column("checkpoint_json", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("background_jobs", "checkpoint_json")
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import json
+from collections.abc import AsyncIterator, Iterator
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.api.deps import get_tenant_id, require_role
-from backend.db.session import get_db_session
+from backend.db.session import AsyncSessionLocal, SessionLocal, get_db_session
 from backend.core.config import settings
 from backend.models import (
     AIAssistRequest,
@@ -10,21 +14,40 @@ from backend.models import (
     AuthRevokeRequest,
     AuthTokenRequest,
     BaseResponse,
+    DownloadFromUrlBatchRequest,
     DownloadFromUrlRequest,
     ExtractRequest,
     ProjectBatchExtractRequest,
     ProjectCreateRequest,
     ProjectDocumentCreateRequest,
+    RedactionPolicyRequest,
     UploadRequest,
     VideoToTextRequest,
 )
-from backend.services import product_service, source_service
+from backend.services import (
+    job_service,
+    passage_service,
+    product_service,
+    redaction_service,
+    search_service,
+    similarity_service,
+    source_service,
+    url_refresh_service,
+)
 from backend.services.auth_service import AuthContext
-from backend.services.response import ok
+from backend.services.errors import ServiceError
+from backend.services.job_events import TERMINAL_EVENT, JobSubscription, get_job_events
+from backend.services.logging_utils import log_event
+from backend.services.metrics_service import inc_error_code
+from backend.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.services.response import fail, ok
 from backend.services.session_service import issue_token_pair, refresh_token_pair, revoke_user_sessions
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
 
 @router.get("/health", response_model=BaseResponse)
 async def health() -> BaseResponse:
@@ -32,9 +55,9 @@ async def health() -> BaseResponse:
 
 
 @router.post("/upload", response_model=BaseResponse)
-async def upload(payload: UploadRequest, db: Session = Depends(get_db_session)) -> BaseResponse:
-    data = source_service.upload_source(
-        db,
+async def upload(payload: UploadRequest, db: AsyncSession = Depends(get_db_session)) -> BaseResponse:
+    data = await db.run_sync(
+        source_service.upload_source,
         file_name=payload.file_name,
         file_type=payload.file_type,
         content=payload.content,
@@ -42,43 +65,175 @@ async def upload(payload: UploadRequest, db: Session = Depends(get_db_session))
     return ok(data)
 
 
+@router.post("/upload/stream", response_model=BaseResponse)
+async def upload_stream(
+    request: Request,
+    file_name: str = Query(..., min_length=1),
+    file_type: str = Query(..., min_length=1),
+    db: AsyncSession = Depends(get_db_session),
+) -> BaseResponse:
+    declared_length = request.headers.get("content-length")
+    upload = await source_service.spool_upload(
+        request.stream(),
+        file_type=file_type,
+        declared_length=int(declared_length) if declared_length and declared_length.isdigit() else None,
+    )
+    try:
+        data = await db.run_sync(source_service.save_spooled_upload, file_name=file_name, upload=upload)
+    finally:
+        upload.close()
+    return ok(data)
+
+
 @router.post("/download-from-url", response_model=BaseResponse)
 async def download_from_url(
     payload: DownloadFromUrlRequest,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
 ) -> BaseResponse:
-    data = source_service.download_from_url(db, url=str(payload.url))
+    download = await source_service.fetch_url_source(str(payload.url))
+    data = await db.run_sync(source_service.save_downloaded_source, download=download)
     return ok(data)
 
 
+@router.post("/download-from-url/batch", response_model=BaseResponse)
+async def download_from_url_batch(
+    payload: DownloadFromUrlBatchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    auth: AuthContext = Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    urls = [str(url) for url in payload.urls]
+    if settings.batch_async_enabled:
+        return ok(
+            await db.run_sync(job_service.enqueue_url_batch_ingest, urls=urls, tenant_id=tenant_id, actor_id=auth.user_id)
+        )
+
+    async def _save_chunk(chunk: list[str], fetched: list) -> list[dict]:
+        return await db.run_sync(source_service.save_url_batch, urls=chunk, fetched=fetched, tenant_id=tenant_id)
+
+    return ok(await source_service.ingest_url_batch(urls, save_chunk=_save_chunk))
+
+
 @router.post("/extract", response_model=BaseResponse)
-async def extract(payload: ExtractRequest, db: Session = Depends(get_db_session)) -> BaseResponse:
-    data = source_service.extract_content(db, file_id=payload.file_id, mode=payload.mode)
+async def extract(payload: ExtractRequest, db: AsyncSession = Depends(get_db_session)) -> BaseResponse:
+    data = await db.run_sync(
+        source_service.extract_content,
+        file_id=payload.file_id,
+        mode=payload.mode,
+        summary_chars=payload.summary_chars,
+    )
     return ok(data)
 
 
 @router.get("/sources", response_model=BaseResponse)
-async def list_sources(db: Session = Depends(get_db_session)) -> BaseResponse:
-    data = source_service.list_sources(db)
+async def list_sources(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: int | None = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db_session),
+) -> BaseResponse:
+    data = await db.run_sync(source_service.list_sources, limit=limit, cursor=cursor)
     return ok(data)
 
 
+@router.post("/sources/refresh", response_model=BaseResponse)
+async def refresh_sources(
+    db: AsyncSession = Depends(get_db_session),
+    auth: AuthContext = Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    if settings.batch_async_enabled:
+        return ok(await db.run_sync(job_service.enqueue_url_source_refresh, tenant_id=tenant_id, actor_id=auth.user_id))
+
+    async def _load_chunk(after_id: int) -> list:
+        return await db.run_sync(url_refresh_service.list_refresh_targets, tenant_id=tenant_id, after_id=after_id)
+
+    async def _save_chunk(targets: list, fetched: list) -> list[dict]:
+        return await db.run_sync(url_refresh_service.apply_refreshes, targets=targets, fetched=fetched, tenant_id=tenant_id)
+
+    return ok(await url_refresh_service.refresh_url_sources(load_chunk=_load_chunk, save_chunk=_save_chunk))
+
+
+@router.get("/search", response_model=BaseResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=512),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, min_length=1),
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(await db.run_sync(search_service.search_sources, q=q, tenant_id=tenant_id, limit=limit, cursor=cursor))
+
+
 @router.get("/source/{file_id}", response_model=BaseResponse)
-async def get_source(file_id: int, db: Session = Depends(get_db_session)) -> BaseResponse:
-    data = source_service.get_source(db, file_id=file_id)
+async def get_source(file_id: int, db: AsyncSession = Depends(get_db_session)) -> BaseResponse:
+    data = await db.run_sync(source_service.get_source, file_id=file_id)
+    return ok(data)
+
+
+@router.get("/source/{file_id}/similar", response_model=BaseResponse)
+async def get_similar_sources(
+    file_id: int,
+    min_score: float | None = Query(None, ge=0, le=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db_session),
+) -> BaseResponse:
+    data = await db.run_sync(similarity_service.find_similar_sources, file_id=file_id, min_score=min_score, limit=limit)
     return ok(data)
 
 
+@router.post("/source/{file_id}/refresh", response_model=BaseResponse)
+async def refresh_source(file_id: int, db: AsyncSession = Depends(get_db_session)) -> BaseResponse:
+    target = await db.run_sync(url_refresh_service.get_refresh_target, file_id=file_id)
+    fetched = await url_refresh_service.refetch(target)
+    return ok(await db.run_sync(url_refresh_service.apply_refresh, target=target, fetched=fetched))
+
+
+def _iter_source_content(file_id: int, start: int, end: int) -> Iterator[bytes]:
+    # Runs in Starlette's threadpool; a client disconnect only stops iteration between chunks.
+    with SessionLocal() as session:
+        yield from source_service.iter_source_content(session, file_id=file_id, start=start, end=end)
+
+
+@router.get("/source/{file_id}/content")
+async def get_source_content(
+    file_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    range_header: str | None = Header(default=None, alias="range"),
+    db: AsyncSession = Depends(get_db_session),
+) -> StreamingResponse:
+    info = await db.run_sync(source_service.get_source_content_info, file_id=file_id)
+    start, end, partial = source_service.resolve_content_window(
+        info["size_bytes"],
+        range_header=range_header,
+        offset=offset,
+        limit=limit,
+    )
+    headers = {"accept-ranges": "bytes", "content-length": str(max(end - start + 1, 0))}
+    if partial:
+        headers["content-range"] = f"bytes {start}-{end}/{info['size_bytes']}"
+    elif end - start + 1 < info["size_bytes"]:
+        # An offset/limit window is a plain 200 of those bytes; this header says where they sit.
+        headers["x-content-window"] = f"bytes {start}-{end}/{info['size_bytes']}"
+    return StreamingResponse(
+        _iter_source_content(file_id, start, end),
+        status_code=206 if partial else 200,
+        media_type=info["media_type"],
+        headers=headers,
+    )
+
+
 @router.post("/projects", response_model=BaseResponse)
 async def create_project(
     payload: ProjectCreateRequest,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     auth: AuthContext = Depends(require_role("admin", "user")),
     tenant_id: str = Depends(get_tenant_id),
 ) -> BaseResponse:
     return ok(
-        product_service.create_project(
-            db,
+        await db.run_sync(
+            product_service.create_project,
             name=payload.name,
             description=payload.description,
             tenant_id=tenant_id,
@@ -89,24 +244,26 @@ async def create_project(
 
 @router.get("/projects", response_model=BaseResponse)
 async def list_projects(
-    db: Session = Depends(get_db_session),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: int | None = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db_session),
     _auth=Depends(require_role("admin", "user")),
     tenant_id: str = Depends(get_tenant_id),
 ) -> BaseResponse:
-    return ok(product_service.list_projects(db, tenant_id=tenant_id))
+    return ok(await db.run_sync(product_service.list_projects, tenant_id=tenant_id, limit=limit, cursor=cursor))
 
 
 @router.post("/projects/{project_id}/documents", response_model=BaseResponse)
 async def add_project_document(
     project_id: int,
     payload: ProjectDocumentCreateRequest,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     auth: AuthContext = Depends(require_role("admin", "user")),
     tenant_id: str = Depends(get_tenant_id),
 ) -> BaseResponse:
     return ok(
-        product_service.add_document_to_project(
-            db,
+        await db.run_sync(
+            product_service.add_document_to_project,
             project_id=project_id,
             source_id=payload.source_id,
             title=payload.title,
@@ -119,51 +276,289 @@ async def add_project_document(
 @router.get("/projects/{project_id}/documents", response_model=BaseResponse)
 async def list_project_documents(
     project_id: int,
-    db: Session = Depends(get_db_session),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: int | None = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(
+        await db.run_sync(
+            product_service.list_project_documents,
+            project_id=project_id,
+            tenant_id=tenant_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    )
+
+
+@router.get("/projects/{project_id}/passages", response_model=BaseResponse)
+async def search_project_passages(
+    project_id: int,
+    q: str = Query(..., min_length=1, max_length=512),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_session),
     _auth=Depends(require_role("admin", "user")),
     tenant_id: str = Depends(get_tenant_id),
 ) -> BaseResponse:
-    return ok(product_service.list_project_documents(db, project_id=project_id, tenant_id=tenant_id))
+    return ok(
+        await db.run_sync(
+            passage_service.search_project_passages,
+            project_id=project_id,
+            q=q,
+            tenant_id=tenant_id,
+            limit=limit,
+        )
+    )
+
+
+def _wants_ndjson(accept: str | None) -> bool:
+    return NDJSON_MEDIA_TYPE in (accept or "")
+
+
+def _ndjson_line(kind: str, payload: dict) -> bytes:
+    return (json.dumps({kind: payload}) + "\n").encode("utf-8")
+
+
+def _iter_batch_ndjson(batch_id: int, tenant_id: str, actor_id: str) -> Iterator[bytes]:
+    # Runs in Starlette's threadpool. Each line is {"batch": ...}, {"item": ...} or a final {"summary": ...};
+    # failures after the 200 went out arrive as a final {"error": ...} line instead.
+    with SessionLocal() as session:
+        try:
+            for kind, payload in product_service.iter_batch_run(session, batch_id=batch_id, tenant_id=tenant_id, actor_id=actor_id):
+                yield _ndjson_line(kind, payload)
+        except ServiceError as exc:
+            inc_error_code(exc.code)
+            yield _ndjson_line("error", fail(exc.code, exc.message, exc.details).error.model_dump())
+        except Exception as exc:
+            inc_error_code("internal_error")
+            log_event("batch_stream_failed", batch_id=batch_id, error=str(exc) if settings.app_env != "production" else "redacted")
+            yield _ndjson_line("error", fail("internal_error", "An unexpected internal error occurred").error.model_dump())
+
+
+def _batch_stream(batch_id: int, tenant_id: str, actor_id: str) -> StreamingResponse:
+    return StreamingResponse(_iter_batch_ndjson(batch_id, tenant_id, actor_id), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.post("/projects/{project_id}/batches/extract", response_model=BaseResponse)
 async def run_project_batch_extract(
     project_id: int,
     payload: ProjectBatchExtractRequest,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     auth: AuthContext = Depends(require_role("admin", "user")),
     tenant_id: str = Depends(get_tenant_id),
-) -> BaseResponse:
+    accept: str | None = Header(default=None),
+):
+    if settings.batch_async_enabled:
+        return ok(
+            await db.run_sync(
+                job_service.enqueue_project_batch_extract,
+                project_id=project_id,
+                mode=payload.mode,
+                tenant_id=tenant_id,
+                actor_id=auth.user_id,
+                summary_chars=payload.summary_chars,
+                incremental=payload.incremental,
+            )
+        )
+    if _wants_ndjson(accept):
+        batch_id = await db.run_sync(
+            product_service.start_project_batch,
+            project_id=project_id,
+            mode=payload.mode,
+            tenant_id=tenant_id,
+            summary_chars=payload.summary_chars,
+            incremental=payload.incremental,
+        )
+        return _batch_stream(batch_id, tenant_id, auth.user_id)
     return ok(
-        product_service.run_project_batch_extract(
-            db,
+        await db.run_sync(
+            product_service.run_project_batch_extract,
             project_id=project_id,
             mode=payload.mode,
             tenant_id=tenant_id,
             actor_id=auth.user_id,
+            summary_chars=payload.summary_chars,
+            incremental=payload.incremental,
+        )
+    )
+
+
+@router.get("/projects/{project_id}/batches/{batch_id}", response_model=BaseResponse)
+async def get_project_batch(
+    project_id: int,
+    batch_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(await db.run_sync(product_service.get_batch_run, project_id=project_id, batch_id=batch_id, tenant_id=tenant_id))
+
+
+@router.get("/projects/{project_id}/batches/{batch_id}/items", response_model=BaseResponse)
+async def list_project_batch_items(
+    project_id: int,
+    batch_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: int | None = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(
+        await db.run_sync(
+            product_service.list_batch_items,
+            project_id=project_id,
+            batch_id=batch_id,
+            tenant_id=tenant_id,
+            limit=limit,
+            cursor=cursor,
         )
     )
 
 
+@router.post("/projects/{project_id}/batches/{batch_id}/resume", response_model=BaseResponse)
+async def resume_project_batch(
+    project_id: int,
+    batch_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    auth: AuthContext = Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+    accept: str | None = Header(default=None),
+):
+    if not settings.batch_async_enabled and _wants_ndjson(accept):
+        await db.run_sync(product_service.check_batch_resumable, project_id=project_id, batch_id=batch_id, tenant_id=tenant_id)
+        return _batch_stream(batch_id, tenant_id, auth.user_id)
+    resume = job_service.enqueue_batch_resume if settings.batch_async_enabled else product_service.resume_batch_run
+    return ok(
+        await db.run_sync(
+            resume,
+            project_id=project_id,
+            batch_id=batch_id,
+            tenant_id=tenant_id,
+            actor_id=auth.user_id,
+        )
+    )
+
+
+@router.get("/redaction/policy", response_model=BaseResponse)
+async def get_redaction_policy(
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(await db.run_sync(redaction_service.get_redaction_policy, tenant_id=tenant_id))
+
+
+@router.put("/redaction/policy", response_model=BaseResponse)
+async def set_redaction_policy(
+    payload: RedactionPolicyRequest,
+    db: AsyncSession = Depends(get_db_session),
+    auth: AuthContext = Depends(require_role("admin")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(
+        await db.run_sync(
+            redaction_service.set_redaction_policy,
+            tenant_id=tenant_id,
+            actor_id=auth.user_id,
+            **payload.model_dump(),
+        )
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=BaseResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> BaseResponse:
+    return ok(await db.run_sync(job_service.get_job, job_id=job_id, tenant_id=tenant_id))
+
+
+_JOB_FINISHED = ("completed", "failed")
+
+
+def _sse_event(event: str, data: dict, event_id: int | None = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+async def _read_job(job_id: int, tenant_id: str) -> dict:
+    async with AsyncSessionLocal() as session:
+        return await session.run_sync(job_service.get_job, job_id=job_id, tenant_id=tenant_id)
+
+
+async def _iter_job_events(subscription: JobSubscription, job: dict, tenant_id: str) -> AsyncIterator[bytes]:
+    # Live events come from the in-process hub. The job row is only re-read after JOB_EVENTS_KEEPALIVE_S
+    # without events, which is also how a job finished by a worker in another process is noticed.
+    job_id, status = job["job_id"], job["status"]
+    try:
+        yield _sse_event("status", {"job_id": job_id, "status": status, "attempts": job["attempts"]})
+        while True:
+            events = await subscription.next(timeout=0 if status in _JOB_FINISHED else settings.job_events_keepalive_s)
+            for event_id, event, data in events:
+                yield _sse_event(event, data, event_id)
+                if event == TERMINAL_EVENT:
+                    return
+            if events:
+                continue
+            if status in _JOB_FINISHED:
+                yield _sse_event(TERMINAL_EVENT, {"job_id": job_id, "status": status, "result": job["result"]})
+                return
+            yield b": keep-alive\n\n"
+            try:
+                job = await _read_job(job_id, tenant_id)
+            except ServiceError as exc:
+                inc_error_code(exc.code)
+                yield _sse_event("error", fail(exc.code, exc.message, exc.details).error.model_dump())
+                return
+            if job["status"] != status:
+                status = job["status"]
+                yield _sse_event("status", {"job_id": job_id, "status": status, "attempts": job["attempts"]})
+    finally:
+        subscription.close()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    last_event_id: int = Header(default=0, ge=0, alias="last-event-id"),
+    db: AsyncSession = Depends(get_db_session),
+    _auth=Depends(require_role("admin", "user")),
+    tenant_id: str = Depends(get_tenant_id),
+) -> StreamingResponse:
+    job = await db.run_sync(job_service.get_job, job_id=job_id, tenant_id=tenant_id)
+    # Subscribing after the lookup misses nothing: the hub replays buffered events after last_event_id.
+    subscription = get_job_events().subscribe(job_id, after=last_event_id)
+    return StreamingResponse(
+        _iter_job_events(subscription, job, tenant_id),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+    )
+
+
 @router.post("/auth/token", response_model=BaseResponse)
-async def issue_token(payload: AuthTokenRequest, db: Session = Depends(get_db_session)) -> BaseResponse:
+async def issue_token(payload: AuthTokenRequest, db: AsyncSession = Depends(get_db_session)) -> BaseResponse:
     tenant_id = payload.tenant_id or settings.default_tenant_id
-    data = issue_token_pair(db, user_id=payload.user_id, role=payload.role, tenant_id=tenant_id)
+    data = await db.run_sync(issue_token_pair, user_id=payload.user_id, role=payload.role, tenant_id=tenant_id)
     return ok(data)
 
 
 @router.post("/auth/refresh", response_model=BaseResponse)
-async def refresh_token(payload: AuthRefreshRequest, db: Session = Depends(get_db_session)) -> BaseResponse:
-    return ok(refresh_token_pair(db, refresh_token=payload.refresh_token))
+async def refresh_token(payload: AuthRefreshRequest, db: AsyncSession = Depends(get_db_session)) -> BaseResponse:
+    return ok(await db.run_sync(refresh_token_pair, refresh_token=payload.refresh_token))
 
 
 @router.post("/auth/revoke", response_model=BaseResponse)
 async def revoke_token_sessions(
     payload: AuthRevokeRequest,
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_session),
     _auth: AuthContext = Depends(require_role("admin")),
 ) -> BaseResponse:
-    return ok(revoke_user_sessions(db, tenant_id=payload.tenant_id, user_id=payload.user_id))
+    return ok(await db.run_sync(revoke_user_sessions, tenant_id=payload.tenant_id, user_id=payload.user_id))
 
 
 @router.post("/video-to-text", response_model=BaseResponse)
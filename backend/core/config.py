@@ -1,9 +1,25 @@
+import math
 import os
 from typing import Any
 
 from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 
 
+def _parse_weights(raw: str) -> dict[str, float]:
+    """"tenant-a=4,tenant-b=0.5" -> {"tenant-a": 4.0, "tenant-b": 0.5}."""
+    weights = {}
+    for entry in filter(None, (part.strip() for part in raw.split(","))):
+        tenant, sep, weight = entry.partition("=")
+        try:
+            value = float(weight) if sep and tenant.strip() else None
+        except ValueError:
+            value = None
+        if value is None or not math.isfinite(value) or value <= 0:
+            raise ValueError(f"SCHEDULER_TENANT_WEIGHTS: invalid entry {entry!r}; expected tenant=weight with a positive number")
+        weights[tenant.strip()] = value
+    return weights
+
+
 class Settings(BaseModel):
     app_env: str = Field(default="local")
     api_prefix: str = Field(default="/api/v1")
@@ -13,7 +29,22 @@ class Settings(BaseModel):
     url_download_timeout_s: int = Field(default=5, ge=1)
     extract_timeout_s: int = Field(default=3, ge=1)
     max_download_chars: int = Field(default=20000, ge=1)
+    url_pool_max_idle_per_host: int = Field(default=4, ge=0)
+    url_pool_idle_timeout_s: int = Field(default=30, ge=1)
+    url_max_redirects: int = Field(default=5, ge=0)
+    url_batch_max_urls: int = Field(default=1000, ge=1)
+    url_batch_concurrency: int = Field(default=16, ge=1)
+    url_batch_per_host_concurrency: int = Field(default=4, ge=1)
+    url_refresh_interval_s: int = Field(default=0, ge=0)
+    dns_cache_max_entries: int = Field(default=1024, ge=0)
+    dns_cache_ttl_s: int = Field(default=60, ge=1)
+    dns_cache_negative_ttl_s: int = Field(default=10, ge=1)
     max_upload_chars: int = Field(default=200000, ge=1)
+    max_upload_bytes: int = Field(default=10485760, ge=1)
+    upload_spool_memory_bytes: int = Field(default=1048576, ge=0)
+    content_stream_chunk_bytes: int = Field(default=65536, ge=1024)
+    content_compression_codec: str = Field(default="zlib")
+    content_compression_min_bytes: int = Field(default=1024, ge=0)
     concurrency_limit: int = Field(default=20, ge=1)
 
 
@@ -34,6 +65,49 @@ class Settings(BaseModel):
     worker_enabled: bool = Field(default=False)
     queue_backend_url: str = Field(default="")
     batch_async_enabled: bool = Field(default=False)
+    batch_chunk_size: int = Field(default=500, ge=1)
+    batch_chunk_max_bytes: int = Field(default=16777216, ge=0)
+    task_tenant_max_in_flight: int = Field(default=8, ge=1)
+    task_retry_after_s: int = Field(default=1, ge=1)
+    task_scheduler: str = Field(default="fair")
+    task_tenant_max_running: int = Field(default=0, ge=0)
+    scheduler_tenant_weights: dict[str, float] = Field(default_factory=dict)
+    parser_runner_mode: str = Field(default="process")
+    parser_workers: int = Field(default=2, ge=1)
+    parser_queue_size: int = Field(default=32, ge=0)
+    worker_poll_interval_s: int = Field(default=1, ge=1)
+    worker_lease_s: int = Field(default=60, ge=5)
+    job_max_attempts: int = Field(default=3, ge=1)
+    job_tenant_max_running: int = Field(default=0, ge=0)
+    worker_embedded_threads: int = Field(default=0, ge=0)
+    job_events_history: int = Field(default=1000, ge=1)
+    job_events_max_jobs: int = Field(default=256, ge=1)
+    job_events_keepalive_s: int = Field(default=15, ge=1)
+
+    extract_cache_backend: str = Field(default="memory")
+    extract_cache_max_bytes: int = Field(default=67108864, ge=0)
+    extract_cache_redis_url: str = Field(default="")
+    extract_cache_ttl_s: int = Field(default=86400, ge=1)
+    extract_cache_redis_cooldown_s: float = Field(default=30.0, ge=0)
+
+    summary_chars: int = Field(default=400, ge=50)
+
+    redaction_max_terms: int = Field(default=100000, ge=0)
+    redaction_max_patterns: int = Field(default=32, ge=0)
+    redaction_max_match_chars: int = Field(default=256, ge=16)
+    redaction_chunk_chars: int = Field(default=65536, ge=1024)
+    redaction_cache_max_tenants: int = Field(default=128, ge=0)
+
+    search_ts_config: str = Field(default="simple")
+    search_index_max_chars: int = Field(default=200000, ge=1)
+    passage_words: int = Field(default=120, ge=8)
+    passage_overlap_words: int = Field(default=20, ge=0)
+    passage_index_max_chars: int = Field(default=1000000, ge=1)
+    passage_cache_max_projects: int = Field(default=32, ge=0)
+    passage_cache_ttl_s: int = Field(default=300, ge=1)
+    similarity_max_chars: int = Field(default=200000, ge=1)
+    similarity_min_score: float = Field(default=0.5, ge=0, le=1)
+    similarity_max_candidates: int = Field(default=500, ge=1)
 
     feature_flags_backend: str = Field(default="memory")
     feature_flags_cache_ttl: int = Field(default=30, ge=1)
@@ -49,10 +123,12 @@ class Settings(BaseModel):
         "pdf",
         "docx",
         "txt",
+        "xlsx",
         "md",
         "text/plain",
         "application/pdf",
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
     @field_validator("app_env")
@@ -78,6 +154,46 @@ class Settings(BaseModel):
             raise ValueError("rate_limit_backend must be one of: memory, redis")
         return normalized
 
+    @field_validator("extract_cache_backend")
+    @classmethod
+    def _validate_extract_cache_backend(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in {"memory", "redis"}:
+            raise ValueError("extract_cache_backend must be one of: memory, redis")
+        return normalized
+
+    @field_validator("content_compression_codec")
+    @classmethod
+    def _validate_content_compression_codec(cls, value: str) -> str:
+        # Kept in step with the codecs registered in backend/db/blob_codecs.py, which config must not import.
+        normalized = value.strip().lower()
+        if normalized not in {"identity", "zlib"}:
+            raise ValueError("content_compression_codec must be one of: identity, zlib")
+        return normalized
+
+    @field_validator("parser_runner_mode")
+    @classmethod
+    def _validate_parser_runner_mode(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in {"thread", "process"}:
+            raise ValueError("parser_runner_mode must be one of: thread, process")
+        return normalized
+
+    @field_validator("task_scheduler")
+    @classmethod
+    def _validate_task_scheduler(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in {"fair", "fifo"}:
+            raise ValueError("task_scheduler must be one of: fair, fifo")
+        return normalized
+
+    @field_validator("scheduler_tenant_weights")
+    @classmethod
+    def _validate_scheduler_tenant_weights(cls, value: dict[str, float]) -> dict[str, float]:
+        if any(not math.isfinite(weight) or weight <= 0 for weight in value.values()):
+            raise ValueError("scheduler_tenant_weights must all be positive")
+        return value
+
     @model_validator(mode="after")
     def _validate_environment_db_rules(self) -> "Settings":
         is_sqlite = self.database_url.startswith("sqlite")
@@ -98,6 +214,12 @@ class Settings(BaseModel):
         if self.rate_limit_backend == "redis" and not self.rate_limit_redis_url:
             raise ValueError("rate_limit_redis_url must be set when rate_limit_backend=redis")
 
+        if self.extract_cache_backend == "redis" and not self.extract_cache_redis_url:
+            raise ValueError("extract_cache_redis_url must be set when extract_cache_backend=redis")
+
+        if self.passage_overlap_words >= self.passage_words:
+            raise ValueError("passage_overlap_words must be smaller than passage_words")
+
         return self
 
     @classmethod
@@ -111,7 +233,22 @@ class Settings(BaseModel):
             "url_download_timeout_s": int(source.get("URL_DOWNLOAD_TIMEOUT_S", "5")),
             "extract_timeout_s": int(source.get("EXTRACT_TIMEOUT_S", "3")),
             "max_download_chars": int(source.get("MAX_DOWNLOAD_CHARS", "20000")),
+            "url_pool_max_idle_per_host": int(source.get("URL_POOL_MAX_IDLE_PER_HOST", "4")),
+            "url_pool_idle_timeout_s": int(source.get("URL_POOL_IDLE_TIMEOUT_S", "30")),
+            "url_max_redirects": int(source.get("URL_MAX_REDIRECTS", "5")),
+            "url_batch_max_urls": int(source.get("URL_BATCH_MAX_URLS", "1000")),
+            "url_batch_concurrency": int(source.get("URL_BATCH_CONCURRENCY", "16")),
+            "url_batch_per_host_concurrency": int(source.get("URL_BATCH_PER_HOST_CONCURRENCY", "4")),
+            "url_refresh_interval_s": int(source.get("URL_REFRESH_INTERVAL_S", "0")),
+            "dns_cache_max_entries": int(source.get("DNS_CACHE_MAX_ENTRIES", "1024")),
+            "dns_cache_ttl_s": int(source.get("DNS_CACHE_TTL_S", "60")),
+            "dns_cache_negative_ttl_s": int(source.get("DNS_CACHE_NEGATIVE_TTL_S", "10")),
             "max_upload_chars": int(source.get("MAX_UPLOAD_CHARS", "200000")),
+            "max_upload_bytes": int(source.get("MAX_UPLOAD_BYTES", "10485760")),
+            "upload_spool_memory_bytes": int(source.get("UPLOAD_SPOOL_MEMORY_BYTES", "1048576")),
+            "content_stream_chunk_bytes": int(source.get("CONTENT_STREAM_CHUNK_BYTES", "65536")),
+            "content_compression_codec": source.get("CONTENT_COMPRESSION_CODEC", "zlib"),
+            "content_compression_min_bytes": int(source.get("CONTENT_COMPRESSION_MIN_BYTES", "1024")),
             "concurrency_limit": int(source.get("CONCURRENCY_LIMIT", "20")),
             "jwt_secret": source.get("JWT_SECRET", "change-me-local-secret"),
             "jwt_ttl_seconds": int(source.get("JWT_TTL_SECONDS", "3600")),
@@ -126,6 +263,45 @@ class Settings(BaseModel):
             "worker_enabled": source.get("WORKER_ENABLED", "false").lower() == "true",
             "queue_backend_url": source.get("QUEUE_BACKEND_URL", ""),
             "batch_async_enabled": source.get("BATCH_ASYNC_ENABLED", "false").lower() == "true",
+            "batch_chunk_size": int(source.get("BATCH_CHUNK_SIZE", "500")),
+            "batch_chunk_max_bytes": int(source.get("BATCH_CHUNK_MAX_BYTES", "16777216")),
+            "task_tenant_max_in_flight": int(source.get("TASK_TENANT_MAX_IN_FLIGHT", "8")),
+            "task_retry_after_s": int(source.get("TASK_RETRY_AFTER_S", "1")),
+            "task_scheduler": source.get("TASK_SCHEDULER", "fair"),
+            "task_tenant_max_running": int(source.get("TASK_TENANT_MAX_RUNNING", "0")),
+            "scheduler_tenant_weights": _parse_weights(source.get("SCHEDULER_TENANT_WEIGHTS", "")),
+            "parser_runner_mode": source.get("PARSER_RUNNER_MODE", "process"),
+            "parser_workers": int(source.get("PARSER_WORKERS", "2")),
+            "parser_queue_size": int(source.get("PARSER_QUEUE_SIZE", "32")),
+            "worker_poll_interval_s": int(source.get("WORKER_POLL_INTERVAL_S", "1")),
+            "worker_lease_s": int(source.get("WORKER_LEASE_S", "60")),
+            "job_max_attempts": int(source.get("JOB_MAX_ATTEMPTS", "3")),
+            "job_tenant_max_running": int(source.get("JOB_TENANT_MAX_RUNNING", "0")),
+            "worker_embedded_threads": int(source.get("WORKER_EMBEDDED_THREADS", "0")),
+            "job_events_history": int(source.get("JOB_EVENTS_HISTORY", "1000")),
+            "job_events_max_jobs": int(source.get("JOB_EVENTS_MAX_JOBS", "256")),
+            "job_events_keepalive_s": int(source.get("JOB_EVENTS_KEEPALIVE_S", "15")),
+            "extract_cache_backend": source.get("EXTRACT_CACHE_BACKEND", "memory"),
+            "extract_cache_max_bytes": int(source.get("EXTRACT_CACHE_MAX_BYTES", "67108864")),
+            "extract_cache_redis_url": source.get("EXTRACT_CACHE_REDIS_URL", ""),
+            "extract_cache_ttl_s": int(source.get("EXTRACT_CACHE_TTL_S", "86400")),
+            "extract_cache_redis_cooldown_s": float(source.get("EXTRACT_CACHE_REDIS_COOLDOWN_S", "30")),
+            "summary_chars": int(source.get("SUMMARY_CHARS", "400")),
+            "redaction_max_terms": int(source.get("REDACTION_MAX_TERMS", "100000")),
+            "redaction_max_patterns": int(source.get("REDACTION_MAX_PATTERNS", "32")),
+            "redaction_max_match_chars": int(source.get("REDACTION_MAX_MATCH_CHARS", "256")),
+            "redaction_chunk_chars": int(source.get("REDACTION_CHUNK_CHARS", "65536")),
+            "redaction_cache_max_tenants": int(source.get("REDACTION_CACHE_MAX_TENANTS", "128")),
+            "search_ts_config": source.get("SEARCH_TS_CONFIG", "simple"),
+            "search_index_max_chars": int(source.get("SEARCH_INDEX_MAX_CHARS", "200000")),
+            "passage_words": int(source.get("PASSAGE_WORDS", "120")),
+            "passage_overlap_words": int(source.get("PASSAGE_OVERLAP_WORDS", "20")),
+            "passage_index_max_chars": int(source.get("PASSAGE_INDEX_MAX_CHARS", "1000000")),
+            "passage_cache_max_projects": int(source.get("PASSAGE_CACHE_MAX_PROJECTS", "32")),
+            "passage_cache_ttl_s": int(source.get("PASSAGE_CACHE_TTL_S", "300")),
+            "similarity_max_chars": int(source.get("SIMILARITY_MAX_CHARS", "200000")),
+            "similarity_min_score": float(source.get("SIMILARITY_MIN_SCORE", "0.5")),
+            "similarity_max_candidates": int(source.get("SIMILARITY_MAX_CANDIDATES", "500")),
             "feature_flags_backend": source.get("FEATURE_FLAGS_BACKEND", "memory"),
             "feature_flags_cache_ttl": int(source.get("FEATURE_FLAGS_CACHE_TTL", "30")),
             "refresh_token_ttl_s": int(source.get("REFRESH_TOKEN_TTL_S", "604800")),
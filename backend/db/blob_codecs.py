@@ -0,0 +1,126 @@
+import tempfile
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO, Protocol
+
+IDENTITY = "identity"
+
+
+class BlobCodec(Protocol):
+    name: str
+
+    def encode(self, data: bytes) -> bytes: ...
+
+    def iter_encode(self, chunks: Iterable[bytes]) -> Iterator[bytes]: ...
+
+    def iter_decode(self, data: bytes, chunk_bytes: int) -> Iterator[bytes]: ...
+
+
+class ZlibCodec:
+    name = "zlib"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def encode(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def iter_encode(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(self.level)
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+
+    def iter_decode(self, data: bytes, chunk_bytes: int) -> Iterator[bytes]:
+        # max_length keeps each step bounded, so a range read stops inflating once it has its bytes.
+        decompressor = zlib.decompressobj()
+        pending = data
+        while pending:
+            out = decompressor.decompress(pending, chunk_bytes)
+            pending = decompressor.unconsumed_tail
+            if out:
+                yield out
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+_CODECS: dict[str, BlobCodec] = {}
+
+
+def register_codec(codec: BlobCodec) -> None:
+    _CODECS[codec.name] = codec
+
+
+def get_codec(name: str) -> BlobCodec:
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(f"unknown blob codec: {name}")
+
+
+def codec_names() -> set[str]:
+    return {IDENTITY, *_CODECS}
+
+
+register_codec(ZlibCodec())
+
+
+def encode_blob(data: bytes, *, codec: str, min_bytes: int) -> tuple[str, bytes]:
+    # Small bodies and bodies that do not shrink stay as-is; the marker tells readers which one they got.
+    if codec == IDENTITY or len(data) < min_bytes:
+        return IDENTITY, data
+    encoded = get_codec(codec).encode(data)
+    if len(encoded) >= len(data):
+        return IDENTITY, data
+    return codec, encoded
+
+
+def encode_blob_file(fileobj: BinaryIO, *, size: int, codec: str, min_bytes: int, chunk_bytes: int) -> tuple[str, bytes]:
+    """encode_blob for a body in a file, read chunk_bytes at a time.
+
+    The encoded output is spooled to a temporary file, so the raw body and its encoded form are
+    never held together. Only the bytes handed to the insert are materialized: the encoded body,
+    or the raw one when it is small or does not shrink, in which case encoding stops as soon as
+    the output reaches the input size.
+    """
+    if codec != IDENTITY and size >= min_bytes:
+        encoder = get_codec(codec)
+        with tempfile.TemporaryFile() as encoded:
+            written = 0
+            fileobj.seek(0)
+            for out in encoder.iter_encode(iter(lambda: fileobj.read(chunk_bytes), b"")):
+                written += len(out)
+                if written >= size:
+                    break
+                encoded.write(out)
+            else:
+                encoded.seek(0)
+                return codec, encoded.read()
+    fileobj.seek(0)
+    return IDENTITY, fileobj.read()
+
+
+def decode_blob(codec: str, data: bytes) -> bytes:
+    if codec == IDENTITY:
+        return data
+    return b"".join(get_codec(codec).iter_decode(data, 1 << 20))
+
+
+def iter_decoded_range(codec: str, data: bytes, *, offset: int, length: int, chunk_bytes: int) -> Iterator[bytes]:
+    end = offset + length
+    if codec == IDENTITY:
+        for position in range(offset, min(end, len(data)), chunk_bytes):
+            yield data[position : min(position + chunk_bytes, end)]
+        return
+
+    position = 0
+    for chunk in get_codec(codec).iter_decode(data, chunk_bytes):
+        chunk_end = position + len(chunk)
+        if chunk_end > offset:
+            yield chunk[max(offset - position, 0) : end - position]
+        position = chunk_end
+        if position >= end:
+            return
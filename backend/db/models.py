@@ -1,14 +1,18 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import DDL, BigInteger, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from backend.db.blob_codecs import IDENTITY, decode_blob
 from backend.db.session import Base
 
 
 class Project(Base):
     __tablename__ = "projects"
-    __table_args__ = (UniqueConstraint("tenant_id", "name", name="uq_projects_tenant_name"),)
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "name", name="uq_projects_tenant_name"),
+        Index("ix_projects_tenant_id_id", "tenant_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[str] = mapped_column(String(64), default="default", nullable=False, index=True)
@@ -19,22 +23,121 @@ class Project(Base):
     documents: Mapped[list["Document"]] = relationship("Document", back_populates="project")
 
 
+class ContentBlob(Base):
+    __tablename__ = "content_blobs"
+    __table_args__ = (UniqueConstraint("tenant_id", "sha256", name="uq_content_blobs_tenant_sha256"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Logical (decoded) size; data holds the body as written by `codec` (see backend/db/blob_codecs.py).
+    size_bytes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    refcount: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    codec: Mapped[str] = mapped_column(String(16), default=IDENTITY, server_default=IDENTITY, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, deferred=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    @property
+    def decoded_data(self) -> bytes:
+        return decode_blob(self.codec, self.data)
+
+
 class Source(Base):
     __tablename__ = "sources"
+    __table_args__ = (
+        Index("ix_sources_tenant_id_id", "tenant_id", "id"),
+        Index("ix_sources_tenant_id_fetched_at", "tenant_id", "fetched_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[str] = mapped_column(String(64), default="default", nullable=False, index=True)
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     file_type: Mapped[str] = mapped_column(String(32), nullable=False)
-    content: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    # Pre-blob rows kept their body inline; new rows leave it empty and point at content_blobs.
+    legacy_content: Mapped[str] = mapped_column("content", Text, default="", nullable=False, deferred=True)
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    blob_id: Mapped[int | None] = mapped_column(ForeignKey("content_blobs.id", name="fk_sources_blob_id"), nullable=True)
     source_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    # HTTP validators from the last fetch of source_url, sent back on refresh as If-None-Match/If-Modified-Since.
+    fetch_etag: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    fetch_last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    blob: Mapped[ContentBlob | None] = relationship("ContentBlob")
     documents: Mapped[list["Document"]] = relationship("Document", back_populates="source")
 
+    @property
+    def content(self) -> str:
+        if self.blob is None:
+            return self.legacy_content
+        return self.blob.decoded_data.decode("utf-8", errors="replace")
+
+    @property
+    def content_bytes(self) -> bytes:
+        if self.blob is None:
+            return (self.legacy_content or "").encode("utf-8")
+        return self.blob.decoded_data
+
+
+# Full-text index over source names and bodies, maintained by SearchRepository. Kept out of the
+# ORM: SQLite needs an FTS5 virtual table and Postgres a tsvector column with a GIN index.
+_SEARCH_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS source_search USING fts5("
+        "tenant_id UNINDEXED, file_name, body, tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS source_search ("
+        "source_id INTEGER PRIMARY KEY REFERENCES sources (id) ON DELETE CASCADE, "
+        "tenant_id VARCHAR(64) NOT NULL, file_name VARCHAR(255) NOT NULL, body TEXT NOT NULL, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_source_search_tenant_id ON source_search (tenant_id)",
+        "CREATE INDEX IF NOT EXISTS ix_source_search_document ON source_search USING GIN (document)",
+    ],
+}
+for _dialect, _statements in _SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(Source.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+    event.listen(Source.__table__, "before_drop", DDL("DROP TABLE IF EXISTS source_search").execute_if(dialect=_dialect))
+
+
+class SourceSignature(Base):
+    __tablename__ = "source_signatures"
+
+    source_id: Mapped[int] = mapped_column(ForeignKey("sources.id"), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    # MinHash values as little-endian uint32, NUM_PERM of them (see similarity_repository).
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class SourceLshBand(Base):
+    __tablename__ = "source_lsh_bands"
+    __table_args__ = (Index("ix_source_lsh_bands_tenant_id_bucket", "tenant_id", "bucket"),)
+
+    source_id: Mapped[int] = mapped_column(ForeignKey("sources.id"), primary_key=True)
+    band: Mapped[int] = mapped_column(Integer, primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    bucket: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class SourcePassage(Base):
+    __tablename__ = "source_passages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source_id: Mapped[int] = mapped_column(ForeignKey("sources.id"), nullable=False, index=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    ordinal: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_char: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Token count, and the passage's (term hash, tf) records; see passage_repository.TERM_DTYPE.
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    terms: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False, deferred=True)
+
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (Index("ix_documents_project_id_id", "project_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[str] = mapped_column(String(64), default="default", nullable=False, index=True)
@@ -54,17 +157,32 @@ class BatchRun(Base):
     tenant_id: Mapped[str] = mapped_column(String(64), default="default", nullable=False, index=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
     mode: Mapped[str] = mapped_column(String(32), nullable=False)
-    status: Mapped[str] = mapped_column(String(32), default="completed", nullable=False)
+    # pending -> running -> completed | failed; a failed or interrupted run resumes after last_document_id.
+    status: Mapped[str] = mapped_column(String(32), default="pending", nullable=False)
+    summary_chars: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    incremental: Mapped[bool] = mapped_column(default=False, nullable=False)
+    total_items: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    processed_items: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    reused_items: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_document_id: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    error: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
 class BatchItem(Base):
     __tablename__ = "batch_items"
+    __table_args__ = (Index("ix_batch_items_document_id_id", "document_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     batch_id: Mapped[int] = mapped_column(ForeignKey("batch_runs.id"), nullable=False)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"), nullable=False)
     extracted_chars: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # What the result was computed from, so an incremental run can tell whether it still holds.
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    extractor_version: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    error: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    redactions: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
 
 class AuditEvent(Base):
@@ -98,13 +216,21 @@ class RefreshToken(Base):
 
 class BackgroundJob(Base):
     __tablename__ = "background_jobs"
+    __table_args__ = (Index("ix_background_jobs_tenant_id_status", "tenant_id", "status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     tenant_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     job_type: Mapped[str] = mapped_column(String(64), nullable=False)
-    status: Mapped[str] = mapped_column(String(32), default="queued", nullable=False)
+    status: Mapped[str] = mapped_column(String(32), default="queued", nullable=False, index=True)
+    # Rank from backend.services.scheduler.PRIORITY_CLASSES; lower is claimed first.
+    priority: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     payload_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
     result_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Work a handler has committed so far; a re-claimed job resumes from it instead of starting over.
+    checkpoint_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    lease_owner: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -119,3 +245,15 @@ class FeatureFlag(Base):
     key: Mapped[str] = mapped_column(String(128), nullable=False)
     enabled: Mapped[bool] = mapped_column(default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class RedactionPolicy(Base):
+    __tablename__ = "redaction_policies"
+    __table_args__ = (UniqueConstraint("tenant_id", name="uq_redaction_policies_tenant_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tenant_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    rules_json: Mapped[str] = mapped_column(Text, default="{}", nullable=False, deferred=True)
+    # Bumped on every update; compiled redactors are cached per (tenant, version).
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from backend.core.config import settings
@@ -8,6 +9,20 @@ class Base(DeclarativeBase):
     pass
 
 
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in _ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database dialect for async engine: {dialect}")
+    return f"{_ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+
 engine_kwargs = {"future": True}
 if settings.database_url.startswith("postgresql"):
     engine_kwargs.update({"pool_pre_ping": True})
@@ -15,10 +30,10 @@ if settings.database_url.startswith("postgresql"):
 engine = create_engine(settings.database_url, **engine_kwargs)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+async_engine = create_async_engine(async_database_url(settings.database_url), **engine_kwargs)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, autocommit=False, class_=AsyncSession)
+
 
-def get_db_session():
-    session = SessionLocal()
-    try:
+async def get_db_session():
+    async with AsyncSessionLocal() as session:
         yield session
-    finally:
-        session.close()
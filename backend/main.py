@@ -23,20 +23,38 @@ from backend.db.models import (
     Source,
 )  # noqa: F401
 from backend.db.migrations import bootstrap_schema
-from backend.db.session import engine
+from backend.db.session import async_engine, engine
 from backend.services.errors import ServiceError
+from backend.services.http_fetch import close_http_pool
 from backend.services.logging_utils import configure_logging, log_event
 from backend.services.metrics_service import inc_error_code, observe_request, render_prometheus
 from backend.services.rate_limit_service import check_rate_limit
 from backend.services.response import fail
+from backend.services.task_runner import shutdown_task_runner
+from backend.worker import start_embedded_workers
 
 configure_logging()
 
+_SERVICE_ERROR_STATUS = {
+    "task_queue_full": 503,
+    "task_runner_closed": 503,
+    "tenant_concurrency_limited": 429,
+    "range_not_satisfiable": 416,
+    "batch_checkpoint_conflict": 409,
+}
+
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     bootstrap_schema(engine)
+    embedded = settings.worker_enabled and settings.worker_embedded_threads > 0
+    stop_workers = start_embedded_workers(settings.worker_embedded_threads) if embedded else None
     yield
+    if stop_workers is not None:
+        stop_workers()
+    shutdown_task_runner()
+    await close_http_pool()
+    await async_engine.dispose()
 
 
 app = FastAPI(title="DocuHub API", version="0.5.0", lifespan=lifespan)
@@ -115,7 +133,10 @@ async def service_exception_handler(request: Request, exc: ServiceError) -> JSON
         details=exc.details,
     )
     payload = fail(exc.code, exc.message, exc.details).model_dump()
-    return JSONResponse(status_code=400, content=payload)
+    headers = {"retry-after": str(exc.details["retry_after_s"])} if "retry_after_s" in exc.details else {}
+    if exc.code == "range_not_satisfiable":
+        headers["content-range"] = f"bytes */{exc.details['size_bytes']}"
+    return JSONResponse(status_code=_SERVICE_ERROR_STATUS.get(exc.code, 400), content=payload, headers=headers)
 
 
 @app.exception_handler(RequestValidationError)
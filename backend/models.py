@@ -2,7 +2,8 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field, HttpUrl
 
-ExtractMode = Literal["text", "summary"]
+ExtractMode = Literal["text", "summary", "redact"]
+RedactionDetector = Literal["email", "iban", "phone"]
 
 
 class ErrorObject(BaseModel):
@@ -27,9 +28,23 @@ class DownloadFromUrlRequest(BaseModel):
     url: HttpUrl
 
 
+class DownloadFromUrlBatchRequest(BaseModel):
+    urls: list[HttpUrl] = Field(..., min_length=1)
+
+
 class ExtractRequest(BaseModel):
     file_id: int = Field(..., ge=1)
     mode: ExtractMode = "text"
+    summary_chars: int | None = Field(default=None, ge=50, le=20000)
+
+
+class RedactionPolicyRequest(BaseModel):
+    terms: list[str] = Field(default_factory=list)
+    patterns: list[str] = Field(default_factory=list)
+    detectors: list[RedactionDetector] = Field(default_factory=list)
+    case_sensitive: bool = False
+    whole_words: bool = True
+    mask: str = Field(default="[REDACTED]", max_length=64)
 
 
 class VideoToTextRequest(BaseModel):
@@ -53,6 +68,8 @@ class ProjectDocumentCreateRequest(BaseModel):
 
 class ProjectBatchExtractRequest(BaseModel):
     mode: ExtractMode = "text"
+    summary_chars: int | None = Field(default=None, ge=50, le=20000)
+    incremental: bool = False
 
 
 class AuthTokenRequest(BaseModel):
@@ -0,0 +1,25 @@
+import argparse
+
+from backend.db.migrations import bootstrap_schema
+from backend.db.session import SessionLocal, engine
+from backend.services.logging_utils import configure_logging, log_event
+from backend.services.reindex_service import BACKFILL_INDEXES, backfill_index
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill per-source indexes for sources created before they existed")
+    parser.add_argument("index", choices=sorted(BACKFILL_INDEXES))
+    parser.add_argument("--tenant", default=None, help="only backfill this tenant's sources")
+    parser.add_argument("--chunk-size", type=int, default=100, help="sources per transaction")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    bootstrap_schema(engine)
+    with SessionLocal() as session:
+        result = backfill_index(session, args.index, tenant_id=args.tenant, chunk_size=args.chunk_size)
+    log_event("index_backfill_done", **result)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
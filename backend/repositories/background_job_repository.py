@@ -1,7 +1,9 @@
 import json
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, literal, or_, select, update
+from sqlalchemy.orm import Session, aliased
 
 from backend.db.models import BackgroundJob
 
@@ -10,11 +12,12 @@ class BackgroundJobRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def create_job(self, *, tenant_id: str, job_type: str, payload: dict) -> BackgroundJob:
+    def create_job(self, *, tenant_id: str, job_type: str, payload: dict, priority: int = 1) -> BackgroundJob:
         job = BackgroundJob(
             tenant_id=tenant_id,
             job_type=job_type,
             status="queued",
+            priority=priority,
             payload_json=json.dumps(payload, separators=(",", ":")),
         )
         self.session.add(job)
@@ -25,3 +28,108 @@ class BackgroundJobRepository:
     def get_job(self, *, tenant_id: str, job_id: int) -> BackgroundJob | None:
         stmt = select(BackgroundJob).where(BackgroundJob.id == job_id, BackgroundJob.tenant_id == tenant_id)
         return self.session.execute(stmt).scalar_one_or_none()
+
+    def has_pending_job(self, *, tenant_id: str, job_type: str) -> bool:
+        stmt = select(BackgroundJob.id).where(
+            BackgroundJob.tenant_id == tenant_id,
+            BackgroundJob.job_type == job_type,
+            BackgroundJob.status.in_(("queued", "running")),
+        )
+        return self.session.execute(stmt.limit(1)).first() is not None
+
+    def claim_next_job(
+        self,
+        *,
+        worker_id: str,
+        lease_seconds: int,
+        tenant_weights: Mapping[str, float] | None = None,
+        tenant_max_running: int = 0,
+    ) -> BackgroundJob | None:
+        # One UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED) claims atomically on Postgres.
+        # SQLite drops the locking clause, but serializes writers, and the outer WHERE re-checks
+        # claimability, so two workers can never both win the same row.
+        # Within a priority class the tenant with the fewest live jobs per unit of weight goes first,
+        # so a tenant with a deep backlog cannot hold every worker while others wait.
+        now = datetime.now(UTC)
+        claimable = or_(
+            BackgroundJob.status == "queued",
+            and_(BackgroundJob.status == "running", BackgroundJob.lease_expires_at < now),
+        )
+        running = aliased(BackgroundJob)
+        tenant_running = (
+            select(func.count(running.id))
+            .where(running.tenant_id == BackgroundJob.tenant_id, running.status == "running", running.lease_expires_at >= now)
+            .correlate(BackgroundJob)
+            .scalar_subquery()
+        )
+        weight = case(dict(tenant_weights), value=BackgroundJob.tenant_id, else_=1.0) if tenant_weights else literal(1.0)
+        candidate = select(BackgroundJob.id).where(claimable)
+        if tenant_max_running:
+            candidate = candidate.where(tenant_running < tenant_max_running)
+        candidate = (
+            candidate.order_by(BackgroundJob.priority, tenant_running / weight, BackgroundJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(BackgroundJob)
+            .where(BackgroundJob.id == candidate, claimable)
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=BackgroundJob.attempts + 1,
+                updated_at=now,
+            )
+            .returning(BackgroundJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        job_id = self.session.execute(stmt).scalar_one_or_none()
+        self.session.commit()
+        if job_id is None:
+            return None
+        return self.session.get(BackgroundJob, job_id, populate_existing=True)
+
+    def extend_lease(self, *, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        now = datetime.now(UTC)
+        stmt = (
+            update(BackgroundJob)
+            .where(
+                BackgroundJob.id == job_id,
+                BackgroundJob.lease_owner == worker_id,
+                BackgroundJob.status == "running",
+            )
+            .values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        renewed = self.session.execute(stmt).rowcount == 1
+        self.session.commit()
+        return renewed
+
+    def checkpoint_job(self, *, job_id: int, worker_id: str, checkpoint: dict) -> bool:
+        """Stage a checkpoint in the caller's transaction; False means the lease moved to another worker."""
+        stmt = (
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.lease_owner == worker_id, BackgroundJob.status == "running")
+            .values(checkpoint_json=json.dumps(checkpoint, separators=(",", ":"), default=str), updated_at=datetime.now(UTC))
+            .execution_options(synchronize_session=False)
+        )
+        return self.session.execute(stmt).rowcount == 1
+
+    def finish_job(self, *, job_id: int, worker_id: str, status: str, result: dict) -> bool:
+        stmt = (
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.lease_owner == worker_id)
+            .values(
+                status=status,
+                result_json=json.dumps(result, separators=(",", ":"), default=str),
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=datetime.now(UTC),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        finished = self.session.execute(stmt).rowcount == 1
+        self.session.commit()
+        return finished
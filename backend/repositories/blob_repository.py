@@ -0,0 +1,99 @@
+import hashlib
+from collections.abc import Callable
+from typing import BinaryIO
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.db.blob_codecs import IDENTITY, decode_blob, encode_blob, encode_blob_file
+from backend.db.models import ContentBlob
+
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_bytes(data: bytes | None, legacy_content: str = "", codec: str | None = IDENTITY) -> bytes:
+    if data is None:
+        return legacy_content.encode("utf-8")
+    return decode_blob(codec or IDENTITY, data)
+
+
+class ContentBlobRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_hash(self, *, tenant_id: str, sha256: str) -> ContentBlob | None:
+        stmt = select(ContentBlob).where(ContentBlob.tenant_id == tenant_id, ContentBlob.sha256 == sha256)
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def acquire(self, *, tenant_id: str, data: bytes, sha256: str | None = None) -> ContentBlob:
+        def _encode() -> tuple[str, bytes]:
+            return encode_blob(data, codec=settings.content_compression_codec, min_bytes=settings.content_compression_min_bytes)
+
+        return self._acquire(tenant_id=tenant_id, sha256=sha256 or content_sha256(data), size_bytes=len(data), encode=_encode)
+
+    def acquire_file(self, *, tenant_id: str, sha256: str, fileobj: BinaryIO, size_bytes: int) -> ContentBlob:
+        # The file is only read when the tenant does not have this body yet.
+        def _encode() -> tuple[str, bytes]:
+            return encode_blob_file(
+                fileobj,
+                size=size_bytes,
+                codec=settings.content_compression_codec,
+                min_bytes=settings.content_compression_min_bytes,
+                chunk_bytes=settings.content_stream_chunk_bytes,
+            )
+
+        return self._acquire(tenant_id=tenant_id, sha256=sha256, size_bytes=size_bytes, encode=_encode)
+
+    def _acquire(
+        self,
+        *,
+        tenant_id: str,
+        sha256: str,
+        size_bytes: int,
+        encode: Callable[[], tuple[str, bytes]],
+    ) -> ContentBlob:
+        blob = self.get_by_hash(tenant_id=tenant_id, sha256=sha256)
+        if blob is None:
+            codec, stored = encode()
+            try:
+                with self.session.begin_nested():
+                    blob = ContentBlob(
+                        tenant_id=tenant_id,
+                        sha256=sha256,
+                        size_bytes=size_bytes,
+                        refcount=1,
+                        codec=codec,
+                        data=stored,
+                    )
+                    self.session.add(blob)
+                return blob
+            except IntegrityError:
+                blob = self.get_by_hash(tenant_id=tenant_id, sha256=sha256)
+                if blob is None:
+                    raise
+
+        self.session.execute(
+            update(ContentBlob)
+            .where(ContentBlob.id == blob.id)
+            .values(refcount=ContentBlob.refcount + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.expire(blob, ["refcount"])
+        return blob
+
+    def release(self, blob_id: int) -> None:
+        self.session.execute(
+            update(ContentBlob)
+            .where(ContentBlob.id == blob_id)
+            .values(refcount=ContentBlob.refcount - 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.execute(
+            delete(ContentBlob)
+            .where(ContentBlob.id == blob_id, ContentBlob.refcount <= 0)
+            .execution_options(synchronize_session=False)
+        )
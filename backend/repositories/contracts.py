@@ -1,6 +1,11 @@
-from typing import Protocol
+from collections.abc import Iterator
+from datetime import datetime
+from typing import BinaryIO, Protocol
 
-from backend.db.models import Source
+from sqlalchemy import Row
+
+from backend.db.models import Base, ContentBlob, Source
+from backend.repositories.source_repository import StoredSource
 
 
 class SourceRepositoryProtocol(Protocol):
@@ -12,19 +17,111 @@ class SourceRepositoryProtocol(Protocol):
         content: str,
         tenant_id: str,
         source_url: str | None = None,
+        fetch_etag: str | None = None,
+        fetch_last_modified: str | None = None,
     ) -> Source: ...
 
+    def create_source_from_file(
+        self,
+        *,
+        file_name: str,
+        file_type: str,
+        fileobj: BinaryIO,
+        sha256: str,
+        tenant_id: str,
+        search_text: str = "",
+    ) -> Source: ...
+
+    def create_sources(self, entries: list[dict], *, tenant_id: str, commit: bool = True) -> list[StoredSource]: ...
+
+    def reindex_source(self, source: Source, *, search_text: str) -> None: ...
+
+    def list_unindexed_sources(
+        self,
+        index: type[Base],
+        *,
+        limit: int,
+        after_id: int = 0,
+        tenant_id: str | None = None,
+    ) -> list[Row]: ...
+
+    def list_refresh_targets(
+        self,
+        *,
+        tenant_id: str,
+        limit: int,
+        after_id: int = 0,
+        fetched_before: datetime | None = None,
+    ) -> list[Row]: ...
+
+    def tenants_due_for_refresh(self, *, fetched_before: datetime) -> list[str]: ...
+
+    def mark_fetched(self, source_id: int, *, etag: str | None, last_modified: str | None) -> None: ...
+
+    def replace_content(
+        self,
+        source_id: int,
+        *,
+        tenant_id: str,
+        content: str,
+        etag: str | None,
+        last_modified: str | None,
+    ) -> ContentBlob: ...
+
     def get_source(self, source_id: int, *, tenant_id: str) -> Source | None: ...
 
-    def list_sources(self, *, tenant_id: str) -> list[Source]: ...
+    def list_sources(self, *, tenant_id: str, limit: int, before_id: int | None = None) -> list[Row]: ...
+
+    def get_content_info(self, source_id: int, *, tenant_id: str) -> tuple[str, int] | None: ...
+
+    def read_content_range(self, source_id: int, *, tenant_id: str, offset: int, length: int) -> bytes: ...
+
+    def iter_content_range(
+        self,
+        source_id: int,
+        *,
+        tenant_id: str,
+        offset: int,
+        length: int,
+        chunk_bytes: int,
+    ) -> Iterator[bytes]: ...
 
 
 class ProductRepositoryProtocol(Protocol):
     def create_project(self, *, name: str, description: str, tenant_id: str): ...
     def get_project(self, project_id: int, *, tenant_id: str): ...
-    def list_projects(self, *, tenant_id: str): ...
+    def list_projects(self, *, tenant_id: str, limit: int, before_id: int | None = None): ...
     def create_document(self, *, project_id: int, source_id: int, title: str, tenant_id: str): ...
-    def list_documents_by_project(self, project_id: int, *, tenant_id: str): ...
+    def list_documents_by_project(self, project_id: int, *, tenant_id: str, limit: int, before_id: int | None = None): ...
     def get_source(self, source_id: int, *, tenant_id: str): ...
-    def create_batch_run(self, *, project_id: int, mode: str, tenant_id: str, status: str = "completed"): ...
+    def create_batch_run(
+        self,
+        *,
+        project_id: int,
+        mode: str,
+        tenant_id: str,
+        status: str = "pending",
+        summary_chars: int | None = None,
+        incremental: bool = False,
+    ): ...
+    def get_batch_run(self, batch_id: int, *, tenant_id: str): ...
+    def count_project_documents(self, project_id: int, *, tenant_id: str) -> int: ...
+    def set_batch_status(self, batch_id: int, *, status: str, error: str | None = None, total_items: int | None = None) -> None: ...
+    def checkpoint_batch_run(
+        self, batch_id: int, *, after_document_id: int, last_document_id: int, processed: int, reused: int
+    ) -> bool: ...
+    def list_batch_items(self, batch_id: int, *, after_document_id: int = 0, limit: int | None = None): ...
     def create_batch_item(self, *, batch_id: int, document_id: int, extracted_chars: int): ...
+    def iter_project_sources(
+        self,
+        project_id: int,
+        *,
+        tenant_id: str,
+        chunk_size: int,
+        max_bytes: int = 0,
+        with_data: bool = True,
+        after_document_id: int = 0,
+    ): ...
+    def get_project_sources(self, project_id: int, *, tenant_id: str, document_ids: list[int]): ...
+    def latest_batch_items(self, project_id: int, *, tenant_id: str, mode: str, document_ids: list[int]): ...
+    def add_batch_items(self, items: list[dict]) -> None: ...
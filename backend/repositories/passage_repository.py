@@ -0,0 +1,131 @@
+import re
+import zlib
+
+import numpy as np
+from sqlalchemy import Row, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.db.models import Document, SourcePassage
+
+# One record per distinct term of a passage: crc32 of the lowercased term and its count in the passage.
+TERM_DTYPE = np.dtype([("term", "<u4"), ("tf", "<u2")])
+_TOKEN = re.compile(r"\w+")
+
+
+def term_hashes(terms: list[str]) -> np.ndarray:
+    vocabulary = {term: zlib.crc32(term.encode("utf-8")) for term in set(terms)}
+    return np.fromiter((vocabulary[term] for term in terms), dtype=np.uint32, count=len(terms))
+
+
+def query_hashes(query: str) -> np.ndarray:
+    return np.unique(term_hashes(_TOKEN.findall(query.lower())))
+
+
+def _term_records(tokens: list[str]) -> bytes:
+    terms, counts = np.unique(term_hashes(tokens), return_counts=True)
+    records = np.empty(len(terms), dtype=TERM_DTYPE)
+    records["term"] = terms
+    records["tf"] = np.minimum(counts, np.iinfo(np.uint16).max)
+    return records.tobytes()
+
+
+def chunk_passages(body: str, *, words: int, overlap: int) -> list[tuple[int, int, list[str]]]:
+    """Split body into windows of `words` tokens sharing `overlap` tokens: (start char, end char, tokens)."""
+    matches = list(_TOKEN.finditer(body))
+    step = max(words - overlap, 1)
+    passages = []
+    for first in range(0, len(matches), step):
+        window = matches[first : first + words]
+        passages.append((window[0].start(), window[-1].end(), [match.group().lower() for match in window]))
+        if first + words >= len(matches):
+            break
+    return passages
+
+
+def build_passages(body: str, *, max_chars: int, words: int, overlap: int) -> list[tuple[int, int, bytes, str]]:
+    """(start char, token count, term records, text) per passage; needs no session, so it can run on a worker."""
+    body = body[:max_chars]
+    return [
+        (start, len(tokens), _term_records(tokens), body[start:end])
+        for start, end, tokens in chunk_passages(body, words=words, overlap=overlap)
+    ]
+
+
+class PassageRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def index_source(self, *, source_id: int, tenant_id: str, body: str) -> None:
+        passages = build_passages(
+            body,
+            max_chars=settings.passage_index_max_chars,
+            words=settings.passage_words,
+            overlap=settings.passage_overlap_words,
+        )
+        self.store_passages(source_id=source_id, tenant_id=tenant_id, passages=passages)
+
+    def store_passages(self, *, source_id: int, tenant_id: str, passages: list[tuple[int, int, bytes, str]]) -> None:
+        self.session.execute(delete(SourcePassage).where(SourcePassage.source_id == source_id))
+        if not passages:
+            return
+        self.session.execute(
+            insert(SourcePassage),
+            [
+                {
+                    "source_id": source_id,
+                    "tenant_id": tenant_id,
+                    "ordinal": ordinal,
+                    "start_char": start,
+                    "length": length,
+                    "terms": terms,
+                    "text": text,
+                }
+                for ordinal, (start, length, terms, text) in enumerate(passages)
+            ],
+        )
+
+    def project_state(self, project_id: int, *, after_document_id: int = 0) -> tuple[int, int]:
+        """(document count, highest document id) of a project, counting only ids above after_document_id.
+
+        Runs on every passage query, so it stays on ix_documents_project_id_id alone; callers check the
+        project's tenant first.
+        """
+        stmt = select(func.count(Document.id), func.coalesce(func.max(Document.id), 0)).where(
+            Document.project_id == project_id,
+            Document.id > after_document_id,
+        )
+        count, max_id = self.session.execute(stmt).one()
+        return count, max_id
+
+    def list_project_postings(self, project_id: int, *, tenant_id: str, after_document_id: int = 0) -> list[Row]:
+        stmt = (
+            select(Document.id.label("document_id"), SourcePassage.id, SourcePassage.source_id, SourcePassage.length, SourcePassage.terms)
+            .join(SourcePassage, SourcePassage.source_id == Document.source_id)
+            .where(
+                Document.project_id == project_id,
+                Document.tenant_id == tenant_id,
+                SourcePassage.tenant_id == tenant_id,
+                Document.id > after_document_id,
+            )
+            .order_by(Document.id, SourcePassage.ordinal)
+        )
+        return list(self.session.execute(stmt))
+
+    def get_passages(self, passage_ids: list[int]) -> dict[int, Row]:
+        if not passage_ids:
+            return {}
+        stmt = select(
+            SourcePassage.id,
+            SourcePassage.source_id,
+            SourcePassage.ordinal,
+            SourcePassage.start_char,
+            SourcePassage.text,
+        ).where(SourcePassage.id.in_(passage_ids))
+        return {row.id: row for row in self.session.execute(stmt)}
+
+    def get_document_titles(self, document_ids: list[int]) -> dict[int, str]:
+        if not document_ids:
+            return {}
+        stmt = select(Document.id, Document.title).where(Document.id.in_(document_ids))
+        return {row.id: row.title for row in self.session.execute(stmt)}
@@ -1,7 +1,10 @@
-from sqlalchemy import select
+from collections.abc import Iterator
+
+from sqlalchemy import Row, and_, func, insert, select, update
 from sqlalchemy.orm import Session
 
-from backend.db.models import BatchItem, BatchRun, Document, Project, Source
+from backend.db.models import BatchItem, BatchRun, ContentBlob, Document, Project, Source
+from backend.repositories.blob_repository import content_bytes
 
 
 class ProductRepository:
@@ -19,9 +22,11 @@ class ProductRepository:
         stmt = select(Project).where(Project.id == project_id, Project.tenant_id == tenant_id)
         return self.session.execute(stmt).scalar_one_or_none()
 
-    def list_projects(self, *, tenant_id: str) -> list[Project]:
-        stmt = select(Project).where(Project.tenant_id == tenant_id).order_by(Project.id.desc())
-        return list(self.session.execute(stmt).scalars())
+    def list_projects(self, *, tenant_id: str, limit: int, before_id: int | None = None) -> list[Row]:
+        stmt = select(Project.id, Project.name, Project.description, Project.created_at).where(Project.tenant_id == tenant_id)
+        if before_id is not None:
+            stmt = stmt.where(Project.id < before_id)
+        return list(self.session.execute(stmt.order_by(Project.id.desc()).limit(limit + 1)))
 
     def create_document(self, *, project_id: int, source_id: int, title: str, tenant_id: str) -> Document:
         document = Document(project_id=project_id, source_id=source_id, title=title, tenant_id=tenant_id)
@@ -30,25 +35,209 @@ class ProductRepository:
         self.session.refresh(document)
         return document
 
-    def list_documents_by_project(self, project_id: int, *, tenant_id: str) -> list[Document]:
-        stmt = (
-            select(Document)
-            .where(Document.project_id == project_id, Document.tenant_id == tenant_id)
-            .order_by(Document.id.desc())
+    def list_documents_by_project(
+        self,
+        project_id: int,
+        *,
+        tenant_id: str,
+        limit: int,
+        before_id: int | None = None,
+    ) -> list[Row]:
+        stmt = select(Document.id, Document.project_id, Document.source_id, Document.title, Document.created_at).where(
+            Document.project_id == project_id,
+            Document.tenant_id == tenant_id,
         )
-        return list(self.session.execute(stmt).scalars())
+        if before_id is not None:
+            stmt = stmt.where(Document.id < before_id)
+        return list(self.session.execute(stmt.order_by(Document.id.desc()).limit(limit + 1)))
 
     def get_source(self, source_id: int, *, tenant_id: str) -> Source | None:
         stmt = select(Source).where(Source.id == source_id, Source.tenant_id == tenant_id)
         return self.session.execute(stmt).scalar_one_or_none()
 
-    def create_batch_run(self, *, project_id: int, mode: str, tenant_id: str, status: str = "completed") -> BatchRun:
-        batch = BatchRun(project_id=project_id, mode=mode, status=status, tenant_id=tenant_id)
+    def create_batch_run(
+        self,
+        *,
+        project_id: int,
+        mode: str,
+        tenant_id: str,
+        status: str = "pending",
+        summary_chars: int | None = None,
+        incremental: bool = False,
+    ) -> BatchRun:
+        batch = BatchRun(
+            project_id=project_id,
+            mode=mode,
+            status=status,
+            tenant_id=tenant_id,
+            summary_chars=summary_chars,
+            incremental=incremental,
+        )
         self.session.add(batch)
         self.session.commit()
         self.session.refresh(batch)
         return batch
 
+    def get_batch_run(self, batch_id: int, *, tenant_id: str) -> BatchRun | None:
+        stmt = select(BatchRun).where(BatchRun.id == batch_id, BatchRun.tenant_id == tenant_id)
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def count_project_documents(self, project_id: int, *, tenant_id: str) -> int:
+        stmt = select(func.count(Document.id)).where(Document.project_id == project_id, Document.tenant_id == tenant_id)
+        return self.session.execute(stmt).scalar_one()
+
+    def set_batch_status(self, batch_id: int, *, status: str, error: str | None = None, total_items: int | None = None) -> None:
+        values = {"status": status, "error": error, "updated_at": func.now()}
+        if total_items is not None:
+            values["total_items"] = total_items
+        self.session.execute(update(BatchRun).where(BatchRun.id == batch_id).values(**values))
+
+    def checkpoint_batch_run(
+        self,
+        batch_id: int,
+        *,
+        after_document_id: int,
+        last_document_id: int,
+        processed: int,
+        reused: int,
+    ) -> bool:
+        """Advance the checkpoint only from where this caller found it; False means another worker moved it."""
+        result = self.session.execute(
+            update(BatchRun)
+            .where(BatchRun.id == batch_id, BatchRun.last_document_id == after_document_id)
+            .values(
+                last_document_id=last_document_id,
+                processed_items=BatchRun.processed_items + processed,
+                reused_items=BatchRun.reused_items + reused,
+                updated_at=func.now(),
+            )
+        )
+        return result.rowcount == 1
+
+    def list_batch_items(self, batch_id: int, *, after_document_id: int = 0, limit: int | None = None) -> list[Row]:
+        stmt = (
+            select(Document.id.label("document_id"), Document.source_id, BatchItem.extracted_chars, BatchItem.error, BatchItem.redactions)
+            .join(Document, Document.id == BatchItem.document_id)
+            .where(BatchItem.batch_id == batch_id, BatchItem.document_id > after_document_id)
+            .order_by(BatchItem.document_id)
+            .limit(limit)
+        )
+        return list(self.session.execute(stmt))
+
+    def _project_sources_stmt(self, project_id: int, *, tenant_id: str, with_data: bool = True):
+        columns = [Document.id, Document.source_id, Source.content_sha256, Source.file_type]
+        if with_data:
+            columns += [func.coalesce(Source.legacy_content, ""), ContentBlob.data, ContentBlob.codec]
+        stmt = select(*columns).outerjoin(Source, and_(Source.id == Document.source_id, Source.tenant_id == tenant_id))
+        if with_data:
+            stmt = stmt.outerjoin(ContentBlob, ContentBlob.id == Source.blob_id)
+        return stmt.where(Document.project_id == project_id, Document.tenant_id == tenant_id)
+
+    def _source_rows(self, stmt, *, with_data: bool = True) -> list[tuple[int, int, str | None, str | None, bytes | None]]:
+        if not with_data:
+            return [(*row, None) for row in self.session.execute(stmt)]
+        return [
+            (document_id, source_id, content_sha256, file_type, content_bytes(data, legacy_content, codec))
+            for document_id, source_id, content_sha256, file_type, legacy_content, data, codec in self.session.execute(stmt)
+        ]
+
+    def iter_project_sources(
+        self,
+        project_id: int,
+        *,
+        tenant_id: str,
+        chunk_size: int,
+        max_bytes: int = 0,
+        with_data: bool = True,
+        after_document_id: int = 0,
+    ) -> Iterator[list[tuple[int, int, str | None, str | None, bytes | None]]]:
+        """Chunks of (document_id, source_id, content_sha256, file_type, body); body is None without with_data.
+
+        A chunk has at most chunk_size rows and, with max_bytes, ends before its bodies' decoded
+        sizes add up to more than max_bytes (a single larger body still makes a chunk of one).
+        Sizes come from content_blobs.size_bytes, so bodies are only read for rows that fit.
+        """
+        last_document_id = after_document_id
+        while True:
+            if max_bytes:
+                listed = self.session.execute(
+                    select(
+                        Document.id,
+                        Document.source_id,
+                        Source.content_sha256,
+                        Source.file_type,
+                        func.coalesce(ContentBlob.size_bytes, func.length(Source.legacy_content), 0),
+                    )
+                    .outerjoin(Source, and_(Source.id == Document.source_id, Source.tenant_id == tenant_id))
+                    .outerjoin(ContentBlob, ContentBlob.id == Source.blob_id)
+                    .where(Document.project_id == project_id, Document.tenant_id == tenant_id, Document.id > last_document_id)
+                    .order_by(Document.id)
+                    .limit(chunk_size)
+                ).all()
+                kept, total = [], 0
+                for row in listed:
+                    total += row[4]
+                    if kept and total > max_bytes:
+                        break
+                    kept.append(row)
+                if with_data:
+                    rows = self.get_project_sources(project_id, tenant_id=tenant_id, document_ids=[row[0] for row in kept])
+                else:
+                    rows = [(*row[:4], None) for row in kept]
+            else:
+                stmt = (
+                    self._project_sources_stmt(project_id, tenant_id=tenant_id, with_data=with_data)
+                    .where(Document.id > last_document_id)
+                    .order_by(Document.id)
+                    .limit(chunk_size)
+                )
+                rows = self._source_rows(stmt, with_data=with_data)
+            if not rows:
+                return
+            yield rows
+            last_document_id = rows[-1][0]
+
+    def get_project_sources(
+        self,
+        project_id: int,
+        *,
+        tenant_id: str,
+        document_ids: list[int],
+    ) -> list[tuple[int, int, str | None, str | None, bytes]]:
+        if not document_ids:
+            return []
+        stmt = self._project_sources_stmt(project_id, tenant_id=tenant_id).where(Document.id.in_(document_ids)).order_by(Document.id)
+        return self._source_rows(stmt)
+
+    def latest_batch_items(self, project_id: int, *, tenant_id: str, mode: str, document_ids: list[int]) -> dict[int, Row]:
+        """The newest item per document across this project's runs in mode, walking ix_batch_items_document_id_id."""
+        if not document_ids:
+            return {}
+        latest = (
+            select(func.max(BatchItem.id))
+            .join(BatchRun, BatchRun.id == BatchItem.batch_id)
+            .where(
+                BatchItem.document_id.in_(document_ids),
+                BatchRun.project_id == project_id,
+                BatchRun.tenant_id == tenant_id,
+                BatchRun.mode == mode,
+            )
+            .group_by(BatchItem.document_id)
+        )
+        stmt = select(
+            BatchItem.document_id,
+            BatchItem.content_sha256,
+            BatchItem.extractor_version,
+            BatchItem.extracted_chars,
+            BatchItem.error,
+            BatchItem.redactions,
+        ).where(BatchItem.id.in_(latest))
+        return {row.document_id: row for row in self.session.execute(stmt)}
+
+    def add_batch_items(self, items: list[dict]) -> None:
+        if items:
+            self.session.execute(insert(BatchItem), items)
+
     def create_batch_item(self, *, batch_id: int, document_id: int, extracted_chars: int) -> BatchItem:
         item = BatchItem(batch_id=batch_id, document_id=document_id, extracted_chars=extracted_chars)
         self.session.add(item)
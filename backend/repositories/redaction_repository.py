@@ -0,0 +1,34 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.db.models import RedactionPolicy
+
+
+class RedactionPolicyRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, *, tenant_id: str) -> RedactionPolicy | None:
+        stmt = select(RedactionPolicy).where(RedactionPolicy.tenant_id == tenant_id)
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def get_version(self, *, tenant_id: str) -> int | None:
+        # Cheap check run on every redaction; rules_json is only loaded when the cached version is stale.
+        stmt = select(RedactionPolicy.version).where(RedactionPolicy.tenant_id == tenant_id)
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def get_rules_json(self, *, tenant_id: str) -> str | None:
+        stmt = select(RedactionPolicy.rules_json).where(RedactionPolicy.tenant_id == tenant_id)
+        return self.session.execute(stmt).scalar_one_or_none()
+
+    def upsert(self, *, tenant_id: str, rules_json: str) -> RedactionPolicy:
+        row = self.get(tenant_id=tenant_id)
+        if row is None:
+            row = RedactionPolicy(tenant_id=tenant_id, rules_json=rules_json, version=1)
+            self.session.add(row)
+        else:
+            row.rules_json = rules_json
+            row.version = row.version + 1
+        self.session.commit()
+        self.session.refresh(row)
+        return row
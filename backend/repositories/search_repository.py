@@ -0,0 +1,119 @@
+import re
+
+from sqlalchemy import Row, bindparam, text
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+
+_SNIPPET_OPEN = "<mark>"
+_SNIPPET_CLOSE = "</mark>"
+
+_SQLITE_SCORE = "-bm25(source_search, 0.0, 2.0, 1.0)"
+_SQLITE_RANK = text(
+    f"""
+    SELECT rowid AS source_id, file_name, {_SQLITE_SCORE} AS score
+    FROM source_search
+    WHERE source_search MATCH :match AND tenant_id = :tenant_id
+      AND (:after_score IS NULL OR {_SQLITE_SCORE} < :after_score
+           OR ({_SQLITE_SCORE} = :after_score AND rowid > :after_id))
+    ORDER BY score DESC, rowid
+    LIMIT :limit
+    """
+)
+_SQLITE_SNIPPETS = text(
+    f"""
+    SELECT rowid, snippet(source_search, 2, '{_SNIPPET_OPEN}', '{_SNIPPET_CLOSE}', '…', 16)
+    FROM source_search
+    WHERE source_search MATCH :match AND rowid IN :source_ids
+    """
+).bindparams(bindparam("source_ids", expanding=True))
+
+_PG_RANK = text(
+    """
+    SELECT s.source_id, s.file_name, ts_rank_cd(s.document, q)::float8 AS score
+    FROM source_search s, websearch_to_tsquery(CAST(:config AS regconfig), :query) q
+    WHERE s.tenant_id = :tenant_id AND s.document @@ q
+      AND (CAST(:after_score AS float8) IS NULL OR ts_rank_cd(s.document, q)::float8 < :after_score
+           OR (ts_rank_cd(s.document, q)::float8 = :after_score AND s.source_id > :after_id))
+    ORDER BY score DESC, s.source_id
+    LIMIT :limit
+    """
+)
+_PG_SNIPPETS = text(
+    f"""
+    SELECT s.source_id, ts_headline(CAST(:config AS regconfig), s.body, q,
+        'StartSel={_SNIPPET_OPEN}, StopSel={_SNIPPET_CLOSE}, MaxWords=32, MinWords=8, MaxFragments=1')
+    FROM source_search s, websearch_to_tsquery(CAST(:config AS regconfig), :query) q
+    WHERE s.source_id IN :source_ids
+    """
+).bindparams(bindparam("source_ids", expanding=True))
+
+
+def search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query)
+
+
+def _fts5_match(query: str) -> str:
+    # Quote every term so user input can never be read as FTS5 query syntax.
+    return " ".join(f'"{term}"' for term in search_terms(query))
+
+
+class SearchRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    def index_source(self, *, source_id: int, tenant_id: str, file_name: str, body: str) -> None:
+        body = body[: settings.search_index_max_chars]
+        if self._dialect == "postgresql":
+            self.session.execute(
+                text(
+                    """
+                    INSERT INTO source_search (source_id, tenant_id, file_name, body, document)
+                    VALUES (:source_id, :tenant_id, :file_name, :body,
+                            setweight(to_tsvector(CAST(:config AS regconfig), :file_name), 'A')
+                            || setweight(to_tsvector(CAST(:config AS regconfig), :body), 'B'))
+                    ON CONFLICT (source_id) DO UPDATE
+                    SET file_name = EXCLUDED.file_name, body = EXCLUDED.body, document = EXCLUDED.document
+                    """
+                ),
+                {
+                    "source_id": source_id,
+                    "tenant_id": tenant_id,
+                    "file_name": file_name,
+                    "body": body,
+                    "config": settings.search_ts_config,
+                },
+            )
+            return
+        self.session.execute(text("DELETE FROM source_search WHERE rowid = :source_id"), {"source_id": source_id})
+        self.session.execute(
+            text("INSERT INTO source_search (rowid, tenant_id, file_name, body) VALUES (:source_id, :tenant_id, :file_name, :body)"),
+            {"source_id": source_id, "tenant_id": tenant_id, "file_name": file_name, "body": body},
+        )
+
+    def search(
+        self,
+        *,
+        tenant_id: str,
+        query: str,
+        limit: int,
+        after: tuple[float, int] | None = None,
+    ) -> list[Row]:
+        after_score, after_id = after if after else (None, None)
+        params = {"tenant_id": tenant_id, "limit": limit, "after_score": after_score, "after_id": after_id}
+        if self._dialect == "postgresql":
+            params.update(query=query, config=settings.search_ts_config)
+            return list(self.session.execute(_PG_RANK, params))
+        return list(self.session.execute(_SQLITE_RANK, {**params, "match": _fts5_match(query)}))
+
+    def snippets(self, *, source_ids: list[int], query: str) -> dict[int, str]:
+        if not source_ids:
+            return {}
+        if self._dialect == "postgresql":
+            params = {"source_ids": source_ids, "query": query, "config": settings.search_ts_config}
+            return dict(self.session.execute(_PG_SNIPPETS, params).all())
+        return dict(self.session.execute(_SQLITE_SNIPPETS, {"source_ids": source_ids, "match": _fts5_match(query)}).all())
@@ -0,0 +1,126 @@
+import re
+import zlib
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.db.models import Source, SourceLshBand, SourceSignature
+
+# Changing any of these makes stored signatures incomparable; bump them only together with a re-index.
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+_HASH_BLOCK = 8192
+
+_rng = np.random.default_rng(0x5EED)
+_PERM_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_ROLL = np.uint64(0x100000001B3)
+_EMPTY = np.iinfo(np.uint32).max
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer; numpy uint64 arithmetic wraps, which is what we want here.
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def shingle_hashes(body: str) -> np.ndarray:
+    tokens = re.findall(r"\w+", body[: settings.similarity_max_chars].lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    vocabulary = {token: zlib.crc32(token.encode("utf-8")) for token in set(tokens)}
+    ids = np.fromiter((vocabulary[token] for token in tokens), dtype=np.uint64, count=len(tokens))
+    width = min(SHINGLE_WORDS, len(ids))
+    count = len(ids) - width + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(width):
+        shingles = shingles * _ROLL + ids[offset : offset + count]
+    return np.unique(_mix(shingles))
+
+
+def minhash_signature(body: str) -> np.ndarray | None:
+    shingles = shingle_hashes(body)
+    if not len(shingles):
+        return None
+    signature = np.full(NUM_PERM, _EMPTY, dtype=np.uint32)
+    # Blocks keep the (NUM_PERM x block) hash matrix small however long the document is.
+    for start in range(0, len(shingles), _HASH_BLOCK):
+        block = shingles[start : start + _HASH_BLOCK]
+        hashed = (np.outer(_PERM_A, block) + _PERM_B[:, None]) >> np.uint64(32)
+        np.minimum(signature, hashed.min(axis=1).astype(np.uint32), out=signature)
+    return signature
+
+
+def band_buckets(signature: np.ndarray) -> list[int]:
+    rows = signature.reshape(BANDS, ROWS_PER_BAND).astype(np.uint64)
+    # Seeding with the band number keeps buckets of different bands apart, so lookups need only the bucket.
+    combined = np.arange(BANDS, dtype=np.uint64)
+    for column in range(ROWS_PER_BAND):
+        combined = combined * _ROLL + rows[:, column]
+    return _mix(combined).view(np.int64).tolist()
+
+
+def _decode(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4")
+
+
+class SimilarityRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def index_source(self, *, source_id: int, tenant_id: str, body: str) -> None:
+        self.store_signature(source_id=source_id, tenant_id=tenant_id, signature=minhash_signature(body))
+
+    def store_signature(self, *, source_id: int, tenant_id: str, signature: np.ndarray | None) -> None:
+        self.session.execute(delete(SourceLshBand).where(SourceLshBand.source_id == source_id))
+        self.session.execute(delete(SourceSignature).where(SourceSignature.source_id == source_id))
+        if signature is None:
+            return
+        self.session.add(SourceSignature(source_id=source_id, tenant_id=tenant_id, signature=signature.astype("<u4").tobytes()))
+        self.session.add_all(
+            SourceLshBand(source_id=source_id, tenant_id=tenant_id, band=band, bucket=bucket)
+            for band, bucket in enumerate(band_buckets(signature))
+        )
+
+    def get_signature(self, source_id: int, *, tenant_id: str) -> np.ndarray | None:
+        stmt = select(SourceSignature.signature).where(
+            SourceSignature.source_id == source_id,
+            SourceSignature.tenant_id == tenant_id,
+        )
+        data = self.session.execute(stmt).scalar_one_or_none()
+        return None if data is None else _decode(data)
+
+    def similar(self, source_id: int, *, tenant_id: str, min_score: float, limit: int) -> list[tuple[int, str, float]]:
+        signature = self.get_signature(source_id, tenant_id=tenant_id)
+        if signature is None:
+            return []
+        # Candidates share at least one band bucket; only they are scored, never the whole tenant.
+        candidates = (
+            select(SourceLshBand.source_id)
+            .where(
+                SourceLshBand.tenant_id == tenant_id,
+                SourceLshBand.bucket.in_(band_buckets(signature)),
+                SourceLshBand.source_id != source_id,
+            )
+            .distinct()
+            .limit(settings.similarity_max_candidates)
+        )
+        rows = self.session.execute(
+            select(SourceSignature.source_id, Source.file_name, SourceSignature.signature)
+            .join(Source, Source.id == SourceSignature.source_id)
+            .where(SourceSignature.source_id.in_(candidates))
+        ).all()
+        if not rows:
+            return []
+        matrix = np.stack([_decode(row.signature) for row in rows])
+        scores = (matrix == signature).mean(axis=1)
+        ranked = sorted(
+            ((row.source_id, row.file_name, float(score)) for row, score in zip(rows, scores) if score >= min_score),
+            key=lambda item: (-item[2], item[0]),
+        )
+        return ranked[:limit]
@@ -1,12 +1,38 @@
-from sqlalchemy import select
+import os
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from typing import Any, BinaryIO, NamedTuple
+
+import numpy as np
+
+from sqlalchemy import Row, exists, func, or_, select, update
 from sqlalchemy.orm import Session
 
-from backend.db.models import Source
+from backend.core.config import settings
+from backend.db.blob_codecs import IDENTITY, iter_decoded_range
+from backend.db.models import Base, ContentBlob, Source
+from backend.repositories.blob_repository import ContentBlobRepository
+from backend.repositories.passage_repository import PassageRepository, build_passages
+from backend.repositories.search_repository import SearchRepository
+from backend.repositories.similarity_repository import SimilarityRepository, minhash_signature
+
+
+class StoredSource(NamedTuple):
+    id: int
+    size_bytes: int
+    deduplicated: bool
+
+
+def _index_records(body: str, passage_chars: int, words: int, overlap: int) -> tuple[np.ndarray | None, list[tuple]]:
+    """The CPU-bound half of indexing a source: its MinHash signature and its passages."""
+    return minhash_signature(body), build_passages(body, max_chars=passage_chars, words=words, overlap=overlap)
 
 
 class SourceRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, *, offload: Callable[..., Any] | None = None):
+        # offload(fn, *args, tenant_id=...) runs fn elsewhere and returns its result; None runs it inline.
         self.session = session
+        self.offload = offload
 
     def create_source(
         self,
@@ -16,23 +42,305 @@ class SourceRepository:
         content: str,
         tenant_id: str,
         source_url: str | None = None,
+        fetch_etag: str | None = None,
+        fetch_last_modified: str | None = None,
     ) -> Source:
-        source = Source(
+        blob = ContentBlobRepository(self.session).acquire(tenant_id=tenant_id, data=content.encode("utf-8"))
+        return self._add_source(
+            blob,
             file_name=file_name,
             file_type=file_type,
-            content=content,
             tenant_id=tenant_id,
             source_url=source_url,
+            search_text=content,
+            fetch_etag=fetch_etag,
+            fetch_last_modified=fetch_last_modified,
+        )
+
+    def create_source_from_file(
+        self,
+        *,
+        file_name: str,
+        file_type: str,
+        fileobj: BinaryIO,
+        sha256: str,
+        tenant_id: str,
+        search_text: str = "",
+    ) -> Source:
+        size_bytes = fileobj.seek(0, os.SEEK_END)
+        blob = ContentBlobRepository(self.session).acquire_file(
+            tenant_id=tenant_id, sha256=sha256, fileobj=fileobj, size_bytes=size_bytes
+        )
+        return self._add_source(blob, file_name=file_name, file_type=file_type, tenant_id=tenant_id, search_text=search_text)
+
+    def create_sources(self, entries: list[dict], *, tenant_id: str, commit: bool = True) -> list[StoredSource]:
+        # One transaction for the whole chunk; entries carry file_name, file_type, content and source_url.
+        # Ids and sizes are read before the commit expires the rows, so nothing is re-selected.
+        # commit=False leaves the rows staged for the caller to commit along with its own writes.
+        blobs = ContentBlobRepository(self.session)
+        stored = []
+        for entry in entries:
+            blob = blobs.acquire(tenant_id=tenant_id, data=entry["content"].encode("utf-8"))
+            source = self._stage_source(
+                blob,
+                file_name=entry["file_name"],
+                file_type=entry["file_type"],
+                tenant_id=tenant_id,
+                source_url=entry.get("source_url"),
+                search_text=entry["content"],
+                fetch_etag=entry.get("fetch_etag"),
+                fetch_last_modified=entry.get("fetch_last_modified"),
+            )
+            stored.append(StoredSource(source.id, blob.size_bytes, blob.refcount > 1))
+        if commit:
+            self.session.commit()
+        return stored
+
+    def _add_source(
+        self,
+        blob: ContentBlob,
+        *,
+        file_name: str,
+        file_type: str,
+        tenant_id: str,
+        source_url: str | None = None,
+        search_text: str = "",
+        fetch_etag: str | None = None,
+        fetch_last_modified: str | None = None,
+    ) -> Source:
+        source = self._stage_source(
+            blob,
+            file_name=file_name,
+            file_type=file_type,
+            tenant_id=tenant_id,
+            source_url=source_url,
+            search_text=search_text,
+            fetch_etag=fetch_etag,
+            fetch_last_modified=fetch_last_modified,
         )
-        self.session.add(source)
         self.session.commit()
         self.session.refresh(source)
         return source
 
+    def _stage_source(
+        self,
+        blob: ContentBlob,
+        *,
+        file_name: str,
+        file_type: str,
+        tenant_id: str,
+        source_url: str | None = None,
+        search_text: str = "",
+        fetch_etag: str | None = None,
+        fetch_last_modified: str | None = None,
+    ) -> Source:
+        source = Source(
+            file_name=file_name,
+            file_type=file_type,
+            blob=blob,
+            content_sha256=blob.sha256,
+            tenant_id=tenant_id,
+            source_url=source_url,
+            fetch_etag=fetch_etag,
+            fetch_last_modified=fetch_last_modified,
+            fetched_at=datetime.now(UTC) if source_url else None,
+        )
+        self.session.add(source)
+        self.session.flush()
+        self._index(source, body=search_text)
+        return source
+
+    def _index(self, source: Source, *, body: str) -> None:
+        SearchRepository(self.session).index_source(
+            source_id=source.id,
+            tenant_id=source.tenant_id,
+            file_name=source.file_name,
+            body=body,
+        )
+        # Only the prefix either index reads is handed over, so a process worker is not sent the whole body.
+        args = (
+            body[: max(settings.similarity_max_chars, settings.passage_index_max_chars)],
+            settings.passage_index_max_chars,
+            settings.passage_words,
+            settings.passage_overlap_words,
+        )
+        if self.offload is None:
+            signature, passages = _index_records(*args)
+        else:
+            signature, passages = self.offload(_index_records, *args, tenant_id=source.tenant_id)
+        SimilarityRepository(self.session).store_signature(source_id=source.id, tenant_id=source.tenant_id, signature=signature)
+        PassageRepository(self.session).store_passages(source_id=source.id, tenant_id=source.tenant_id, passages=passages)
+
+    def reindex_source(self, source: Source, *, search_text: str) -> None:
+        self._index(source, body=search_text)
+        self.session.commit()
+
+    def list_refresh_targets(
+        self,
+        *,
+        tenant_id: str,
+        limit: int,
+        after_id: int = 0,
+        fetched_before: datetime | None = None,
+    ) -> list[Row]:
+        stmt = select(
+            Source.id,
+            Source.source_url,
+            Source.fetch_etag,
+            Source.fetch_last_modified,
+            Source.content_sha256,
+        ).where(Source.tenant_id == tenant_id, Source.source_url.is_not(None), Source.id > after_id)
+        if fetched_before is not None:
+            stmt = stmt.where(or_(Source.fetched_at.is_(None), Source.fetched_at < fetched_before))
+        return list(self.session.execute(stmt.order_by(Source.id).limit(limit)))
+
+    def tenants_due_for_refresh(self, *, fetched_before: datetime) -> list[str]:
+        stmt = (
+            select(Source.tenant_id)
+            .where(Source.source_url.is_not(None), or_(Source.fetched_at.is_(None), Source.fetched_at < fetched_before))
+            .distinct()
+        )
+        return list(self.session.execute(stmt).scalars())
+
+    def mark_fetched(self, source_id: int, *, etag: str | None, last_modified: str | None) -> None:
+        self.session.execute(
+            update(Source)
+            .where(Source.id == source_id)
+            .values(fetch_etag=etag, fetch_last_modified=last_modified, fetched_at=datetime.now(UTC))
+            .execution_options(synchronize_session=False)
+        )
+
+    def replace_content(
+        self,
+        source_id: int,
+        *,
+        tenant_id: str,
+        content: str,
+        etag: str | None,
+        last_modified: str | None,
+    ) -> ContentBlob:
+        source = self.get_source(source_id, tenant_id=tenant_id)
+        blobs = ContentBlobRepository(self.session)
+        blob = blobs.acquire(tenant_id=tenant_id, data=content.encode("utf-8"))
+        previous_blob_id = source.blob_id
+        source.blob = blob
+        source.content_sha256 = blob.sha256
+        source.legacy_content = ""
+        source.fetch_etag = etag
+        source.fetch_last_modified = last_modified
+        source.fetched_at = datetime.now(UTC)
+        self.session.flush()
+        if previous_blob_id is not None:
+            # Only after the flush has repointed the source, so the old blob is no longer referenced.
+            blobs.release(previous_blob_id)
+        self._index(source, body=content)
+        return blob
+
     def get_source(self, source_id: int, *, tenant_id: str) -> Source | None:
         stmt = select(Source).where(Source.id == source_id, Source.tenant_id == tenant_id)
         return self.session.execute(stmt).scalar_one_or_none()
 
-    def list_sources(self, *, tenant_id: str) -> list[Source]:
-        stmt = select(Source).where(Source.tenant_id == tenant_id).order_by(Source.id.desc())
-        return list(self.session.execute(stmt).scalars())
+    def list_unindexed_sources(
+        self,
+        index: type[Base],
+        *,
+        limit: int,
+        after_id: int = 0,
+        tenant_id: str | None = None,
+    ) -> list[Row]:
+        """(id, tenant_id, file_type) of sources without any row in index (a table keyed by source_id), in id order."""
+        stmt = select(Source.id, Source.tenant_id, Source.file_type).where(
+            Source.id > after_id,
+            ~exists().where(index.source_id == Source.id),
+        )
+        if tenant_id is not None:
+            stmt = stmt.where(Source.tenant_id == tenant_id)
+        return list(self.session.execute(stmt.order_by(Source.id).limit(limit)))
+
+    def list_sources(self, *, tenant_id: str, limit: int, before_id: int | None = None) -> list[Row]:
+        stmt = select(Source.id, Source.file_name, Source.file_type, Source.created_at).where(Source.tenant_id == tenant_id)
+        if before_id is not None:
+            stmt = stmt.where(Source.id < before_id)
+        return list(self.session.execute(stmt.order_by(Source.id.desc()).limit(limit + 1)))
+
+    def get_content_info(self, source_id: int, *, tenant_id: str) -> tuple[str, int] | None:
+        stmt = (
+            select(Source.file_type, Source.blob_id, ContentBlob.size_bytes)
+            .outerjoin(ContentBlob, ContentBlob.id == Source.blob_id)
+            .where(Source.id == source_id, Source.tenant_id == tenant_id)
+        )
+        row = self.session.execute(stmt).one_or_none()
+        if row is None:
+            return None
+        file_type, blob_id, size_bytes = row
+        if blob_id is None:
+            return file_type, len(self._legacy_bytes(source_id))
+        return file_type, size_bytes
+
+    def read_content_range(self, source_id: int, *, tenant_id: str, offset: int, length: int) -> bytes:
+        # Uncompressed blobs are sliced in SQL; compressed ones have to be inflated up to the window.
+        stmt = (
+            select(Source.blob_id, ContentBlob.codec, func.substr(ContentBlob.data, offset + 1, length))
+            .outerjoin(ContentBlob, ContentBlob.id == Source.blob_id)
+            .where(Source.id == source_id, Source.tenant_id == tenant_id)
+        )
+        row = self.session.execute(stmt).one_or_none()
+        if row is None:
+            return b""
+        blob_id, codec, window = row
+        if blob_id is None:
+            return self._legacy_bytes(source_id)[offset : offset + length]
+        if codec != IDENTITY:
+            return b"".join(
+                iter_decoded_range(codec, self._blob_data(blob_id), offset=offset, length=length, chunk_bytes=length)
+            )
+        return bytes(window or b"")
+
+    def iter_content_range(
+        self,
+        source_id: int,
+        *,
+        tenant_id: str,
+        offset: int,
+        length: int,
+        chunk_bytes: int,
+    ) -> Iterator[bytes]:
+        stmt = (
+            select(Source.blob_id, ContentBlob.codec)
+            .outerjoin(ContentBlob, ContentBlob.id == Source.blob_id)
+            .where(Source.id == source_id, Source.tenant_id == tenant_id)
+        )
+        row = self.session.execute(stmt).one_or_none()
+        if row is None:
+            return
+        blob_id, codec = row
+        if blob_id is not None and codec != IDENTITY:
+            # One pass over the compressed body; re-inflating from the start per window would be quadratic.
+            yield from iter_decoded_range(
+                codec,
+                self._blob_data(blob_id),
+                offset=offset,
+                length=length,
+                chunk_bytes=chunk_bytes,
+            )
+            return
+
+        position, end = offset, offset + length
+        while position < end:
+            window = self.read_content_range(
+                source_id,
+                tenant_id=tenant_id,
+                offset=position,
+                length=min(chunk_bytes, end - position),
+            )
+            if not window:
+                return
+            position += len(window)
+            yield window
+
+    def _blob_data(self, blob_id: int) -> bytes:
+        return self.session.execute(select(ContentBlob.data).where(ContentBlob.id == blob_id)).scalar_one()
+
+    def _legacy_bytes(self, source_id: int) -> bytes:
+        stmt = select(Source.legacy_content).where(Source.id == source_id)
+        return (self.session.execute(stmt).scalar_one() or "").encode("utf-8")
@@ -0,0 +1,216 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from time import monotonic
+
+from backend.core.config import settings
+from backend.models import ExtractMode
+from backend.services import redis_resp
+from backend.services.extractors import EXTRACTOR_VERSION
+from backend.services.logging_utils import log_event
+from backend.services.metrics_service import observe_extract_cache
+
+
+class ExtractionCacheBackend:
+    def get(self, key: str) -> str | None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items: Sequence[tuple[str, str]]) -> None:
+        for key, value in items:
+            self.set(key, value)
+
+
+class InMemoryExtractionCache(ExtractionCacheBackend):
+    def __init__(self, *, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                observe_extract_cache("eviction")
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisExtractionCache(ExtractionCacheBackend):
+    def __init__(self, *, url: str, ttl_s: int, local: InMemoryExtractionCache, cooldown_s: float = 30.0):
+        self.url = url
+        self.ttl_s = ttl_s
+        self.local = local
+        self.cooldown_s = cooldown_s
+        self._connection = redis_resp.RedisConnection(url)
+        # After a failure Redis is skipped until this monotonic time, so an outage costs one timeout, not one per key.
+        self._down_until = 0.0
+
+    def _execute(self, op: str, *commands: tuple[str, ...]) -> list | None:
+        if monotonic() < self._down_until:
+            return None
+        try:
+            return self._connection.execute(*commands)
+        except Exception as exc:
+            self._down_until = monotonic() + self.cooldown_s
+            log_event("extract_cache_redis_fallback", op=op, reason=str(exc), cooldown_s=self.cooldown_s)
+            return None
+
+    def get(self, key: str) -> str | None:
+        return self.get_many([key])[0]
+
+    def set(self, key: str, value: str) -> None:
+        self.set_many([(key, value)])
+
+    def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        values = [self.local.get(key) for key in keys]
+        missing = [index for index, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+        replies = self._execute("get", ("MGET", *(f"extract:{keys[index]}" for index in missing)))
+        if replies is None:
+            return values
+        for index, value in zip(missing, replies[0]):
+            if value is not None:
+                self.local.set(keys[index], value)
+                values[index] = value
+        return values
+
+    def set_many(self, items: Sequence[tuple[str, str]]) -> None:
+        for key, value in items:
+            self.local.set(key, value)
+        if items:
+            self._execute("set", *(("SET", f"extract:{key}", value, "EX", str(self.ttl_s)) for key, value in items))
+
+
+_cache: ExtractionCacheBackend | None = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCacheBackend:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                local = InMemoryExtractionCache(max_bytes=settings.extract_cache_max_bytes)
+                if settings.extract_cache_backend == "redis":
+                    _cache = RedisExtractionCache(
+                        url=settings.extract_cache_redis_url,
+                        ttl_s=settings.extract_cache_ttl_s,
+                        local=local,
+                        cooldown_s=settings.extract_cache_redis_cooldown_s,
+                    )
+                else:
+                    _cache = local
+    return _cache
+
+
+def reset_extraction_cache() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def cache_key(content_sha256: str, mode: ExtractMode, parser: str = "text", summary_chars: int | None = None) -> str:
+    # Summaries of different lengths are different results for the same body.
+    variant = f"{mode}@{summary_chars}" if mode == "summary" and summary_chars is not None else mode
+    return f"{EXTRACTOR_VERSION}:{parser}:{variant}:{content_sha256}"
+
+
+def lookup(
+    content_sha256: str | None,
+    mode: ExtractMode,
+    parser: str = "text",
+    summary_chars: int | None = None,
+) -> str | None:
+    if content_sha256 is None:
+        return None
+    value = get_extraction_cache().get(cache_key(content_sha256, mode, parser, summary_chars))
+    observe_extract_cache("hit" if value is not None else "miss")
+    return value
+
+
+def store(
+    content_sha256: str | None,
+    mode: ExtractMode,
+    value: str,
+    parser: str = "text",
+    summary_chars: int | None = None,
+) -> None:
+    if content_sha256 is not None:
+        get_extraction_cache().set(cache_key(content_sha256, mode, parser, summary_chars), value)
+
+
+def lookup_many(
+    entries: Sequence[tuple[str | None, str]],
+    mode: ExtractMode,
+    summary_chars: int | None = None,
+) -> list[str | None]:
+    """Like lookup for each (content_sha256, parser), in one round trip to the shared tier."""
+    keyed = [index for index, (content_sha256, _) in enumerate(entries) if content_sha256 is not None]
+    values: list[str | None] = [None] * len(entries)
+    found = get_extraction_cache().get_many(
+        [cache_key(entries[index][0], mode, entries[index][1], summary_chars) for index in keyed]
+    )
+    for index, value in zip(keyed, found):
+        values[index] = value
+        observe_extract_cache("hit" if value is not None else "miss")
+    return values
+
+
+def store_many(
+    entries: Sequence[tuple[str | None, str, str]],
+    mode: ExtractMode,
+    summary_chars: int | None = None,
+) -> None:
+    """Like store for each (content_sha256, parser, value), in one round trip to the shared tier."""
+    get_extraction_cache().set_many(
+        [
+            (cache_key(content_sha256, mode, parser, summary_chars), value)
+            for content_sha256, parser, value in entries
+            if content_sha256 is not None
+        ]
+    )
+
+
+def cached_extract(
+    content_sha256: str | None,
+    mode: ExtractMode,
+    extract: Callable[[], str],
+    *,
+    parser: str = "text",
+    summary_chars: int | None = None,
+) -> str:
+    value = lookup(content_sha256, mode, parser, summary_chars)
+    if value is None:
+        value = extract()
+        store(content_sha256, mode, value, parser, summary_chars)
+    return value
@@ -0,0 +1,166 @@
+import signal
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from io import BytesIO
+
+from backend.models import ExtractMode
+from backend.services.errors import ServiceError
+from backend.services.summarizer import MAX_INPUT_CHARS, summarize
+
+# Bump whenever parser output changes so cached results keyed on the old version are ignored.
+EXTRACTOR_VERSION = "3"
+SUMMARY_CHARS = 400
+
+PageIterator = Callable[[bytes], Iterator[str]]
+
+
+class ParserUnavailable(Exception):
+    pass
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+def parse_error(exc: BaseException, parser: str) -> ServiceError:
+    if isinstance(exc, ParseTimeout) or (isinstance(exc, ServiceError) and exc.code == "task_timeout"):
+        return ServiceError(code="extract_timeout", message="Extraction timeout", details={"parser": parser})
+    if isinstance(exc, ServiceError):
+        return exc
+    if isinstance(exc, ParserUnavailable):
+        return ServiceError(code="parser_unavailable", message="No parser available for file type", details={"parser": parser})
+    return ServiceError(code="parse_failed", message="Document could not be parsed", details={"parser": parser})
+
+
+def extract_text(content: str, mode: ExtractMode, summary_chars: int = SUMMARY_CHARS) -> str:
+    return summarize(content, max_chars=summary_chars) if mode == "summary" else content
+
+
+def _iter_text(data: bytes) -> Iterator[str]:
+    yield data.decode("utf-8", errors="replace")
+
+
+def _iter_pdf_pages(data: bytes) -> Iterator[str]:
+    try:
+        import pdfplumber
+    except ImportError as exc:
+        raise ParserUnavailable("pdfplumber is not installed") from exc
+
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+            # Drop the page's parsed layout objects before moving on.
+            page.close()
+
+
+def _iter_docx_blocks(data: bytes) -> Iterator[str]:
+    try:
+        import docx
+    except ImportError as exc:
+        raise ParserUnavailable("python-docx is not installed") from exc
+
+    document = docx.Document(BytesIO(data))
+    for paragraph in document.paragraphs:
+        if paragraph.text:
+            yield paragraph.text
+    for table in document.tables:
+        for row in table.rows:
+            yield "\t".join(cell.text for cell in row.cells)
+
+
+def _iter_xlsx_rows(data: bytes) -> Iterator[str]:
+    try:
+        import openpyxl
+    except ImportError as exc:
+        raise ParserUnavailable("openpyxl is not installed") from exc
+
+    workbook = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            for row in sheet.iter_rows(values_only=True):
+                if any(value is not None for value in row):
+                    yield "\t".join("" if value is None else str(value) for value in row)
+    finally:
+        workbook.close()
+
+
+PARSERS: dict[str, PageIterator] = {
+    "text": _iter_text,
+    "pdf": _iter_pdf_pages,
+    "docx": _iter_docx_blocks,
+    "xlsx": _iter_xlsx_rows,
+}
+
+FILE_TYPE_PARSERS: dict[str, str] = {
+    "pdf": "pdf",
+    "application/pdf": "pdf",
+    "docx": "docx",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "xlsx": "xlsx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+}
+
+_SIGNATURES = {
+    "pdf": b"%PDF",
+    "docx": b"PK\x03\x04",
+    "xlsx": b"PK\x03\x04",
+}
+
+
+def register_parser(name: str, pages: PageIterator, *file_types: str, signature: bytes | None = None) -> None:
+    PARSERS[name] = pages
+    for file_type in file_types:
+        FILE_TYPE_PARSERS[file_type.strip().lower()] = name
+    if signature:
+        _SIGNATURES[name] = signature
+
+
+def parser_for(file_type: str | None) -> str:
+    return FILE_TYPE_PARSERS.get((file_type or "").strip().lower(), "text")
+
+
+@contextmanager
+def _deadline(timeout_s: float | None):
+    # SIGALRM only works on the main thread, which is where process-pool workers run tasks.
+    if not timeout_s or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _expire(*_):
+        raise ParseTimeout(f"parsing exceeded {timeout_s}s")
+
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def iter_pages(data: bytes, parser: str) -> Iterator[str]:
+    signature = _SIGNATURES.get(parser)
+    if signature and not data.startswith(signature):
+        # Text bodies posted through the JSON upload with a binary file_type.
+        parser = "text"
+    return PARSERS[parser](data)
+
+
+def parse_document(
+    data: bytes,
+    parser: str,
+    mode: ExtractMode,
+    timeout_s: float | None = None,
+    summary_chars: int = SUMMARY_CHARS,
+) -> str:
+    parts: list[str] = []
+    size = 0
+    # The summarizer runs inside the deadline too, so a summary costs at most one parse timeout.
+    with _deadline(timeout_s):
+        for page in iter_pages(data, parser):
+            parts.append(page)
+            size += len(page) + 1
+            if mode == "summary" and size >= MAX_INPUT_CHARS:
+                break
+        return extract_text("\n".join(parts), mode, summary_chars)
@@ -0,0 +1,304 @@
+import asyncio
+import ssl
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import aclosing, suppress
+from dataclasses import dataclass
+from time import monotonic
+from typing import TypeVar
+from urllib.parse import urljoin, urlsplit
+
+from backend.core.config import settings
+from backend.services.errors import ServiceError
+from backend.services.security import ResolvedUrl, resolve_public_http_url
+
+T = TypeVar("T")
+Resolver = Callable[[str], Awaitable[ResolvedUrl]]
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+_READ_CHUNK_BYTES = 16384
+_MAX_HEADERS = 100
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class _StaleConnection(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    truncated: bool
+
+
+class _Connection:
+    def __init__(self, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class HttpConnectionPool:
+    def __init__(self, *, max_idle_per_host: int, idle_timeout_s: float):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout_s = idle_timeout_s
+        self.loop = asyncio.get_running_loop()
+        self._idle: dict[tuple, list[_Connection]] = defaultdict(list)
+        self._ssl = ssl.create_default_context()
+        self.connections_opened = 0
+
+    async def acquire(self, target: ResolvedUrl) -> tuple[_Connection, bool]:
+        now = monotonic()
+        for address in target.addresses:
+            idle = self._idle.get((target.scheme, target.host, target.port, address))
+            while idle:
+                connection = idle.pop()
+                if now - connection.idle_since < self.idle_timeout_s and not connection.reader.at_eof():
+                    return connection, True
+                connection.close()
+
+        last_error: OSError | None = None
+        for address in target.addresses:
+            try:
+                # Connect to the validated address; the hostname only goes into SNI and Host.
+                reader, writer = await asyncio.open_connection(
+                    address,
+                    target.port,
+                    ssl=self._ssl if target.scheme == "https" else None,
+                    server_hostname=target.host if target.scheme == "https" else None,
+                )
+            except OSError as exc:
+                last_error = exc
+                continue
+            self.connections_opened += 1
+            return _Connection((target.scheme, target.host, target.port, address), reader, writer), False
+        raise last_error or OSError("no address to connect to")
+
+    def release(self, connection: _Connection) -> None:
+        idle = self._idle[connection.key]
+        if len(idle) >= self.max_idle_per_host:
+            connection.close()
+            return
+        connection.idle_since = monotonic()
+        idle.append(connection)
+
+    async def close(self) -> None:
+        connections = [connection for idle in self._idle.values() for connection in idle]
+        self._idle.clear()
+        for connection in connections:
+            connection.close()
+            with suppress(Exception):
+                await connection.writer.wait_closed()
+
+
+_pool: HttpConnectionPool | None = None
+
+
+def get_http_pool() -> HttpConnectionPool:
+    global _pool
+    # Streams belong to the loop that opened them; a new loop (tests, worker restarts) gets a new pool.
+    if _pool is None or _pool.loop is not asyncio.get_running_loop():
+        _pool = HttpConnectionPool(
+            max_idle_per_host=settings.url_pool_max_idle_per_host,
+            idle_timeout_s=settings.url_pool_idle_timeout_s,
+        )
+    return _pool
+
+
+async def close_http_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None and pool.loop is asyncio.get_running_loop():
+        await pool.close()
+
+
+def _request_bytes(target: ResolvedUrl, extra_headers: dict[str, str]) -> bytes:
+    parsed = urlsplit(target.url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path = f"{path}?{parsed.query}"
+    lines = [
+        f"GET {path} HTTP/1.1",
+        f"Host: {parsed.netloc.rpartition('@')[2]}",
+        "User-Agent: DocuHub",
+        "Accept: */*",
+        "Accept-Encoding: identity",
+        "Connection: keep-alive",
+        *(f"{name}: {value}" for name, value in extra_headers.items()),
+    ]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[int, dict[str, str], bool]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise _StaleConnection()
+    version, _, rest = status_line.decode("latin-1").strip().partition(" ")
+    status_text = rest.partition(" ")[0]
+    if not version.startswith("HTTP/1.") or not status_text.isdigit():
+        raise ProtocolError(f"malformed status line: {status_line[:64]!r}")
+
+    headers: dict[str, str] = {}
+    for _ in range(_MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n"):
+            break
+        if not line:
+            raise ProtocolError("connection closed inside headers")
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep:
+            raise ProtocolError("malformed header line")
+        name = name.strip().lower()
+        headers[name] = f"{headers[name]}, {value.strip()}" if name in headers else value.strip()
+    else:
+        raise ProtocolError("too many response headers")
+
+    keep_alive = version == "HTTP/1.1" and "close" not in headers.get("connection", "").lower()
+    return int(status_text), headers, keep_alive
+
+
+def _bodyless(status: int) -> bool:
+    return status in (204, 304) or 100 <= status < 200
+
+
+async def _iter_body(reader: asyncio.StreamReader, status: int, headers: dict[str, str]) -> AsyncIterator[bytes]:
+    if _bodyless(status):
+        return
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size_line = await reader.readline()
+            try:
+                remaining = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise ProtocolError("malformed chunk size")
+            if remaining == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            while remaining:
+                data = await reader.readexactly(min(remaining, _READ_CHUNK_BYTES))
+                remaining -= len(data)
+                yield data
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        try:
+            remaining = int(headers["content-length"])
+        except ValueError:
+            raise ProtocolError("malformed content-length")
+        while remaining:
+            data = await reader.read(min(remaining, _READ_CHUNK_BYTES))
+            if not data:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(data)
+            yield data
+    else:
+        while data := await reader.read(_READ_CHUNK_BYTES):
+            yield data
+
+
+def _framed(status: int, headers: dict[str, str]) -> bool:
+    return _bodyless(status) or "content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower()
+
+
+async def _exchange(
+    pool: HttpConnectionPool,
+    target: ResolvedUrl,
+    max_bytes: int,
+    extra_headers: dict[str, str],
+) -> tuple[int, dict[str, str], bytes, bool]:
+    while True:
+        connection, reused = await pool.acquire(target)
+        try:
+            connection.writer.write(_request_bytes(target, extra_headers))
+            await connection.writer.drain()
+            status, headers, keep_alive = await _read_head(connection.reader)
+            break
+        except (_StaleConnection, ConnectionError) as exc:
+            connection.close()
+            # The origin may drop an idle keep-alive connection at any time; retry once fresh.
+            if not reused:
+                raise ProtocolError("connection closed before response") from exc
+        except BaseException:
+            connection.close()
+            raise
+
+    body = bytearray()
+    truncated = False
+    try:
+        async with aclosing(_iter_body(connection.reader, status, headers)) as chunks:
+            async for chunk in chunks:
+                room = max_bytes - len(body)
+                body += chunk[:room]
+                if len(chunk) > room:
+                    truncated = True
+                    break
+    except BaseException:
+        connection.close()
+        raise
+
+    if truncated or not keep_alive or not _framed(status, headers):
+        connection.close()
+    else:
+        pool.release(connection)
+    return status, headers, bytes(body), truncated
+
+
+async def fetch(
+    url: str,
+    *,
+    max_bytes: int,
+    timeout_s: float,
+    resolve: Resolver | None = None,
+    headers: dict[str, str] | None = None,
+) -> FetchResult:
+    resolve = resolve or resolve_public_http_url
+    request_headers = dict(headers or {})
+    pool = get_http_pool()
+    try:
+        async with asyncio.timeout(timeout_s):
+            for _ in range(settings.url_max_redirects + 1):
+                # Every hop is resolved and checked again, so a redirect cannot reach a private address.
+                target = await resolve(url)
+                status, headers, body, truncated = await _exchange(pool, target, max_bytes, request_headers)
+                if status in _REDIRECT_STATUSES and headers.get("location"):
+                    url = urljoin(url, headers["location"])
+                    continue
+                if status >= 400:
+                    raise ServiceError(code="network_http_error", message="HTTP error while downloading", details={"status": status})
+                return FetchResult(url=url, status=status, headers=headers, body=body, truncated=truncated)
+    except TimeoutError:
+        raise ServiceError(code="network_timeout", message="Download timeout")
+    except (OSError, ProtocolError, asyncio.IncompleteReadError, ValueError) as exc:
+        # ValueError: StreamReader.readline() rejects lines over its buffer limit.
+        raise ServiceError(code="network_url_error", message="Network error while downloading", details={"reason": str(exc)})
+    raise ServiceError(
+        code="network_too_many_redirects",
+        message="Too many redirects while downloading",
+        details={"max_redirects": settings.url_max_redirects},
+    )
+
+
+async def gather_capped(calls: Sequence[tuple[str, Callable[[], Awaitable[T]]]]) -> list[T | ServiceError]:
+    # calls are (url, fetch) pairs; at most URL_BATCH_CONCURRENCY run at once, URL_BATCH_PER_HOST_CONCURRENCY per host.
+    total = asyncio.Semaphore(settings.url_batch_concurrency)
+    per_host: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(settings.url_batch_per_host_concurrency))
+
+    async def _run(url: str, call: Callable[[], Awaitable[T]]) -> T | ServiceError:
+        # Host slot first, so a host at its cap never holds one of the global slots while waiting.
+        async with per_host[(urlsplit(url).hostname or "").lower()], total:
+            try:
+                return await call()
+            except ServiceError as exc:
+                return exc
+
+    return list(await asyncio.gather(*(_run(url, call) for url, call in calls)))
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Any
+
+from backend.core.config import settings
+
+JobEvent = tuple[int, str, dict]
+
+# The last event of every job; subscribers stop after it.
+TERMINAL_EVENT = "result"
+
+
+class _Channel:
+    def __init__(self, history: int, first_seq: int = 1):
+        self.events: deque[JobEvent] = deque(maxlen=history)
+        self.next_seq = first_seq
+        self.closed = False
+        self.subscribers: set["JobSubscription"] = set()
+
+
+class JobSubscription:
+    """One reader of a job's events; wakes on publish instead of polling."""
+
+    def __init__(self, hub: "JobEventHub", job_id: int, channel: _Channel, after: int):
+        self.job_id = job_id
+        self.last_seq = after
+        self._hub = hub
+        self._channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # The subscriber's loop is gone; close() will drop it.
+
+    async def next(self, timeout: float | None = None) -> list[JobEvent]:
+        """Events published after the last one returned; empty when timeout passes first."""
+        events = self._hub._since(self._channel, self.last_seq)
+        if not events:
+            self._ready.clear()
+            events = self._hub._since(self._channel, self.last_seq)
+        if not events:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return []
+            events = self._hub._since(self._channel, self.last_seq)
+        if events:
+            self.last_seq = events[-1][0]
+        return events
+
+    def close(self) -> None:
+        self._hub._unsubscribe(self._channel, self)
+
+
+class JobEventHub:
+    """In-process fan-out of job events.
+
+    Each job has a bounded ring of recent events with consecutive ids. Publishing appends once and
+    wakes every subscriber, and subscribers read from the ring at their own pace. A subscriber more
+    than ``history`` events behind sees a gap in the ids, but the final result is always the newest
+    event, so it is never lost. About ``max_jobs`` channels are kept: finished jobs are dropped
+    first, and a channel with subscribers is never dropped, so the cap can be exceeded while every
+    channel is being read. A channel created again after eviction continues above every id the hub
+    has handed out, so a reconnecting client's ``Last-Event-ID`` never matches an older event.
+    """
+
+    def __init__(self, *, history: int = 1000, max_jobs: int = 256):
+        self.history = history
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._channels: OrderedDict[int, _Channel] = OrderedDict()
+        # Highest next_seq of any evicted channel; new channels start from it.
+        self._evicted_seq = 1
+
+    def _channel(self, job_id: int) -> _Channel:
+        channel = self._channels.get(job_id)
+        if channel is None:
+            channel = self._channels[job_id] = _Channel(self.history, self._evicted_seq)
+            self._evict()
+        self._channels.move_to_end(job_id)
+        return channel
+
+    def _evict(self) -> None:
+        excess = len(self._channels) - self.max_jobs
+        if excess <= 0:
+            return
+        # The newest channel is the one being created and is never a victim.
+        idle = [(job_id, channel) for job_id, channel in list(self._channels.items())[:-1] if not channel.subscribers]
+        for job_id, channel in sorted(idle, key=lambda entry: not entry[1].closed)[:excess]:
+            self._evicted_seq = max(self._evicted_seq, channel.next_seq)
+            del self._channels[job_id]
+
+    def publish(self, job_id: int, event: str, data: dict[str, Any]) -> int:
+        with self._lock:
+            channel = self._channel(job_id)
+            seq = channel.next_seq
+            channel.next_seq += 1
+            channel.events.append((seq, event, data))
+            if event == TERMINAL_EVENT:
+                channel.closed = True
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            subscriber._wake()
+        return seq
+
+    def subscribe(self, job_id: int, *, after: int = 0) -> JobSubscription:
+        """Must be called from the event loop that will read the subscription."""
+        with self._lock:
+            channel = self._channel(job_id)
+            subscription = JobSubscription(self, job_id, channel, after)
+            channel.subscribers.add(subscription)
+        return subscription
+
+    def _since(self, channel: _Channel, after: int) -> list[JobEvent]:
+        with self._lock:
+            events = channel.events
+            if not events or events[-1][0] <= after:
+                return []
+            # Ids are consecutive, so the unread events are the tail; deque indexing is cheap near the right end.
+            size = len(events)
+            return [events[index] for index in range(max(0, size - (events[-1][0] - after)), size)]
+
+    def _unsubscribe(self, channel: _Channel, subscription: JobSubscription) -> None:
+        with self._lock:
+            channel.subscribers.discard(subscription)
+
+    def subscriber_count(self, job_id: int) -> int:
+        with self._lock:
+            channel = self._channels.get(job_id)
+            return len(channel.subscribers) if channel else 0
+
+
+_hub: JobEventHub | None = None
+_hub_lock = threading.Lock()
+
+
+def get_job_events() -> JobEventHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = JobEventHub(history=settings.job_events_history, max_jobs=settings.job_events_max_jobs)
+    return _hub
+
+
+def reset_job_events() -> None:
+    global _hub
+    with _hub_lock:
+        _hub = None
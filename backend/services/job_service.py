@@ -0,0 +1,287 @@
+import json
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.db.models import BackgroundJob
+from backend.models import ExtractMode
+from backend.repositories.background_job_repository import BackgroundJobRepository
+from backend.repositories.source_repository import SourceRepository
+from backend.services import product_service, source_service, url_refresh_service
+from backend.services.audit_service import record_audit_event
+from backend.services.errors import ServiceError
+from backend.services.job_events import get_job_events
+from backend.services.logging_utils import log_event
+from backend.services.scheduler import PRIORITY_CLASSES
+
+JobHandler = Callable[[Session, BackgroundJob, dict], dict]
+
+
+def _repo(session: Session) -> BackgroundJobRepository:
+    return BackgroundJobRepository(session)
+
+
+class _JobProgress:
+    """Publishes a job's item results and done/total counts to in-process event subscribers."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.total = self.done = 0
+        self._hub = get_job_events()
+
+    def restart(self, total: int) -> None:
+        self.total, self.done = total, 0
+        self.publish()
+
+    def item(self, item: dict) -> None:
+        self._hub.publish(self.job_id, "item", item)
+        self.done += 1
+
+    def publish(self) -> None:
+        self._hub.publish(self.job_id, "progress", {"job_id": self.job_id, "done": self.done, "total": self.total})
+
+
+def _run_project_batch_extract(session: Session, job: BackgroundJob, payload: dict) -> dict:
+    actor_id = payload.get("actor_id", "system")
+    if "batch_id" in payload:
+        progress = _JobProgress(job.id)
+
+        def _relay(kind: str, event: dict) -> None:
+            # A resumed run re-yields its recorded items first, so counting restarts from 0 at each "batch".
+            if kind == "batch":
+                progress.restart(event["total"])
+            elif kind == "item":
+                progress.item(event)
+                if progress.done % settings.batch_chunk_size == 0 or progress.done == progress.total:
+                    progress.publish()
+
+        # A job re-claimed after its worker died continues the same run from its last checkpoint.
+        # The stored result is the summary only; items are paged from GET .../batches/{batch_id}/items.
+        return product_service.execute_batch_run(
+            session,
+            batch_id=payload["batch_id"],
+            tenant_id=job.tenant_id,
+            actor_id=actor_id,
+            on_event=_relay,
+            with_items=False,
+        )
+    return product_service.run_project_batch_extract(
+        session,
+        project_id=payload["project_id"],
+        mode=payload["mode"],
+        tenant_id=job.tenant_id,
+        actor_id=actor_id,
+        summary_chars=payload.get("summary_chars"),
+        incremental=payload.get("incremental", False),
+    )
+
+
+def _run_url_batch_ingest(session: Session, job: BackgroundJob, payload: dict) -> dict:
+    job_id, worker_id = job.id, job.lease_owner
+    # A job re-claimed after its worker died skips the chunks whose sources and checkpoint committed together.
+    recorded = json.loads(job.checkpoint_json)["items"] if job.checkpoint_json else []
+    if recorded:
+        log_event("url_batch_resumed", job_id=job_id, processed=len(recorded))
+    progress = _JobProgress(job_id)
+    progress.restart(len(payload["urls"]))
+
+    def _relay(items: list[dict]) -> None:
+        for item in items:
+            progress.item(item)
+        progress.publish()
+
+    _relay(recorded)
+    done = list(recorded)
+
+    def _checkpoint(items: list[dict]) -> None:
+        if not _repo(session).checkpoint_job(job_id=job_id, worker_id=worker_id, checkpoint={"items": done + items}):
+            raise ServiceError(code="job_lease_lost", message="Job was re-claimed by another worker", details={"job_id": job_id})
+        done.extend(items)
+
+    return source_service.run_url_batch_ingest(
+        session,
+        urls=payload["urls"],
+        tenant_id=job.tenant_id,
+        on_items=_relay,
+        recorded=recorded,
+        checkpoint=_checkpoint,
+    )
+
+
+def _run_url_source_refresh(session: Session, job: BackgroundJob, payload: dict) -> dict:
+    return url_refresh_service.run_url_source_refresh(session, tenant_id=job.tenant_id, max_age_s=payload.get("max_age_s", 0))
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    "project_batch_extract": _run_project_batch_extract,
+    "url_batch_ingest": _run_url_batch_ingest,
+    "url_source_refresh": _run_url_source_refresh,
+}
+
+# Background jobs are never interactive; refreshes yield to batches a tenant is waiting on.
+JOB_PRIORITIES: dict[str, str] = {
+    "project_batch_extract": "batch",
+    "url_batch_ingest": "batch",
+    "url_source_refresh": "reindex",
+}
+
+
+def _create_job(session: Session, *, tenant_id: str, job_type: str, payload: dict) -> BackgroundJob:
+    priority = PRIORITY_CLASSES[JOB_PRIORITIES[job_type]]
+    return _repo(session).create_job(tenant_id=tenant_id, job_type=job_type, payload=payload, priority=priority)
+
+
+def _enqueue_batch_job(session: Session, *, project_id: int, batch_id: int, tenant_id: str, actor_id: str) -> dict:
+    job = _create_job(
+        session,
+        tenant_id=tenant_id,
+        job_type="project_batch_extract",
+        payload={"project_id": project_id, "batch_id": batch_id, "actor_id": actor_id},
+    )
+    log_event("job_enqueued", job_id=job.id, job_type=job.job_type, project_id=project_id, batch_id=batch_id, tenant_id=tenant_id)
+    record_audit_event(
+        session,
+        tenant_id=tenant_id,
+        actor_id=actor_id,
+        action="job.enqueue",
+        target_type="job",
+        target_id=str(job.id),
+        outcome="success",
+        metadata={"job_type": job.job_type},
+    )
+    return {"job_id": job.id, "job_type": job.job_type, "status": job.status, "batch_id": batch_id}
+
+
+def enqueue_project_batch_extract(
+    session: Session,
+    *,
+    project_id: int,
+    mode: ExtractMode,
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+    summary_chars: int | None = None,
+    incremental: bool = False,
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    batch_id = product_service.start_project_batch(
+        session,
+        project_id=project_id,
+        mode=mode,
+        tenant_id=resolved_tenant,
+        summary_chars=summary_chars,
+        incremental=incremental,
+    )
+    return _enqueue_batch_job(session, project_id=project_id, batch_id=batch_id, tenant_id=resolved_tenant, actor_id=actor_id)
+
+
+def enqueue_batch_resume(
+    session: Session,
+    *,
+    project_id: int,
+    batch_id: int,
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    product_service.check_batch_resumable(session, project_id=project_id, batch_id=batch_id, tenant_id=resolved_tenant)
+    return _enqueue_batch_job(session, project_id=project_id, batch_id=batch_id, tenant_id=resolved_tenant, actor_id=actor_id)
+
+
+def enqueue_url_batch_ingest(
+    session: Session,
+    *,
+    urls: list[str],
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    if len(urls) > settings.url_batch_max_urls:
+        raise ServiceError(
+            code="url_batch_too_large",
+            message="Too many URLs in one batch",
+            details={"max_urls": settings.url_batch_max_urls, "urls": len(urls)},
+        )
+
+    job = _create_job(
+        session,
+        tenant_id=resolved_tenant,
+        job_type="url_batch_ingest",
+        payload={"urls": urls, "actor_id": actor_id},
+    )
+    log_event("job_enqueued", job_id=job.id, job_type=job.job_type, url_count=len(urls), tenant_id=resolved_tenant)
+    record_audit_event(
+        session,
+        tenant_id=resolved_tenant,
+        actor_id=actor_id,
+        action="job.enqueue",
+        target_type="job",
+        target_id=str(job.id),
+        outcome="success",
+        metadata={"job_type": job.job_type},
+    )
+    return {"job_id": job.id, "job_type": job.job_type, "status": job.status}
+
+
+def enqueue_url_source_refresh(
+    session: Session,
+    *,
+    tenant_id: str | None = None,
+    max_age_s: int = 0,
+    actor_id: str = "system",
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    job = _create_job(
+        session,
+        tenant_id=resolved_tenant,
+        job_type="url_source_refresh",
+        payload={"max_age_s": max_age_s, "actor_id": actor_id},
+    )
+    log_event("job_enqueued", job_id=job.id, job_type=job.job_type, max_age_s=max_age_s, tenant_id=resolved_tenant)
+    record_audit_event(
+        session,
+        tenant_id=resolved_tenant,
+        actor_id=actor_id,
+        action="job.enqueue",
+        target_type="job",
+        target_id=str(job.id),
+        outcome="success",
+        metadata={"job_type": job.job_type},
+    )
+    return {"job_id": job.id, "job_type": job.job_type, "status": job.status}
+
+
+def schedule_url_source_refreshes(session: Session) -> list[int]:
+    # Called periodically by workers. Two workers racing here can both enqueue for a tenant; the
+    # second job then finds nothing due and finishes immediately.
+    interval = settings.url_refresh_interval_s
+    fetched_before = datetime.now(UTC) - timedelta(seconds=interval)
+    job_ids = []
+    for tenant_id in SourceRepository(session).tenants_due_for_refresh(fetched_before=fetched_before):
+        if _repo(session).has_pending_job(tenant_id=tenant_id, job_type="url_source_refresh"):
+            continue
+        job_ids.append(enqueue_url_source_refresh(session, tenant_id=tenant_id, max_age_s=interval)["job_id"])
+    return job_ids
+
+
+def get_job(session: Session, *, job_id: int, tenant_id: str | None = None) -> dict:
+    job = _repo(session).get_job(tenant_id=tenant_id or settings.default_tenant_id, job_id=job_id)
+    if not job:
+        raise ServiceError(code="job_not_found", message="Job not found", details={"job_id": job_id})
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+def execute_job(session: Session, job: BackgroundJob) -> dict:
+    handler = JOB_HANDLERS.get(job.job_type)
+    if handler is None:
+        raise ServiceError(code="job_type_unknown", message="Unknown job type", details={"job_type": job.job_type})
+    return handler(session, job, json.loads(job.payload_json or "{}"))
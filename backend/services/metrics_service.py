@@ -1,6 +1,7 @@
 from collections import defaultdict
 
 _REQUEST_DURATION_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000]
+_QUEUE_WAIT_BUCKETS = [5, 25, 100, 500, 2500, 10000, 60000]
 
 metrics = {
     "request_total": 0,
@@ -10,6 +11,18 @@ metrics = {
     "extract_duration_count": 0,
     "batch_size_sum": 0,
     "batch_count": 0,
+    "content_logical_bytes": 0,
+    "content_stored_bytes": 0,
+    "content_dedup_hits": 0,
+    "extract_cache_total": defaultdict(int),
+    "url_refresh_total": defaultdict(int),
+    "redactions_total": 0,
+    "dns_cache_total": defaultdict(int),
+    "dns_resolve_duration_ms_sum": 0.0,
+    "dns_resolve_count": 0,
+    # Keyed by (queue, tenant_id, priority).
+    "queue_wait_ms_bucket": defaultdict(lambda: [0] * (len(_QUEUE_WAIT_BUCKETS) + 1)),
+    "queue_wait_ms_sum": defaultdict(float),
 }
 
 
@@ -33,6 +46,45 @@ def observe_batch_size(size: int) -> None:
     metrics["batch_count"] += 1
 
 
+def observe_content_write(size_bytes: int, *, deduplicated: bool) -> None:
+    metrics["content_logical_bytes"] += size_bytes
+    if deduplicated:
+        metrics["content_dedup_hits"] += 1
+    else:
+        metrics["content_stored_bytes"] += size_bytes
+
+
+def observe_extract_cache(event: str) -> None:
+    metrics["extract_cache_total"][event] += 1
+
+
+def observe_url_refresh(status: str) -> None:
+    metrics["url_refresh_total"][status] += 1
+
+
+def observe_redaction(redactions: int) -> None:
+    metrics["redactions_total"] += redactions
+
+
+def observe_dns_lookup(event: str, elapsed_ms: float = 0.0) -> None:
+    metrics["dns_cache_total"][event] += 1
+    if event == "miss":
+        metrics["dns_resolve_duration_ms_sum"] += elapsed_ms
+        metrics["dns_resolve_count"] += 1
+
+
+def observe_queue_wait(queue: str, tenant_id: str, priority: str, wait_ms: float) -> None:
+    key = (queue, tenant_id, priority)
+    buckets = metrics["queue_wait_ms_bucket"][key]
+    for index, bound in enumerate(_QUEUE_WAIT_BUCKETS):
+        if wait_ms <= bound:
+            buckets[index] += 1
+            break
+    else:
+        buckets[-1] += 1
+    metrics["queue_wait_ms_sum"][key] += wait_ms
+
+
 def inc_error_code(code: str) -> None:
     metrics["error_code_total"][code] += 1
 
@@ -60,4 +112,48 @@ def render_prometheus() -> str:
     lines.append("# TYPE docuhub_batch_count counter")
     lines.append(f"docuhub_batch_count {metrics['batch_count']}")
 
+    lines.append("# TYPE docuhub_content_logical_bytes_total counter")
+    lines.append(f"docuhub_content_logical_bytes_total {metrics['content_logical_bytes']}")
+    lines.append("# TYPE docuhub_content_stored_bytes_total counter")
+    lines.append(f"docuhub_content_stored_bytes_total {metrics['content_stored_bytes']}")
+    lines.append("# TYPE docuhub_content_dedup_hits_total counter")
+    lines.append(f"docuhub_content_dedup_hits_total {metrics['content_dedup_hits']}")
+    stored = metrics["content_stored_bytes"]
+    dedup_ratio = metrics["content_logical_bytes"] / stored if stored else 1.0
+    lines.append("# TYPE docuhub_content_dedup_ratio gauge")
+    lines.append(f"docuhub_content_dedup_ratio {dedup_ratio:.4f}")
+
+    lines.append("# TYPE docuhub_extract_cache_total counter")
+    for event in ("hit", "miss", "eviction"):
+        lines.append(f'docuhub_extract_cache_total{{event="{event}"}} {metrics["extract_cache_total"][event]}')
+
+    lines.append("# TYPE docuhub_url_refresh_total counter")
+    for status in ("not_modified", "unchanged", "changed", "failed"):
+        lines.append(f'docuhub_url_refresh_total{{status="{status}"}} {metrics["url_refresh_total"][status]}')
+
+    lines.append("# TYPE docuhub_redactions_total counter")
+    lines.append(f"docuhub_redactions_total {metrics['redactions_total']}")
+
+    lines.append("# TYPE docuhub_dns_cache_total counter")
+    for event in ("hit", "miss"):
+        lines.append(f'docuhub_dns_cache_total{{event="{event}"}} {metrics["dns_cache_total"][event]}')
+    lookups = metrics["dns_cache_total"]["hit"] + metrics["dns_cache_total"]["miss"]
+    hit_ratio = metrics["dns_cache_total"]["hit"] / lookups if lookups else 0.0
+    lines.append("# TYPE docuhub_dns_cache_hit_ratio gauge")
+    lines.append(f"docuhub_dns_cache_hit_ratio {hit_ratio:.4f}")
+    lines.append("# TYPE docuhub_dns_resolve_duration_ms_sum counter")
+    lines.append(f"docuhub_dns_resolve_duration_ms_sum {metrics['dns_resolve_duration_ms_sum']:.3f}")
+    lines.append("# TYPE docuhub_dns_resolve_duration_ms_count counter")
+    lines.append(f"docuhub_dns_resolve_duration_ms_count {metrics['dns_resolve_count']}")
+
+    lines.append("# TYPE docuhub_queue_wait_ms histogram")
+    for (queue, tenant_id, priority), buckets in list(metrics["queue_wait_ms_bucket"].items()):
+        labels = f'queue="{queue}",tenant="{tenant_id}",priority="{priority}"'
+        cumulative = 0
+        for bound, value in zip([*_QUEUE_WAIT_BUCKETS, "+Inf"], buckets):
+            cumulative += value
+            lines.append(f'docuhub_queue_wait_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"docuhub_queue_wait_ms_sum{{{labels}}} {metrics['queue_wait_ms_sum'][(queue, tenant_id, priority)]:.3f}")
+        lines.append(f"docuhub_queue_wait_ms_count{{{labels}}} {cumulative}")
+
     return "\n".join(lines) + "\n"
@@ -0,0 +1,33 @@
+import base64
+import json
+from collections.abc import Sequence
+from typing import TypeVar
+
+from backend.services.errors import ServiceError
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def split_page(rows: Sequence[T], limit: int) -> tuple[Sequence[T], int | None]:
+    # Repositories fetch limit + 1 rows; the extra row only signals that another page exists.
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, page[-1].id
+
+
+def encode_cursor(*values: float | int) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, (int, float)) for v in values):
+        raise ServiceError(code="invalid_cursor", message="Invalid pagination cursor", details={"cursor": cursor})
+    return values
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from backend.repositories.passage_repository import TERM_DTYPE
+
+K1 = 1.2
+B = 0.75
+# Past this many segments a new one is merged with the rest, keeping per-query work to a few binary searches.
+MAX_SEGMENTS = 8
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Postings for a batch of passages, CSR style: the rows of terms[i] are rows[offsets[i]:offsets[i + 1]]."""
+
+    terms: np.ndarray  # sorted unique uint32 term hashes
+    offsets: np.ndarray  # int64, len(terms) + 1
+    rows: np.ndarray  # uint32 positions in PassageIndex.passage_ids
+    tfs: np.ndarray  # float32 term frequencies
+
+    @classmethod
+    def build(cls, rows: np.ndarray, terms: np.ndarray, tfs: np.ndarray) -> "Segment":
+        order = np.argsort(terms, kind="stable")
+        terms = terms[order]
+        unique, starts = np.unique(terms, return_index=True)
+        offsets = np.append(starts, len(terms)).astype(np.int64)
+        return cls(unique, offsets, rows[order].astype(np.uint32), tfs[order].astype(np.float32))
+
+    def lookup(self, hashes: np.ndarray) -> list[tuple[int, int]]:
+        positions = np.searchsorted(self.terms, hashes)
+        spans = []
+        for term, position in zip(hashes, positions):
+            if position < len(self.terms) and self.terms[position] == term:
+                spans.append((int(self.offsets[position]), int(self.offsets[position + 1])))
+            else:
+                spans.append((0, 0))
+        return spans
+
+
+@dataclass(frozen=True)
+class PassageIndex:
+    """Immutable BM25 index over one project's passages; adding documents returns a new index."""
+
+    passage_ids: np.ndarray  # int64 SourcePassage.id per row
+    document_ids: np.ndarray  # int64 Document.id per row
+    lengths: np.ndarray  # float32 token count per row
+    segments: tuple[Segment, ...]
+    source_ids: frozenset[int]
+    norms: np.ndarray  # float32 BM25 length normalization per row, K1 * (1 - B + B * length / average length)
+
+    @classmethod
+    def empty(cls) -> "PassageIndex":
+        return cls(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32), (), frozenset(), np.empty(0, np.float32))
+
+    def __len__(self) -> int:
+        return len(self.passage_ids)
+
+    def add(self, postings: list) -> "PassageIndex":
+        """postings: rows of (document_id, id, source_id, length, terms) as read by PassageRepository."""
+        if not postings:
+            return self
+        base = len(self)
+        records = np.frombuffer(b"".join(row.terms for row in postings), dtype=TERM_DTYPE)
+        counts = np.fromiter((len(row.terms) // TERM_DTYPE.itemsize for row in postings), dtype=np.int64, count=len(postings))
+        rows = np.repeat(np.arange(base, base + len(postings), dtype=np.int64), counts)
+        segment = Segment.build(rows, records["term"], records["tf"])
+        segments = self.segments + (segment,)
+        if len(segments) > MAX_SEGMENTS:
+            segments = (_merge(segments),)
+        lengths = np.concatenate([self.lengths, np.fromiter((row.length for row in postings), np.float32, len(postings))])
+        return PassageIndex(
+            np.concatenate([self.passage_ids, np.fromiter((row.id for row in postings), np.int64, len(postings))]),
+            np.concatenate([self.document_ids, np.fromiter((row.document_id for row in postings), np.int64, len(postings))]),
+            lengths,
+            segments,
+            self.source_ids | {row.source_id for row in postings},
+            (K1 * (1 - B + B * lengths / max(float(lengths.mean()), 1.0))).astype(np.float32),
+        )
+
+    def search(self, hashes: np.ndarray, *, limit: int) -> list[tuple[int, int, float]]:
+        """Top passages as (passage_id, document_id, score), best first."""
+        total = len(self)
+        if not total or not len(hashes):
+            return []
+        spans = [segment.lookup(hashes) for segment in self.segments]
+        frequency = np.zeros(len(hashes))
+        for segment_spans in spans:
+            frequency += [end - start for start, end in segment_spans]
+        idf = np.log1p((total - frequency + 0.5) / (frequency + 0.5))
+        norm = self.norms
+
+        scores = np.zeros(total, dtype=np.float32)
+        for segment, segment_spans in zip(self.segments, spans):
+            for weight, (start, end) in zip(idf, segment_spans):
+                if start == end:
+                    continue
+                rows = segment.rows[start:end]
+                tfs = segment.tfs[start:end]
+                # A term has one posting per passage, so plain fancy-index accumulation is safe.
+                scores[rows] += weight * tfs * (K1 + 1) / (tfs + norm[rows])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.lexsort((self.passage_ids[matched], -scores[matched]))]
+        return [(int(self.passage_ids[row]), int(self.document_ids[row]), float(scores[row])) for row in matched]
+
+
+def _merge(segments: tuple[Segment, ...]) -> Segment:
+    rows = np.concatenate([segment.rows for segment in segments])
+    tfs = np.concatenate([segment.tfs for segment in segments])
+    terms = np.concatenate([np.repeat(segment.terms, np.diff(segment.offsets)) for segment in segments])
+    return Segment.build(rows, terms, tfs)
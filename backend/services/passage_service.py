@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.repositories.passage_repository import PassageRepository, query_hashes
+from backend.repositories.product_repository import ProductRepository
+from backend.services.errors import ServiceError
+from backend.services.logging_utils import log_event
+from backend.services.passage_index import PassageIndex
+
+
+@dataclass(frozen=True)
+class _Entry:
+    index: PassageIndex
+    document_count: int
+    max_document_id: int
+    built_at: float
+
+
+class PassageIndexCache:
+    def __init__(self, *, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[tuple[str, int], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, project_id: int) -> _Entry | None:
+        key = (tenant_id, project_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if monotonic() - entry.built_at > self.ttl_s:
+                # Bounds how long another process's content refresh can go unnoticed.
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, tenant_id: str, project_id: int, entry: _Entry) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop((tenant_id, project_id), None)
+            self._entries[(tenant_id, project_id)] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_source(self, source_id: int) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if source_id in entry.index.source_ids]:
+                del self._entries[key]
+
+
+_cache: PassageIndexCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_passage_index_cache() -> PassageIndexCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PassageIndexCache(max_entries=settings.passage_cache_max_projects, ttl_s=settings.passage_cache_ttl_s)
+    return _cache
+
+
+def reset_passage_index_cache() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def invalidate_source_passages(source_id: int) -> None:
+    """Drop cached project indexes built from a source whose passages were just rewritten."""
+    get_passage_index_cache().invalidate_source(source_id)
+
+
+def _project_index(session: Session, *, project_id: int, tenant_id: str) -> PassageIndex:
+    repo = PassageRepository(session)
+    cache = get_passage_index_cache()
+    count, max_id = repo.project_state(project_id)
+    entry = cache.get(tenant_id, project_id)
+    if entry is not None and (entry.document_count, entry.max_document_id) == (count, max_id):
+        return entry.index
+
+    started = monotonic()
+    index, built_at, after_id, mode = PassageIndex.empty(), started, 0, "build"
+    if entry is not None and max_id > entry.max_document_id:
+        appended, _ = repo.project_state(project_id, after_document_id=entry.max_document_id)
+        if entry.document_count + appended == count:
+            # Only documents past the cached high-water mark are new: index just those, as one more segment.
+            index, built_at, after_id, mode = entry.index, entry.built_at, entry.max_document_id, "append"
+    postings = repo.list_project_postings(project_id, tenant_id=tenant_id, after_document_id=after_id)
+    index = index.add(postings)
+    cache.set(tenant_id, project_id, _Entry(index, count, max_id, built_at))
+    log_event(
+        "passage_index_loaded",
+        project_id=project_id,
+        mode=mode,
+        passages=len(index),
+        added=len(postings),
+        elapsed_ms=int((monotonic() - started) * 1000),
+    )
+    return index
+
+
+def search_project_passages(
+    session: Session,
+    *,
+    project_id: int,
+    q: str,
+    tenant_id: str | None = None,
+    limit: int = 10,
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    if ProductRepository(session).get_project(project_id, tenant_id=resolved_tenant) is None:
+        raise ServiceError(code="project_not_found", message="Project not found", details={"project_id": project_id})
+    hashes = query_hashes(q)
+    if not len(hashes):
+        raise ServiceError(code="invalid_search_query", message="Search query has no searchable terms", details={"q": q})
+
+    hits = _project_index(session, project_id=project_id, tenant_id=resolved_tenant).search(hashes, limit=limit)
+    repo = PassageRepository(session)
+    passages = repo.get_passages([passage_id for passage_id, _, _ in hits])
+    titles = repo.get_document_titles(sorted({document_id for _, document_id, _ in hits}))
+    items = [
+        {
+            "document_id": document_id,
+            "source_id": passages[passage_id].source_id,
+            "title": titles.get(document_id, ""),
+            "passage": passages[passage_id].ordinal,
+            "offset": passages[passage_id].start_char,
+            "score": round(score, 6),
+            "text": passages[passage_id].text,
+        }
+        for passage_id, document_id, score in hits
+        # A passage rewritten since the index was loaded is skipped rather than shown stale.
+        if passage_id in passages
+    ]
+    return {"project_id": project_id, "items": items, "count": len(items)}
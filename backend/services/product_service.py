@@ -1,19 +1,119 @@
+from collections.abc import Callable, Iterator
+from functools import partial
+
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from backend.core.config import settings
 from backend.models import ExtractMode
 from backend.repositories.product_repository import ProductRepository
+from backend.services import extraction_cache
 from backend.services.audit_service import record_audit_event
 from backend.services.errors import ServiceError
+from backend.services.extractors import EXTRACTOR_VERSION, SUMMARY_CHARS, parse_document, parse_error, parser_for
 from backend.services.logging_utils import log_event
-from backend.services.metrics_service import observe_batch_size
-from backend.services.task_runner import get_task_runner
+from backend.services.metrics_service import observe_batch_size, observe_redaction
+from backend.services.pagination import DEFAULT_PAGE_SIZE, split_page
+from backend.services.redaction import Redactor
+from backend.services.redaction_service import get_policy_version, get_redactor
+from backend.services.task_runner import get_parser_runner
 
 
 def _repo(session: Session) -> ProductRepository:
     return ProductRepository(session)
 
 
+def _extractor_version(mode: ExtractMode, summary_chars: int, policy_version: int | None) -> str:
+    """Everything besides the body that a batch item's result depends on."""
+    if mode == "summary":
+        return f"{EXTRACTOR_VERSION};summary_chars={summary_chars}"
+    if mode == "redact":
+        return f"{EXTRACTOR_VERSION};policy={policy_version}"
+    return EXTRACTOR_VERSION
+
+
+def _reusable(previous, content_sha256: str | None, extractor_version: str) -> bool:
+    # Failed items are retried: most parse failures are timeouts or worker crashes, not the body itself.
+    return (
+        previous is not None
+        and content_sha256 is not None
+        and previous.content_sha256 == content_sha256
+        and previous.extractor_version == extractor_version
+        and previous.error is None
+    )
+
+
+def _measure_extractions(
+    rows: list[tuple[int, int, str | None, str | None, bytes]],
+    mode: ExtractMode,
+    tenant_id: str,
+    redactor: Redactor | None = None,
+    summary_chars: int = SUMMARY_CHARS,
+) -> list[tuple[int, int, int, str | None, int | None]]:
+    # Redaction runs over the (cached) plain-text extraction, so it never needs its own cache entries.
+    mode = "text" if mode == "redact" else mode
+    extracted: dict[int, str] = {}
+    errors: dict[int, str] = {}
+    misses = []
+    parsed = []
+    parsers = [parser_for(file_type) for _, _, _, file_type, _ in rows]
+    # One lookup and one store per chunk, so a shared cache tier costs two round trips, not two per document.
+    found = extraction_cache.lookup_many(
+        [(content_sha256, parser) for (_, _, content_sha256, _, _), parser in zip(rows, parsers)], mode, summary_chars
+    )
+    for (document_id, _, content_sha256, _, data), parser, cached in zip(rows, parsers, found):
+        if cached is not None:
+            extracted[document_id] = cached
+        elif parser == "text":
+            extracted[document_id] = parse_document(data, parser, mode, summary_chars=summary_chars)
+            parsed.append((content_sha256, parser, extracted[document_id]))
+        else:
+            misses.append((document_id, content_sha256, parser, data))
+
+    if misses:
+        outcomes = get_parser_runner().run_each(
+            parse_document,
+            [(data, parser, mode, settings.extract_timeout_s, summary_chars) for _, _, parser, data in misses],
+            tenant_id=tenant_id,
+            priority="batch",
+            timeout=settings.extract_timeout_s + 1,
+        )
+        for (document_id, content_sha256, parser, _), outcome in zip(misses, outcomes):
+            if isinstance(outcome, BaseException):
+                errors[document_id] = parse_error(outcome, parser).code
+                log_event("batch_item_parse_failed", document_id=document_id, parser=parser, code=errors[document_id])
+                continue
+            extracted[document_id] = outcome
+            parsed.append((content_sha256, parser, outcome))
+
+    if parsed:
+        extraction_cache.store_many(parsed, mode, summary_chars)
+
+    redactions: dict[int, int] = {}
+    if redactor is not None and extracted:
+        # CPU-bound like parsing, so it goes through the same pool instead of the event loop.
+        outcomes = get_parser_runner().run_each(
+            partial(redactor.redact, chunk_chars=settings.redaction_chunk_chars),
+            [(text,) for text in extracted.values()],
+            tenant_id=tenant_id,
+            priority="batch",
+            timeout=settings.extract_timeout_s,
+        )
+        for document_id, outcome in zip(list(extracted), outcomes):
+            if isinstance(outcome, BaseException):
+                del extracted[document_id]
+                errors[document_id] = outcome.code if isinstance(outcome, ServiceError) else "redaction_failed"
+                log_event("batch_item_redaction_failed", document_id=document_id, code=errors[document_id])
+                continue
+            extracted[document_id], redactions[document_id] = outcome
+            observe_redaction(redactions[document_id])
+
+    return [
+        (document_id, source_id, len(extracted.get(document_id, "")), errors.get(document_id), redactions.get(document_id))
+        for document_id, source_id, _, _, _ in rows
+    ]
+
+
 def create_project(
     session: Session,
     *,
@@ -41,9 +141,16 @@ def create_project(
     }
 
 
-def list_projects(session: Session, *, tenant_id: str | None = None) -> dict:
+def list_projects(
+    session: Session,
+    *,
+    tenant_id: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: int | None = None,
+) -> dict:
     resolved_tenant = tenant_id or settings.default_tenant_id
-    projects = _repo(session).list_projects(tenant_id=resolved_tenant)
+    rows = _repo(session).list_projects(tenant_id=resolved_tenant, limit=limit, before_id=cursor)
+    projects, next_cursor = split_page(rows, limit)
     return {
         "items": [
             {
@@ -55,6 +162,7 @@ def list_projects(session: Session, *, tenant_id: str | None = None) -> dict:
             for p in projects
         ],
         "count": len(projects),
+        "next_cursor": next_cursor,
     }
 
 
@@ -96,14 +204,22 @@ def add_document_to_project(
     }
 
 
-def list_project_documents(session: Session, *, project_id: int, tenant_id: str | None = None) -> dict:
+def list_project_documents(
+    session: Session,
+    *,
+    project_id: int,
+    tenant_id: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: int | None = None,
+) -> dict:
     resolved_tenant = tenant_id or settings.default_tenant_id
     repo = _repo(session)
     project = repo.get_project(project_id, tenant_id=resolved_tenant)
     if not project:
         raise ServiceError(code="project_not_found", message="Project not found", details={"project_id": project_id})
 
-    docs = repo.list_documents_by_project(project_id, tenant_id=resolved_tenant)
+    rows = repo.list_documents_by_project(project_id, tenant_id=resolved_tenant, limit=limit, before_id=cursor)
+    docs, next_cursor = split_page(rows, limit)
     return {
         "items": [
             {
@@ -116,50 +232,267 @@ def list_project_documents(session: Session, *, project_id: int, tenant_id: str
             for d in docs
         ],
         "count": len(docs),
+        "next_cursor": next_cursor,
     }
 
 
-def run_project_batch_extract(
+def _batch_not_found(batch_id: int) -> ServiceError:
+    return ServiceError(code="batch_not_found", message="Batch run not found", details={"batch_id": batch_id})
+
+
+def _result_item(document_id: int, source_id: int, chars: int, error: str | None, redacted: int | None) -> dict:
+    return (
+        {"document_id": document_id, "source_id": source_id, "chars": chars}
+        | ({"error": error} if error else {})
+        | ({"redactions": redacted} if redacted is not None else {})
+    )
+
+
+def _extract_chunk(
+    repo: ProductRepository,
+    rows: list[tuple[int, int, str | None, str | None, bytes | None]],
+    *,
+    project_id: int,
+    tenant_id: str,
+    mode: ExtractMode,
+    incremental: bool,
+    extractor_version: str,
+    redactor: Redactor | None,
+    summary_chars: int,
+) -> tuple[list[tuple[int, int, str | None, int, str | None, int | None]], int]:
+    """(document_id, source_id, content_sha256, chars, error, redactions) per row, and how many were reused."""
+    previous = (
+        repo.latest_batch_items(project_id, tenant_id=tenant_id, mode=mode, document_ids=[row[0] for row in rows])
+        if incremental
+        else {}
+    )
+    kept = {row[0]: previous[row[0]] for row in rows if _reusable(previous.get(row[0]), row[2], extractor_version)}
+    stale = [row for row in rows if row[0] not in kept]
+    if incremental and stale:
+        # Incremental runs list documents without bodies; read them only for results that no longer hold.
+        stale = repo.get_project_sources(project_id, tenant_id=tenant_id, document_ids=[row[0] for row in stale])
+    fresh = {
+        document_id: (chars, error, redacted)
+        for document_id, _, chars, error, redacted in (
+            _measure_extractions(stale, mode, tenant_id, redactor, summary_chars) if stale else []
+        )
+    }
+    measured = [
+        (document_id, source_id, content_sha256)
+        + (
+            (kept[document_id].extracted_chars, None, kept[document_id].redactions)
+            if document_id in kept
+            else fresh[document_id]
+        )
+        for document_id, source_id, content_sha256, _, _ in rows
+    ]
+    return measured, len(kept)
+
+
+def _describe_batch(batch) -> dict:
+    return {
+        "batch_id": batch.id,
+        "project_id": batch.project_id,
+        "mode": batch.mode,
+        "status": batch.status,
+        "incremental": batch.incremental,
+        "summary_chars": batch.summary_chars,
+        "total": batch.total_items,
+        "processed": batch.processed_items,
+        "reused": batch.reused_items,
+        "last_document_id": batch.last_document_id,
+        "error": batch.error,
+        "created_at": batch.created_at.isoformat() if batch.created_at else None,
+        "updated_at": batch.updated_at.isoformat() if batch.updated_at else None,
+    }
+
+
+def start_project_batch(
     session: Session,
     *,
     project_id: int,
     mode: ExtractMode,
     tenant_id: str | None = None,
-    actor_id: str = "system",
-) -> dict:
+    summary_chars: int | None = None,
+    incremental: bool = False,
+) -> int:
+    """Record a pending run; nothing is extracted until execute_batch_run picks it up."""
     resolved_tenant = tenant_id or settings.default_tenant_id
     repo = _repo(session)
     project = repo.get_project(project_id, tenant_id=resolved_tenant)
     if not project:
         raise ServiceError(code="project_not_found", message="Project not found", details={"project_id": project_id})
+    if mode == "redact":
+        # A run that could never make progress is refused up front rather than recorded as failed.
+        get_redactor(session, tenant_id=resolved_tenant)
+    batch = repo.create_batch_run(
+        project_id=project_id,
+        mode=mode,
+        tenant_id=resolved_tenant,
+        summary_chars=summary_chars,
+        incremental=incremental,
+    )
+    return batch.id
 
-    docs = repo.list_documents_by_project(project_id, tenant_id=resolved_tenant)
-    batch = repo.create_batch_run(project_id=project_id, mode=mode, status="completed", tenant_id=resolved_tenant)
-
-    def _execute_batch() -> list[dict]:
-        local_results: list[dict] = []
-        for doc in docs:
-            src = repo.get_source(doc.source_id, tenant_id=resolved_tenant)
-            content = src.content if src else ""
-            extracted = content[:400] if mode == "summary" else content
-            repo.create_batch_item(batch_id=batch.id, document_id=doc.id, extracted_chars=len(extracted))
-            local_results.append(
-                {
-                    "document_id": doc.id,
-                    "source_id": doc.source_id,
-                    "chars": len(extracted),
-                }
-            )
-        return local_results
 
-    results = get_task_runner().run(_execute_batch)
+def check_batch_resumable(session: Session, *, project_id: int, batch_id: int, tenant_id: str | None = None) -> None:
+    batch = _repo(session).get_batch_run(batch_id, tenant_id=tenant_id or settings.default_tenant_id)
+    if batch is None or batch.project_id != project_id:
+        raise _batch_not_found(batch_id)
+    if batch.status == "completed":
+        raise ServiceError(code="batch_already_completed", message="Batch run already completed", details={"batch_id": batch_id})
+
+
+def get_batch_run(session: Session, *, project_id: int, batch_id: int, tenant_id: str | None = None) -> dict:
+    batch = _repo(session).get_batch_run(batch_id, tenant_id=tenant_id or settings.default_tenant_id)
+    if batch is None or batch.project_id != project_id:
+        raise _batch_not_found(batch_id)
+    return _describe_batch(batch)
+
+
+def _iter_recorded_items(repo: ProductRepository, batch_id: int) -> Iterator[Row]:
+    after_document_id = 0
+    while rows := repo.list_batch_items(batch_id, after_document_id=after_document_id, limit=settings.batch_chunk_size):
+        yield from rows
+        after_document_id = rows[-1].document_id
+
+
+def list_batch_items(
+    session: Session,
+    *,
+    project_id: int,
+    batch_id: int,
+    tenant_id: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: int | None = None,
+) -> dict:
+    """Recorded items of a run in document id order; cursor is the last document_id of the previous page."""
+    repo = _repo(session)
+    batch = repo.get_batch_run(batch_id, tenant_id=tenant_id or settings.default_tenant_id)
+    if batch is None or batch.project_id != project_id:
+        raise _batch_not_found(batch_id)
+    rows = repo.list_batch_items(batch_id, after_document_id=cursor or 0, limit=limit + 1)
+    page = rows[:limit]
+    return {
+        "items": [_result_item(*row) for row in page],
+        "count": len(page),
+        "next_cursor": page[-1].document_id if len(rows) > limit else None,
+    }
+
+
+def _fail_batch(session: Session, batch_id: int, code: str) -> None:
+    session.rollback()
+    _repo(session).set_batch_status(batch_id, status="failed", error=code)
+    session.commit()
+    log_event("project_batch_failed", batch_id=batch_id, code=code)
+
+
+def iter_batch_run(
+    session: Session,
+    *,
+    batch_id: int,
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+) -> Iterator[tuple[str, dict]]:
+    """Run a batch from its checkpoint to the end, committing items and progress one chunk at a time.
+
+    Yields ("batch", run state) once the run is marked running, ("item", result) per document as its chunk
+    commits, and ("summary", totals) at the end. Only one chunk's results are held at a time. A run that died
+    part way keeps every committed chunk; executing it again continues after last_document_id.
+    """
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    repo = _repo(session)
+    batch = repo.get_batch_run(batch_id, tenant_id=resolved_tenant)
+    if batch is None:
+        raise _batch_not_found(batch_id)
+    project_id, mode, incremental = batch.project_id, batch.mode, batch.incremental
+    summary_chars = batch.summary_chars or settings.summary_chars
+    checkpoint, reused = batch.last_document_id, batch.reused_items
+    resumed = batch.status != "pending"
+    if resumed:
+        log_event("project_batch_resumed", batch_id=batch_id, project_id=project_id, after_document_id=checkpoint)
+
+    count = 0
+    try:
+        redactor = get_redactor(session, tenant_id=resolved_tenant) if mode == "redact" else None
+        policy_version = get_policy_version(session, tenant_id=resolved_tenant) if mode == "redact" else None
+        extractor_version = _extractor_version(mode, summary_chars, policy_version)
+        total = repo.count_project_documents(project_id, tenant_id=resolved_tenant)
+        repo.set_batch_status(batch_id, status="running", total_items=total)
+        session.commit()
+        yield "batch", _describe_batch(repo.get_batch_run(batch_id, tenant_id=resolved_tenant))
+
+        for row in _iter_recorded_items(repo, batch_id) if checkpoint else []:
+            count += 1
+            yield "item", _result_item(*row)
+        chunks = repo.iter_project_sources(
+            project_id,
+            tenant_id=resolved_tenant,
+            chunk_size=settings.batch_chunk_size,
+            max_bytes=settings.batch_chunk_max_bytes,
+            with_data=not incremental,
+            after_document_id=checkpoint,
+        )
+        for rows in chunks:
+            measured, kept = _extract_chunk(
+                repo,
+                rows,
+                project_id=project_id,
+                tenant_id=resolved_tenant,
+                mode=mode,
+                incremental=incremental,
+                extractor_version=extractor_version,
+                redactor=redactor,
+                summary_chars=summary_chars,
+            )
+            repo.add_batch_items(
+                [
+                    {
+                        "batch_id": batch_id,
+                        "document_id": document_id,
+                        "extracted_chars": chars,
+                        "content_sha256": content_sha256,
+                        "extractor_version": extractor_version,
+                        "error": error,
+                        "redactions": redacted,
+                    }
+                    for document_id, _, content_sha256, chars, error, redacted in measured
+                ]
+            )
+            # Items and checkpoint commit together, so a chunk is either fully recorded or redone on resume.
+            advanced = repo.checkpoint_batch_run(
+                batch_id, after_document_id=checkpoint, last_document_id=rows[-1][0], processed=len(rows), reused=kept
+            )
+            if not advanced:
+                session.rollback()
+                raise ServiceError(
+                    code="batch_checkpoint_conflict",
+                    message="Batch run was advanced by another worker",
+                    details={"batch_id": batch_id},
+                )
+            session.commit()
+            checkpoint, reused, count = rows[-1][0], reused + kept, count + len(measured)
+            for document_id, source_id, _, chars, error, redacted in measured:
+                yield "item", _result_item(document_id, source_id, chars, error, redacted)
+        repo.set_batch_status(batch_id, status="completed")
+        session.commit()
+    except ServiceError as exc:
+        # On a conflict the run belongs to whoever advanced it; it must not be marked failed from here.
+        if exc.code != "batch_checkpoint_conflict":
+            _fail_batch(session, batch_id, exc.code)
+        raise
+    except Exception:
+        _fail_batch(session, batch_id, "internal_error")
+        raise
 
-    observe_batch_size(len(results))
+    observe_batch_size(count)
     log_event(
         "project_batch_completed",
         project_id=project_id,
-        batch_id=batch.id,
-        item_count=len(results),
+        batch_id=batch_id,
+        item_count=count,
+        reused=reused,
+        resumed=resumed,
         mode=mode,
         tenant_id=resolved_tenant,
     )
@@ -169,14 +502,75 @@ def run_project_batch_extract(
         actor_id=actor_id,
         action="batch.extract",
         target_type="batch",
-        target_id=str(batch.id),
+        target_id=str(batch_id),
         outcome="success",
-        metadata={"mode": mode, "count": len(results)},
+        metadata={"mode": mode, "count": count, "incremental": incremental, "resumed": resumed},
     )
-    return {
-        "batch_id": batch.id,
+    yield "summary", {
+        "batch_id": batch_id,
         "project_id": project_id,
         "mode": mode,
-        "items": results,
-        "count": len(results),
+        "status": "completed",
+        "count": count,
+        "reused": reused,
+        "recomputed": count - reused,
     }
+
+
+def execute_batch_run(
+    session: Session,
+    *,
+    batch_id: int,
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+    on_event: Callable[[str, dict], None] | None = None,
+    with_items: bool = True,
+) -> dict:
+    """Run a batch to completion. with_items=False returns only the summary; the items stay in batch_items."""
+    items: list[dict] = []
+    summary: dict = {}
+    for kind, payload in iter_batch_run(session, batch_id=batch_id, tenant_id=tenant_id, actor_id=actor_id):
+        if on_event is not None:
+            on_event(kind, payload)
+        if kind == "item" and with_items:
+            items.append(payload)
+        elif kind == "summary":
+            summary = payload
+    if not with_items:
+        return summary
+    return summary | {"items": items}
+
+
+def run_project_batch_extract(
+    session: Session,
+    *,
+    project_id: int,
+    mode: ExtractMode,
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+    summary_chars: int | None = None,
+    incremental: bool = False,
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    batch_id = start_project_batch(
+        session,
+        project_id=project_id,
+        mode=mode,
+        tenant_id=resolved_tenant,
+        summary_chars=summary_chars,
+        incremental=incremental,
+    )
+    return execute_batch_run(session, batch_id=batch_id, tenant_id=resolved_tenant, actor_id=actor_id)
+
+
+def resume_batch_run(
+    session: Session,
+    *,
+    project_id: int,
+    batch_id: int,
+    tenant_id: str | None = None,
+    actor_id: str = "system",
+) -> dict:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    check_batch_resumable(session, project_id=project_id, batch_id=batch_id, tenant_id=resolved_tenant)
+    return execute_batch_run(session, batch_id=batch_id, tenant_id=resolved_tenant, actor_id=actor_id)
@@ -0,0 +1,220 @@
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+
+DEFAULT_MASK = "[REDACTED]"
+# Left context carried into the next buffer so boundary checks and lookbehinds see the preceding text.
+_CONTEXT_CHARS = 16
+
+
+def _iban_valid(value: str) -> bool:
+    compact = value.replace(" ", "").upper()
+    rearranged = compact[4:] + compact[:4]
+    return int("".join(str(int(ch, 36)) for ch in rearranged)) % 97 == 1
+
+
+def _phone_valid(value: str) -> bool:
+    return 8 <= sum(ch.isdigit() for ch in value) <= 15
+
+
+# name -> (pattern, optional validator run on each match)
+DETECTORS: dict[str, tuple[str, Callable[[str], bool] | None]] = {
+    "email": (r"(?<![\w.+-])[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}", None),
+    "iban": (r"(?<![A-Za-z0-9])[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?(?![A-Za-z0-9])", _iban_valid),
+    "phone": (r"(?<![\w+])\+?\d{1,4}(?:[ .-]?\(?\d{1,4}\)?){2,5}(?![\w-])", _phone_valid),
+}
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters ("İ") lower to two code points; keep offsets aligned with the original text.
+    return "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over a term dictionary: one pass over the text whatever the dictionary size."""
+
+    def __init__(self, terms: Iterable[str], *, case_sensitive: bool = False, whole_words: bool = True):
+        self.case_sensitive = case_sensitive
+        self.whole_words = whole_words
+        self._goto: list[dict[str, int]] = [{}]
+        # Lengths of every term ending in each state, longest first (own term plus those reached via fail links).
+        self._out: list[tuple[int, ...]] = [()]
+        self.max_length = 0
+        for term in terms:
+            self._add(term if case_sensitive else _lower(term))
+        self._fail = self._link()
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def _add(self, term: str) -> None:
+        if not term:
+            return
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append(())
+            state = nxt
+        if len(term) not in self._out[state]:
+            self._out[state] = (len(term),)
+        self.max_length = max(self.max_length, len(term))
+
+    def _link(self) -> list[int]:
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = self._goto[fallback].get(ch, 0)
+                inherited = self._out[fail[nxt]]
+                if inherited:
+                    self._out[nxt] = tuple(sorted(set(self._out[nxt]) | set(inherited), reverse=True))
+        return fail
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        if self.max_length == 0:
+            return []
+        haystack = text if self.case_sensitive else _lower(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        whole_words = self.whole_words
+        size = len(text)
+        found = []
+        state = 0
+        for index, ch in enumerate(haystack):
+            if state == 0:
+                state = root.get(ch, 0)
+            else:
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = index + 1
+            for length in out[state]:
+                start = end - length
+                if whole_words and (
+                    (start > 0 and _is_word(text[start - 1])) or (end < size and _is_word(text[end]))
+                ):
+                    continue
+                found.append((start, end))
+                break
+        return found
+
+
+class Redactor:
+    """Applies a tenant's term dictionary, detectors and custom regexes in one merged pass per buffer."""
+
+    def __init__(
+        self,
+        *,
+        terms: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+        detectors: Iterable[str] = (),
+        case_sensitive: bool = False,
+        whole_words: bool = True,
+        mask: str = DEFAULT_MASK,
+        max_match_chars: int = 256,
+    ):
+        self.mask = mask
+        self.terms = TermMatcher(terms, case_sensitive=case_sensitive, whole_words=whole_words)
+        self._validators: dict[str, Callable[[str], bool]] = {}
+        groups = []
+        for name in detectors:
+            pattern, validator = DETECTORS[name]
+            groups.append(f"(?P<d_{name}>{pattern})")
+            if validator is not None:
+                self._validators[f"d_{name}"] = validator
+        for index, pattern in enumerate(patterns):
+            groups.append(f"(?P<p{index}>{pattern})")
+        # All regexes share one compiled alternation, so each buffer is scanned once by the regex engine too.
+        self._regex = re.compile("|".join(groups)) if groups else None
+        # A match must fit in the held-back tail to be seen whole; longer matches may be split at chunk edges.
+        self.overlap = max(self.terms.max_length, max_match_chars if groups else 0) + 1
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        found = self.terms.spans(text)
+        position = 0
+        while self._regex is not None and (match := self._regex.search(text, position)):
+            start, end = match.span()
+            validator = self._validators.get(match.lastgroup or "")
+            if start == end or (validator is not None and not validator(match.group())):
+                # Resume right after the start, so a rejected candidate does not hide a match it overlapped.
+                position = start + 1
+                continue
+            found.append((start, end))
+            position = end
+        found.sort()
+        merged: list[tuple[int, int]] = []
+        for start, end in found:
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    def redact_stream(self, chunks: Iterable[str], counter: list[int] | None = None) -> Iterator[str]:
+        """Yield redacted text chunk by chunk; only a short tail is held back between chunks.
+
+        counter, when given, is a one-element list incremented with the number of redacted spans.
+        """
+        carry = ""
+        context = 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer = carry + chunk
+            cut = len(buffer) - self.overlap
+            if cut <= context:
+                carry = buffer
+                continue
+            out, position = self._apply(buffer, context, cut, counter)
+            cut = max(cut, position)
+            out.append(buffer[position:cut])
+            yield "".join(out)
+            context = min(_CONTEXT_CHARS, cut)
+            carry = buffer[cut - context :]
+        if len(carry) > context:
+            out, position = self._apply(carry, context, len(carry), counter)
+            out.append(carry[position:])
+            yield "".join(out)
+
+    def _apply(self, buffer: str, context: int, cut: int, counter: list[int] | None) -> tuple[list[str], int]:
+        out: list[str] = []
+        position = context
+        redacted = 0
+        for start, end in self.spans(buffer):
+            if end <= context:
+                continue
+            if start >= cut:
+                break
+            start = max(start, context)
+            out.append(buffer[position:start])
+            out.append(self.mask)
+            position = end
+            redacted += 1
+        if counter is not None:
+            counter[0] += redacted
+        return out, position
+
+    def redact(self, text: str, *, chunk_chars: int = 65536) -> tuple[str, int]:
+        counter = [0]
+        chunks = (text[offset : offset + chunk_chars] for offset in range(0, len(text), chunk_chars))
+        return "".join(self.redact_stream(chunks, counter)), counter[0]
+
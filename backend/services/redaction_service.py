@@ -0,0 +1,194 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.repositories.redaction_repository import RedactionPolicyRepository
+from backend.services.audit_service import record_audit_event
+from backend.services.errors import ServiceError
+from backend.services.redaction import DEFAULT_MASK, DETECTORS, Redactor
+
+
+def _repo(session: Session) -> RedactionPolicyRepository:
+    return RedactionPolicyRepository(session)
+
+
+def _invalid(message: str, **details) -> ServiceError:
+    return ServiceError(code="invalid_redaction_policy", message=message, details=details)
+
+
+class RedactorCache:
+    def __init__(self, *, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[int, Redactor]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, version: int) -> Redactor | None:
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(tenant_id)
+            return entry[1]
+
+    def set(self, tenant_id: str, version: int, redactor: Redactor) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(tenant_id, None)
+            self._entries[tenant_id] = (version, redactor)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache: RedactorCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_redactor_cache() -> RedactorCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RedactorCache(max_entries=settings.redaction_cache_max_tenants)
+    return _cache
+
+
+def reset_redactor_cache() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def _build_redactor(rules: dict) -> Redactor:
+    return Redactor(
+        terms=rules["terms"],
+        patterns=rules["patterns"],
+        detectors=rules["detectors"],
+        case_sensitive=rules["case_sensitive"],
+        whole_words=rules["whole_words"],
+        mask=rules["mask"],
+        max_match_chars=settings.redaction_max_match_chars,
+    )
+
+
+def _normalize_rules(
+    *,
+    terms: list[str],
+    patterns: list[str],
+    detectors: list[str],
+    case_sensitive: bool,
+    whole_words: bool,
+    mask: str,
+) -> dict:
+    cleaned_terms = list(dict.fromkeys(term.strip() for term in terms if term.strip()))
+    if len(cleaned_terms) > settings.redaction_max_terms:
+        raise _invalid("Too many redaction terms", max_terms=settings.redaction_max_terms)
+    too_long = next((term for term in cleaned_terms if len(term) > settings.redaction_max_match_chars), None)
+    if too_long is not None:
+        raise _invalid("Redaction term is too long", max_chars=settings.redaction_max_match_chars, term=too_long[:64])
+
+    if len(patterns) > settings.redaction_max_patterns:
+        raise _invalid("Too many redaction patterns", max_patterns=settings.redaction_max_patterns)
+    for index, pattern in enumerate(patterns):
+        try:
+            compiled = re.compile(pattern)
+        except re.error as exc:
+            raise _invalid("Redaction pattern does not compile", index=index, reason=str(exc))
+        if compiled.match(""):
+            raise _invalid("Redaction pattern matches the empty string", index=index)
+
+    unknown = sorted(set(detectors) - set(DETECTORS))
+    if unknown:
+        raise _invalid("Unknown redaction detector", detectors=unknown)
+
+    return {
+        "terms": cleaned_terms,
+        "patterns": list(patterns),
+        "detectors": sorted(set(detectors)),
+        "case_sensitive": case_sensitive,
+        "whole_words": whole_words,
+        "mask": mask,
+    }
+
+
+def _describe(rules: dict, version: int) -> dict:
+    return {
+        "version": version,
+        "terms": len(rules["terms"]),
+        "patterns": len(rules["patterns"]),
+        "detectors": rules["detectors"],
+        "case_sensitive": rules["case_sensitive"],
+        "whole_words": rules["whole_words"],
+        "mask": rules["mask"],
+    }
+
+
+def set_redaction_policy(
+    session: Session,
+    *,
+    tenant_id: str,
+    actor_id: str,
+    terms: list[str],
+    patterns: list[str],
+    detectors: list[str],
+    case_sensitive: bool = False,
+    whole_words: bool = True,
+    mask: str = DEFAULT_MASK,
+) -> dict:
+    rules = _normalize_rules(
+        terms=terms,
+        patterns=patterns,
+        detectors=detectors,
+        case_sensitive=case_sensitive,
+        whole_words=whole_words,
+        mask=mask,
+    )
+    try:
+        # Patterns that compile alone can still clash once combined (duplicate group names).
+        redactor = _build_redactor(rules)
+    except re.error as exc:
+        raise _invalid("Redaction patterns cannot be combined", reason=str(exc))
+
+    row = _repo(session).upsert(tenant_id=tenant_id, rules_json=json.dumps(rules))
+    get_redactor_cache().set(tenant_id, row.version, redactor)
+    record_audit_event(
+        session,
+        tenant_id=tenant_id,
+        actor_id=actor_id,
+        action="redaction_policy.update",
+        target_type="redaction_policy",
+        target_id=tenant_id,
+        outcome="success",
+        metadata=_describe(rules, row.version),
+    )
+    return _describe(rules, row.version)
+
+
+def get_redaction_policy(session: Session, *, tenant_id: str) -> dict:
+    row = _repo(session).get(tenant_id=tenant_id)
+    if row is None:
+        raise ServiceError(code="redaction_policy_not_found", message="No redaction policy for tenant")
+    rules = json.loads(row.rules_json)
+    return _describe(rules, row.version) | {"terms": rules["terms"], "patterns": rules["patterns"]}
+
+
+def get_policy_version(session: Session, *, tenant_id: str) -> int | None:
+    return _repo(session).get_version(tenant_id=tenant_id)
+
+
+def get_redactor(session: Session, *, tenant_id: str) -> Redactor:
+    repo = _repo(session)
+    version = repo.get_version(tenant_id=tenant_id)
+    if version is None:
+        raise ServiceError(code="redaction_policy_not_found", message="No redaction policy for tenant")
+    cache = get_redactor_cache()
+    redactor = cache.get(tenant_id, version)
+    if redactor is None:
+        rules_json = repo.get_rules_json(tenant_id=tenant_id)
+        redactor = _build_redactor(json.loads(rules_json or "{}"))
+        cache.set(tenant_id, version, redactor)
+    return redactor
@@ -0,0 +1,115 @@
+import socket
+import threading
+from urllib.parse import urlparse
+
+
+def _encode(*parts: str | bytes) -> bytes:
+    payload = [f"*{len(parts)}\r\n".encode("utf-8")]
+    for part in parts:
+        b = part if isinstance(part, bytes) else part.encode("utf-8")
+        payload.append(f"${len(b)}\r\n".encode("utf-8"))
+        payload.append(b + b"\r\n")
+    return b"".join(payload)
+
+
+def _read_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise RuntimeError("redis connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def _read_line(sock: socket.socket) -> bytes:
+    data = bytearray()
+    while True:
+        ch = sock.recv(1)
+        if not ch:
+            raise RuntimeError("redis connection closed")
+        data += ch
+        if data.endswith(b"\r\n"):
+            return bytes(data[:-2])
+
+
+def _read_reply(sock: socket.socket):
+    first = sock.recv(1)
+    if not first:
+        raise RuntimeError("redis connection closed")
+    if first == b":":
+        return int(_read_line(sock))
+    if first == b"+":
+        return _read_line(sock).decode("utf-8")
+    if first == b"-":
+        raise RuntimeError(_read_line(sock).decode("utf-8"))
+    if first == b"*":
+        size = int(_read_line(sock))
+        return None if size == -1 else [_read_reply(sock) for _ in range(size)]
+    if first == b"$":
+        size = int(_read_line(sock))
+        if size == -1:
+            return None
+        data = _read_exact(sock, size + 2)
+        return data[:-2].decode("utf-8")
+    raise RuntimeError("unsupported redis response")
+
+
+def _connect(url: str, timeout: float) -> socket.socket:
+    parsed = urlparse(url)
+    host = parsed.hostname or "localhost"
+    port = parsed.port or 6379
+    db_index = (parsed.path or "/0").lstrip("/") or "0"
+
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        if parsed.password:
+            sock.sendall(_encode("AUTH", parsed.password))
+            _read_reply(sock)
+
+        sock.sendall(_encode("SELECT", db_index))
+        _read_reply(sock)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def _pipeline(sock: socket.socket, commands: tuple[tuple[str | bytes, ...], ...]) -> list:
+    sock.sendall(b"".join(_encode(*command) for command in commands))
+    return [_read_reply(sock) for _ in commands]
+
+
+def execute(url: str, *commands: tuple[str | bytes, ...], timeout: float = 1.0) -> list:
+    with _connect(url, timeout) as sock:
+        return _pipeline(sock, commands)
+
+
+class RedisConnection:
+    """One connection kept open across calls; any error closes it and the next call reconnects."""
+
+    def __init__(self, url: str, *, timeout: float = 1.0):
+        self.url = url
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    def execute(self, *commands: tuple[str | bytes, ...]) -> list:
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._sock = _connect(self.url, self.timeout)
+                return _pipeline(self._sock, commands)
+            except BaseException:
+                # A failed read can leave replies in flight, so the connection cannot be reused.
+                self._close()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
@@ -0,0 +1,65 @@
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.db.models import Base, SourcePassage, SourceSignature
+from backend.repositories.passage_repository import PassageRepository
+from backend.repositories.similarity_repository import SimilarityRepository
+from backend.repositories.source_repository import SourceRepository
+from backend.services.extractors import parser_for
+from backend.services.logging_utils import log_event
+from backend.services.passage_service import reset_passage_index_cache
+
+# Per-source indexes that can be rebuilt for rows created before the index existed:
+# name -> (table keyed by source_id, function that indexes one body, hook run after new rows were written).
+_Indexer = Callable[[Session, int, str, str], None]
+
+
+def _index_signatures(session: Session, source_id: int, tenant_id: str, body: str) -> None:
+    SimilarityRepository(session).index_source(source_id=source_id, tenant_id=tenant_id, body=body)
+
+
+def _index_passages(session: Session, source_id: int, tenant_id: str, body: str) -> None:
+    PassageRepository(session).index_source(source_id=source_id, tenant_id=tenant_id, body=body)
+
+
+BACKFILL_INDEXES: dict[str, tuple[type[Base], _Indexer, Callable[[], None] | None]] = {
+    "signatures": (SourceSignature, _index_signatures, None),
+    # Cached project indexes key on document count and max id, which a backfill leaves unchanged.
+    "passages": (SourcePassage, _index_passages, reset_passage_index_cache),
+}
+
+
+def backfill_index(session: Session, index: str, *, tenant_id: str | None = None, chunk_size: int = 100) -> dict:
+    """Index text sources that have no rows in ``index`` yet, committing once per chunk.
+
+    Safe to re-run or interrupt: each pass only picks up sources still missing from the index.
+    Binary sources are skipped; they are indexed when their text is first extracted.
+    """
+    model, indexer, on_indexed = BACKFILL_INDEXES[index]
+    repo = SourceRepository(session)
+    scanned = indexed = 0
+    after_id = 0
+    while True:
+        rows = repo.list_unindexed_sources(model, limit=chunk_size, after_id=after_id, tenant_id=tenant_id)
+        if not rows:
+            break
+        for row in rows:
+            scanned += 1
+            if parser_for(row.file_type) != "text":
+                continue
+            source = repo.get_source(row.id, tenant_id=row.tenant_id)
+            if source is None:
+                continue
+            # Bodies are loaded one at a time and capped like upload-time indexing.
+            body = source.content_bytes[: settings.search_index_max_chars * 4].decode("utf-8", errors="ignore")
+            indexer(session, row.id, row.tenant_id, body)
+            indexed += 1
+            session.expunge(source)
+        session.commit()
+        after_id = rows[-1].id
+        log_event("index_backfill_chunk", index=index, after_id=after_id, scanned=scanned, indexed=indexed)
+    if indexed and on_indexed is not None:
+        on_indexed()
+    return {"index": index, "scanned": scanned, "indexed": indexed}
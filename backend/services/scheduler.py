@@ -0,0 +1,77 @@
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any
+
+# Lower runs first: a class is only served when every class above it is empty.
+PRIORITY_CLASSES = {"interactive": 0, "batch": 1, "reindex": 2}
+
+
+def priority_rank(priority: str) -> int:
+    try:
+        return PRIORITY_CLASSES[priority]
+    except KeyError:
+        raise ValueError(f"unknown priority class: {priority}") from None
+
+
+@dataclass
+class _ClassQueue:
+    virtual_time: float = 0.0
+    finish_tags: dict[str, float] = field(default_factory=dict)
+    tenants: dict[str, deque] = field(default_factory=dict)
+
+
+class FairScheduler:
+    """Weighted fair queuing across tenants inside strict priority classes.
+
+    Each queued item gets a virtual finish tag ``max(V, last tag of its tenant) + 1 / weight``;
+    ``pop`` serves the smallest head tag among tenants it is allowed to run. A tenant with
+    weight 2 is therefore served twice as often as one with weight 1 while both are backlogged,
+    and a tenant that was idle starts at the current virtual time instead of with banked credit.
+    Not thread-safe: callers hold their own lock.
+    """
+
+    def __init__(self, weights: Mapping[str, float] | None = None, *, default_weight: float = 1.0):
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self._classes = [_ClassQueue() for _ in PRIORITY_CLASSES]
+        self._seq = count()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, tenant_id: str, item: Any, *, priority: str = "interactive") -> None:
+        queue = self._classes[priority_rank(priority)]
+        tag = max(queue.virtual_time, queue.finish_tags.get(tenant_id, 0.0)) + 1.0 / self.weights.get(tenant_id, self.default_weight)
+        queue.finish_tags[tenant_id] = tag
+        queue.tenants.setdefault(tenant_id, deque()).append((tag, next(self._seq), item))
+        self._size += 1
+
+    def pop(self, can_run: Callable[[str], bool] = lambda _: True) -> tuple[str, Any] | None:
+        """Next (tenant_id, item), skipping tenants for which can_run is False; None when nothing is eligible."""
+        for queue in self._classes:
+            best = None
+            for tenant_id, items in queue.tenants.items():
+                if (best is None or items[0][:2] < best[1][:2]) and can_run(tenant_id):
+                    best = (tenant_id, items[0])
+            if best is None:
+                continue
+            tenant_id, (tag, _, item) = best
+            items = queue.tenants[tenant_id]
+            items.popleft()
+            queue.virtual_time = max(queue.virtual_time, tag)
+            if not items:
+                # An emptied tenant's last tag is <= virtual_time, so its next push starts from virtual_time anyway.
+                del queue.tenants[tenant_id]
+                del queue.finish_tags[tenant_id]
+            self._size -= 1
+            return tenant_id, item
+        return None
+
+    def drain(self) -> list[Any]:
+        items = [item for queue in self._classes for entries in queue.tenants.values() for _, _, item in entries]
+        self._classes = [_ClassQueue() for _ in PRIORITY_CLASSES]
+        self._size = 0
+        return items
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.repositories.search_repository import SearchRepository, search_terms
+from backend.services.errors import ServiceError
+from backend.services.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+
+
+def search_sources(
+    session: Session,
+    *,
+    q: str,
+    tenant_id: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> dict:
+    if not search_terms(q):
+        raise ServiceError(code="invalid_search_query", message="Search query has no searchable terms", details={"q": q})
+    after = tuple(decode_cursor(cursor, size=2)) if cursor else None
+
+    repo = SearchRepository(session)
+    rows = repo.search(tenant_id=tenant_id or settings.default_tenant_id, query=q, limit=limit + 1, after=after)
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].score, page[-1].source_id) if len(rows) > limit else None
+    snippets = repo.snippets(source_ids=[row.source_id for row in page], query=q)
+    return {
+        "items": [
+            {
+                "file_id": row.source_id,
+                "file_name": row.file_name,
+                "score": round(row.score, 6),
+                "snippet": snippets.get(row.source_id) or "",
+            }
+            for row in page
+        ],
+        "count": len(page),
+        "next_cursor": next_cursor,
+    }
@@ -1,8 +1,16 @@
+import asyncio
 import ipaddress
 import socket
-from urllib.parse import urlparse
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from urllib.parse import SplitResult, urlsplit
 
+from backend.core.config import settings
 from backend.services.errors import ServiceError
+from backend.services.metrics_service import observe_dns_lookup
 
 
 PRIVATE_NETS = [
@@ -17,8 +25,104 @@ PRIVATE_NETS = [
 ]
 
 
-def validate_public_http_url(url: str) -> str:
-    parsed = urlparse(url)
+def _compile_ranges(networks: list) -> dict[int, tuple[list[int], list[int]]]:
+    # Per IP version, merged [first, last] integer intervals sorted by start, searched with bisect.
+    ranges: dict[int, tuple[list[int], list[int]]] = {}
+    for version in (4, 6):
+        spans = sorted((int(net.network_address), int(net.broadcast_address)) for net in networks if net.version == version)
+        starts: list[int] = []
+        ends: list[int] = []
+        for start, end in spans:
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        ranges[version] = (starts, ends)
+    return ranges
+
+
+_PRIVATE_RANGES = _compile_ranges(PRIVATE_NETS)
+
+
+def is_private_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        # ::ffff:127.0.0.1 reaches the IPv4 loopback just like 127.0.0.1.
+        ip = ip.ipv4_mapped
+    starts, ends = _PRIVATE_RANGES[ip.version]
+    value = int(ip)
+    index = bisect_right(starts, value) - 1
+    return index >= 0 and value <= ends[index]
+
+
+@dataclass(frozen=True)
+class ResolvedUrl:
+    url: str
+    scheme: str
+    host: str
+    port: int
+    addresses: tuple[str, ...]
+
+
+class DnsCache:
+    def __init__(self, *, max_entries: int, ttl_s: float, negative_ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.negative_ttl_s = negative_ttl_s
+        self._entries: OrderedDict[str, tuple[float, tuple[str, ...] | ServiceError]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> tuple[str, ...] | ServiceError | None:
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return None
+            if entry[0] <= monotonic():
+                del self._entries[host]
+                return None
+            self._entries.move_to_end(host)
+            return entry[1]
+
+    def set(self, host: str, outcome: tuple[str, ...] | ServiceError) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl_s = self.negative_ttl_s if isinstance(outcome, ServiceError) else self.ttl_s
+        with self._lock:
+            self._entries.pop(host, None)
+            self._entries[host] = (monotonic() + ttl_s, outcome)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_dns_cache: DnsCache | None = None
+_dns_cache_lock = threading.Lock()
+
+
+def get_dns_cache() -> DnsCache:
+    global _dns_cache
+    if _dns_cache is None:
+        with _dns_cache_lock:
+            if _dns_cache is None:
+                _dns_cache = DnsCache(
+                    max_entries=settings.dns_cache_max_entries,
+                    ttl_s=settings.dns_cache_ttl_s,
+                    negative_ttl_s=settings.dns_cache_negative_ttl_s,
+                )
+    return _dns_cache
+
+
+def reset_dns_cache() -> None:
+    global _dns_cache
+    with _dns_cache_lock:
+        _dns_cache = None
+
+
+def _check_url(url: str) -> tuple[SplitResult, str, int]:
+    parsed = urlsplit(url)
     if parsed.scheme not in {"http", "https"}:
         raise ServiceError(code="invalid_url_scheme", message="Only http/https URLs are allowed")
 
@@ -30,13 +134,70 @@ def validate_public_http_url(url: str) -> str:
         raise ServiceError(code="blocked_host", message="Localhost and loopback hosts are blocked")
 
     try:
-        addr_info = socket.getaddrinfo(host, None)
-    except socket.gaierror:
-        raise ServiceError(code="dns_resolution_failed", message="Unable to resolve host")
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    except ValueError:
+        raise ServiceError(code="invalid_url", message="URL port is invalid")
+    return parsed, host, port
+
+
+def _vet_addresses(addr_info: list) -> tuple[str, ...] | ServiceError:
+    addresses = tuple(dict.fromkeys(info[4][0] for info in addr_info))
+    if any(is_private_address(address) for address in addresses):
+        return ServiceError(code="blocked_private_network", message="Private network addresses are blocked")
+    return addresses
+
+
+def _dns_failure() -> ServiceError:
+    return ServiceError(code="dns_resolution_failed", message="Unable to resolve host")
+
 
-    for info in addr_info:
-        ip = ipaddress.ip_address(info[4][0])
-        if any(ip in network for network in PRIVATE_NETS):
-            raise ServiceError(code="blocked_private_network", message="Private network addresses are blocked")
+def _cached(host: str) -> tuple[str, ...] | ServiceError | None:
+    outcome = get_dns_cache().get(host)
+    if outcome is not None:
+        observe_dns_lookup("hit")
+    return outcome
 
+
+def _remember(host: str, outcome: tuple[str, ...] | ServiceError, started: float) -> tuple[str, ...] | ServiceError:
+    observe_dns_lookup("miss", elapsed_ms=(monotonic() - started) * 1000)
+    get_dns_cache().set(host, outcome)
+    return outcome
+
+
+def _raise_if_blocked(outcome: tuple[str, ...] | ServiceError) -> tuple[str, ...]:
+    if isinstance(outcome, ServiceError):
+        # Cached outcomes are shared; raise a fresh instance so tracebacks never pile up on the cached one.
+        raise ServiceError(code=outcome.code, message=outcome.message, details=outcome.details)
+    return outcome
+
+
+def validate_public_http_url(url: str) -> str:
+    _, host, _ = _check_url(url)
+    outcome = _cached(host)
+    if outcome is None:
+        started = monotonic()
+        try:
+            addr_info = socket.getaddrinfo(host, None)
+        except socket.gaierror:
+            outcome = _remember(host, _dns_failure(), started)
+        else:
+            outcome = _remember(host, _vet_addresses(addr_info), started)
+    _raise_if_blocked(outcome)
     return url
+
+
+async def resolve_public_http_url(url: str) -> ResolvedUrl:
+    # The returned addresses are the ones that passed the check; callers connect to them directly
+    # so a second lookup cannot be answered with a different (private) address.
+    parsed, host, port = _check_url(url)
+    outcome = _cached(host)
+    if outcome is None:
+        started = monotonic()
+        try:
+            addr_info = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            outcome = _remember(host, _dns_failure(), started)
+        else:
+            outcome = _remember(host, _vet_addresses(addr_info), started)
+    addresses = _raise_if_blocked(outcome)
+    return ResolvedUrl(url=url, scheme=parsed.scheme, host=host, port=port, addresses=addresses)
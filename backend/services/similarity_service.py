@@ -0,0 +1,30 @@
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.repositories.similarity_repository import SimilarityRepository
+from backend.repositories.source_repository import SourceRepository
+from backend.services.errors import ServiceError
+from backend.services.pagination import DEFAULT_PAGE_SIZE
+
+
+def find_similar_sources(
+    session: Session,
+    *,
+    file_id: int,
+    tenant_id: str | None = None,
+    min_score: float | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> dict:
+    tenant_id = tenant_id or settings.default_tenant_id
+    if SourceRepository(session).get_source(file_id, tenant_id=tenant_id) is None:
+        raise ServiceError(code="file_not_found", message="Source file not found", details={"file_id": file_id})
+    threshold = settings.similarity_min_score if min_score is None else min_score
+    rows = SimilarityRepository(session).similar(file_id, tenant_id=tenant_id, min_score=threshold, limit=limit)
+    return {
+        "file_id": file_id,
+        "items": [
+            {"file_id": source_id, "file_name": file_name, "score": round(score, 4)}
+            for source_id, file_name, score in rows
+        ],
+        "count": len(rows),
+    }
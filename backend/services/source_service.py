@@ -1,6 +1,13 @@
+import asyncio
+import codecs
+import hashlib
+import re
+import tempfile
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
 from time import monotonic
-from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
+from typing import BinaryIO
 
 from sqlalchemy.orm import Session
 
@@ -9,13 +16,24 @@ from backend.models import ExtractMode
 from backend.repositories.contracts import SourceRepositoryProtocol
 from backend.repositories.source_repository import SourceRepository
 from backend.services.errors import ServiceError
+from backend.services.extraction_cache import cached_extract
+from backend.services.extractors import SUMMARY_CHARS, parse_document, parse_error, parser_for
+from backend.services.http_fetch import close_http_pool, fetch, gather_capped
 from backend.services.logging_utils import log_event
-from backend.services.metrics_service import observe_extract
-from backend.services.security import validate_public_http_url
+from backend.services.metrics_service import observe_content_write, observe_extract, observe_redaction
+from backend.services.pagination import DEFAULT_PAGE_SIZE, split_page
+from backend.services.passage_service import invalidate_source_passages
+from backend.services.redaction_service import get_redactor
+from backend.services.task_runner import get_parser_runner
+
+
+def offload_indexing(fn: Callable, *args, tenant_id: str):
+    # Passage tokenization and MinHash take a few hundred ms on a large body; keep them off the event loop.
+    return get_parser_runner().run(fn, *args, tenant_id=tenant_id, timeout=settings.extract_timeout_s)
 
 
 def _repo(session: Session) -> SourceRepositoryProtocol:
-    return SourceRepository(session)
+    return SourceRepository(session, offload=offload_indexing)
 
 
 def _validate_upload_type(file_type: str) -> str:
@@ -45,6 +63,7 @@ def upload_source(session: Session, *, file_name: str, file_type: str, content:
         content=content,
         tenant_id=tenant_id or settings.default_tenant_id,
     )
+    observe_content_write(source.blob.size_bytes, deduplicated=source.blob.refcount > 1)
     log_event("upload_saved", file_id=source.id, file_type=source.file_type, upload_chars=content_len)
     return {
         "file_id": source.id,
@@ -54,43 +73,332 @@ def upload_source(session: Session, *, file_name: str, file_type: str, content:
     }
 
 
-def download_from_url(session: Session, *, url: str, tenant_id: str | None = None) -> dict:
-    safe_url = validate_public_http_url(url)
+@dataclass
+class SpooledUpload:
+    file: BinaryIO
+    file_type: str
+    sha256: str
+    size_bytes: int
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _upload_too_large(size_bytes: int) -> ServiceError:
+    return ServiceError(
+        code="upload_too_large",
+        message="Upload content exceeds configured limit",
+        details={"max_upload_bytes": settings.max_upload_bytes, "upload_bytes": size_bytes},
+    )
+
+
+async def spool_upload(
+    chunks: AsyncIterator[bytes],
+    *,
+    file_type: str,
+    declared_length: int | None = None,
+) -> SpooledUpload:
+    normalized_type = _validate_upload_type(file_type)
+    if declared_length is not None and declared_length > settings.max_upload_bytes:
+        raise _upload_too_large(declared_length)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.upload_spool_memory_bytes)
+    digest = hashlib.sha256()
+    size_bytes = 0
     try:
-        with urlopen(safe_url, timeout=settings.url_download_timeout_s) as response:  # nosec B310
-            raw = response.read(settings.max_download_chars)
-            content = raw.decode("utf-8", errors="replace")
-    except HTTPError as exc:
-        raise ServiceError(code="network_http_error", message="HTTP error while downloading", details={"status": exc.code})
-    except URLError as exc:
-        raise ServiceError(code="network_url_error", message="Network error while downloading", details={"reason": str(exc.reason)})
-    except TimeoutError:
-        raise ServiceError(code="network_timeout", message="Download timeout")
-
-    file_name = safe_url.rstrip("/").split("/")[-1] or "downloaded.txt"
-    source = _repo(session).create_source(
+        async for chunk in chunks:
+            size_bytes += len(chunk)
+            if size_bytes > settings.max_upload_bytes:
+                raise _upload_too_large(size_bytes)
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    return SpooledUpload(file=spool, file_type=normalized_type, sha256=digest.hexdigest(), size_bytes=size_bytes)
+
+
+def _spooled_search_text(upload: SpooledUpload) -> str:
+    # Binary formats are indexed by name now and by body once they are first extracted in text mode.
+    if parser_for(upload.file_type) != "text":
+        return ""
+    upload.file.seek(0)
+    return upload.file.read(settings.search_index_max_chars * 4).decode("utf-8", errors="ignore")
+
+
+def save_spooled_upload(session: Session, *, file_name: str, upload: SpooledUpload, tenant_id: str | None = None) -> dict:
+    source = _repo(session).create_source_from_file(
         file_name=file_name,
+        file_type=upload.file_type,
+        fileobj=upload.file,
+        sha256=upload.sha256,
+        tenant_id=tenant_id or settings.default_tenant_id,
+        search_text=_spooled_search_text(upload),
+    )
+    observe_content_write(upload.size_bytes, deduplicated=source.blob.refcount > 1)
+    log_event("upload_saved", file_id=source.id, file_type=source.file_type, upload_bytes=upload.size_bytes, streamed=True)
+    return {
+        "file_id": source.id,
+        "file_name": source.file_name,
+        "file_type": source.file_type,
+        "stored": True,
+        "size_bytes": upload.size_bytes,
+        "sha256": upload.sha256,
+    }
+
+
+@dataclass
+class DownloadedSource:
+    url: str
+    content: str
+    truncated: bool
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+
+
+def _validator(value: str | None, max_length: int) -> str | None:
+    # An oversized validator is dropped rather than cut: a cut ETag could never match again anyway.
+    return value if value and len(value) <= max_length else None
+
+
+async def fetch_url_source(url: str, *, etag: str | None = None, last_modified: str | None = None) -> DownloadedSource:
+    conditions = {}
+    if etag:
+        conditions["If-None-Match"] = etag
+    if last_modified:
+        conditions["If-Modified-Since"] = last_modified
+    result = await fetch(url, max_bytes=settings.max_download_chars, timeout_s=settings.url_download_timeout_s, headers=conditions)
+    return DownloadedSource(
+        url=url,
+        content=result.body.decode("utf-8", errors="replace"),
+        truncated=result.truncated,
+        etag=_validator(result.headers.get("etag"), 512),
+        last_modified=_validator(result.headers.get("last-modified"), 64),
+        not_modified=result.status == 304,
+    )
+
+
+def save_downloaded_source(session: Session, *, download: DownloadedSource, tenant_id: str | None = None) -> dict:
+    source = _repo(session).create_source(
+        file_name=_download_file_name(download.url),
         file_type="txt",
-        content=content,
-        source_url=safe_url,
+        content=download.content,
+        source_url=download.url,
         tenant_id=tenant_id or settings.default_tenant_id,
+        fetch_etag=download.etag,
+        fetch_last_modified=download.last_modified,
+    )
+    observe_content_write(source.blob.size_bytes, deduplicated=source.blob.refcount > 1)
+    log_event(
+        "download_saved",
+        file_id=source.id,
+        source_url=download.url,
+        bytes_previewed=len(download.content),
+        truncated=download.truncated,
     )
-    log_event("download_saved", file_id=source.id, source_url=safe_url, bytes_previewed=len(content))
     return {
         "file_id": source.id,
-        "source_url": safe_url,
+        "source_url": download.url,
         "downloaded": True,
-        "bytes_previewed": len(content),
+        "bytes_previewed": len(download.content),
     }
 
 
-def extract_content(session: Session, *, file_id: int, mode: ExtractMode, tenant_id: str | None = None) -> dict:
+def _download_file_name(url: str) -> str:
+    return url.rstrip("/").split("/")[-1] or "downloaded.txt"
+
+
+async def fetch_url_sources(urls: list[str]) -> list[DownloadedSource | ServiceError]:
+    return await gather_capped([(url, partial(fetch_url_source, url)) for url in urls])
+
+
+def save_url_batch(
+    session: Session,
+    *,
+    urls: list[str],
+    fetched: list[DownloadedSource | ServiceError],
+    tenant_id: str | None = None,
+    checkpoint: Callable[[list[dict]], None] | None = None,
+) -> list[dict]:
+    """Store a fetched chunk; checkpoint, when given, stages its own writes in the same commit as the sources."""
+    downloads = [outcome for outcome in fetched if isinstance(outcome, DownloadedSource)]
+    stored = iter(
+        _repo(session).create_sources(
+            [
+                {
+                    "file_name": _download_file_name(download.url),
+                    "file_type": "txt",
+                    "content": download.content,
+                    "source_url": download.url,
+                    "fetch_etag": download.etag,
+                    "fetch_last_modified": download.last_modified,
+                }
+                for download in downloads
+            ],
+            tenant_id=tenant_id or settings.default_tenant_id,
+            commit=checkpoint is None,
+        )
+    )
+
+    items = []
+    for url, outcome in zip(urls, fetched):
+        if isinstance(outcome, ServiceError):
+            items.append({"url": url, "downloaded": False, "error": outcome.code})
+            continue
+        source = next(stored)
+        observe_content_write(source.size_bytes, deduplicated=source.deduplicated)
+        items.append({"url": url, "file_id": source.id, "downloaded": True, "bytes_previewed": len(outcome.content)})
+    if checkpoint is not None:
+        try:
+            checkpoint(items)
+        except Exception:
+            session.rollback()
+            raise
+        session.commit()
+    return items
+
+
+async def ingest_url_batch(
+    urls: list[str],
+    *,
+    save_chunk: Callable[[list[str], list[DownloadedSource | ServiceError]], Awaitable[list[dict]]],
+    recorded: list[dict] | None = None,
+) -> dict:
+    """Fetch and store urls chunk by chunk; recorded holds the items of a previous run's leading chunks, which are skipped."""
+    if len(urls) > settings.url_batch_max_urls:
+        raise ServiceError(
+            code="url_batch_too_large",
+            message="Too many URLs in one batch",
+            details={"max_urls": settings.url_batch_max_urls, "urls": len(urls)},
+        )
+
+    items: list[dict] = list(recorded or [])
+    for start in range(len(items), len(urls), settings.batch_chunk_size):
+        chunk = urls[start : start + settings.batch_chunk_size]
+        items.extend(await save_chunk(chunk, await fetch_url_sources(chunk)))
+
+    stored = sum(1 for item in items if item["downloaded"])
+    log_event("url_batch_completed", count=len(items), stored=stored, failed=len(items) - stored)
+    return {"items": items, "count": len(items), "stored": stored, "failed": len(items) - stored}
+
+
+def run_url_batch_ingest(
+    session: Session,
+    *,
+    urls: list[str],
+    tenant_id: str | None = None,
+    on_items: Callable[[list[dict]], None] | None = None,
+    recorded: list[dict] | None = None,
+    checkpoint: Callable[[list[dict]], None] | None = None,
+) -> dict:
+    # Synchronous entry point for the background worker, which has no running event loop.
+    async def _save_chunk(chunk: list[str], fetched: list[DownloadedSource | ServiceError]) -> list[dict]:
+        items = save_url_batch(session, urls=chunk, fetched=fetched, tenant_id=tenant_id, checkpoint=checkpoint)
+        if on_items is not None:
+            on_items(items)
+        return items
+
+    async def _run() -> dict:
+        try:
+            return await ingest_url_batch(urls, save_chunk=_save_chunk, recorded=recorded)
+        finally:
+            await close_http_pool()
+
+    return asyncio.run(_run())
+
+
+def _parse_source(data: bytes, parser: str, mode: ExtractMode, *, tenant_id: str, summary_chars: int = SUMMARY_CHARS) -> str:
+    if parser == "text":
+        return parse_document(data, parser, mode, summary_chars=summary_chars)
+    try:
+        # Grace period: the worker enforces extract_timeout_s itself; this only catches a wedged worker.
+        return get_parser_runner().run(
+            parse_document,
+            data,
+            parser,
+            mode,
+            settings.extract_timeout_s,
+            summary_chars,
+            tenant_id=tenant_id,
+            timeout=settings.extract_timeout_s + 1,
+        )
+    except ServiceError as exc:
+        if exc.code != "task_timeout":
+            raise
+        raise parse_error(exc, parser) from exc
+    except Exception as exc:
+        raise parse_error(exc, parser) from exc
+
+
+def _iter_source_text(session: Session, source, parser: str) -> Iterator[str]:
+    if parser != "text" or source.blob is None:
+        # Parsed formats go through the extraction cache; redaction then runs over the cached text.
+        yield cached_extract(
+            source.content_sha256,
+            "text",
+            lambda: _parse_source(source.content_bytes, parser, "text", tenant_id=source.tenant_id),
+            parser=parser,
+        )
+        return
+    # Plain text is decoded window by window straight from the blob instead of materializing the body.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for window in _repo(session).iter_content_range(
+        source.id,
+        tenant_id=source.tenant_id,
+        offset=0,
+        length=source.blob.size_bytes,
+        chunk_bytes=settings.redaction_chunk_chars,
+    ):
+        yield decoder.decode(window)
+    yield decoder.decode(b"", final=True)
+
+
+def extract_content(
+    session: Session,
+    *,
+    file_id: int,
+    mode: ExtractMode,
+    tenant_id: str | None = None,
+    summary_chars: int | None = None,
+) -> dict:
     start_time = monotonic()
+    summary_chars = summary_chars or settings.summary_chars
     source = _repo(session).get_source(file_id, tenant_id=tenant_id or settings.default_tenant_id)
     if not source:
         raise ServiceError(code="file_not_found", message="Source file not found", details={"file_id": file_id})
 
-    extracted = source.content[:400] if mode == "summary" else source.content
+    parser = parser_for(source.file_type)
+    redactions = None
+    if mode == "redact":
+        redactor = get_redactor(session, tenant_id=source.tenant_id)
+        text = "".join(_iter_source_text(session, source, parser))
+        # The regex and dictionary scans are CPU-bound: run them on the parser pool, not the event loop.
+        extracted, redactions = get_parser_runner().run(
+            redactor.redact,
+            text,
+            chunk_chars=settings.redaction_chunk_chars,
+            tenant_id=source.tenant_id,
+            timeout=settings.extract_timeout_s,
+        )
+        observe_redaction(redactions)
+    else:
+        extracted = cached_extract(
+            source.content_sha256,
+            mode,
+            lambda: _parse_source(
+                source.content_bytes,
+                parser,
+                mode,
+                tenant_id=source.tenant_id,
+                summary_chars=summary_chars,
+            ),
+            parser=parser,
+            summary_chars=summary_chars,
+        )
+    if mode == "text" and parser != "text":
+        _repo(session).reindex_source(source, search_text=extracted)
+        invalidate_source_passages(source.id)
     elapsed = monotonic() - start_time
     if elapsed > settings.extract_timeout_s:
         raise ServiceError(code="extract_timeout", message="Extraction timeout")
@@ -103,11 +411,18 @@ def extract_content(session: Session, *, file_id: int, mode: ExtractMode, tenant
         "mode": mode,
         "content": extracted,
         "chars": len(extracted),
-    }
+    } | ({"redactions": redactions} if redactions is not None else {})
 
 
-def list_sources(session: Session, tenant_id: str | None = None) -> dict:
-    items = _repo(session).list_sources(tenant_id=tenant_id or settings.default_tenant_id)
+def list_sources(
+    session: Session,
+    tenant_id: str | None = None,
+    *,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: int | None = None,
+) -> dict:
+    rows = _repo(session).list_sources(tenant_id=tenant_id or settings.default_tenant_id, limit=limit, before_id=cursor)
+    items, next_cursor = split_page(rows, limit)
     return {
         "items": [
             {
@@ -119,6 +434,7 @@ def list_sources(session: Session, tenant_id: str | None = None) -> dict:
             for source in items
         ],
         "count": len(items),
+        "next_cursor": next_cursor,
     }
 
 
@@ -135,6 +451,91 @@ def get_source(session: Session, *, file_id: int, tenant_id: str | None = None)
     }
 
 
+_CONTENT_MEDIA_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "md": "text/markdown; charset=utf-8",
+    "text/plain": "text/plain; charset=utf-8",
+    "pdf": "application/pdf",
+    "application/pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _range_not_satisfiable(size_bytes: int) -> ServiceError:
+    return ServiceError(
+        code="range_not_satisfiable",
+        message="Requested range is outside the content",
+        details={"size_bytes": size_bytes},
+    )
+
+
+_BYTE_RANGE = re.compile(r"bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", re.IGNORECASE)
+
+
+def resolve_content_window(
+    size_bytes: int,
+    *,
+    range_header: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> tuple[int, int, bool]:
+    """(start, end, partial): partial is True only for an honoured Range header, which gets a 206."""
+    # Only a single well-formed byte range is honoured. Other units, multiple ranges and malformed
+    # headers are ignored, as RFC 9110 allows, leaving the offset/limit window (by default the whole body, 200).
+    match = _BYTE_RANGE.fullmatch(range_header.strip()) if range_header else None
+    if match and (match[1] or match[2]) and not (match[1] and match[2] and int(match[2]) < int(match[1])):
+        first, last = match[1], match[2]
+        if not first:
+            if int(last) == 0 or size_bytes == 0:
+                raise _range_not_satisfiable(size_bytes)
+            start, end = max(size_bytes - int(last), 0), size_bytes - 1
+        else:
+            start = int(first)
+            end = min(int(last), size_bytes - 1) if last else size_bytes - 1
+        if start >= size_bytes:
+            raise _range_not_satisfiable(size_bytes)
+        return start, end, True
+
+    if offset and offset >= size_bytes:
+        raise _range_not_satisfiable(size_bytes)
+    # offset/limit windows are not Range requests, so they are never answered with 206.
+    end = size_bytes - 1 if limit is None else min(offset + limit, size_bytes) - 1
+    return offset, end, False
+
+
+def get_source_content_info(session: Session, *, file_id: int, tenant_id: str | None = None) -> dict:
+    info = _repo(session).get_content_info(file_id, tenant_id=tenant_id or settings.default_tenant_id)
+    if info is None:
+        raise ServiceError(code="file_not_found", message="Source file not found", details={"file_id": file_id})
+    file_type, size_bytes = info
+    return {
+        "file_id": file_id,
+        "file_type": file_type,
+        "size_bytes": size_bytes,
+        "media_type": _CONTENT_MEDIA_TYPES.get(file_type, "application/octet-stream"),
+    }
+
+
+def read_source_content(session: Session, *, file_id: int, offset: int, length: int, tenant_id: str | None = None) -> bytes:
+    return _repo(session).read_content_range(
+        file_id,
+        tenant_id=tenant_id or settings.default_tenant_id,
+        offset=offset,
+        length=length,
+    )
+
+
+def iter_source_content(session: Session, *, file_id: int, start: int, end: int, tenant_id: str | None = None) -> Iterator[bytes]:
+    return _repo(session).iter_content_range(
+        file_id,
+        tenant_id=tenant_id or settings.default_tenant_id,
+        offset=start,
+        length=end - start + 1,
+        chunk_bytes=settings.content_stream_chunk_bytes,
+    )
+
+
 def video_to_text(*, source: str) -> dict:
     return {"source": source, "transcript": f"[MVP transcript placeholder] {source}"}
 
@@ -0,0 +1,111 @@
+import re
+
+import numpy as np
+
+# Work per document is bounded by these caps, not by document size: the input is cut at MAX_INPUT_CHARS,
+# every sentence gets a linear TF-IDF centroid score, and only the best MAX_CANDIDATES are ranked by TextRank.
+MAX_INPUT_CHARS = 200_000
+MAX_CANDIDATES = 160
+MAX_SENTENCE_CHARS = 600
+_DAMPING = 0.85
+_ITERATIONS = 50
+_TOLERANCE = 1e-6
+# Candidates this close (cosine) to an already chosen sentence add nothing to the summary.
+_REDUNDANCY = 0.8
+
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+_TOKEN = re.compile(r"\w\w+")
+
+
+def split_sentences(text: str) -> list[str]:
+    sentences = []
+    for part in _BOUNDARY.split(text[:MAX_INPUT_CHARS]):
+        sentence = " ".join(part.split())
+        # Runs without punctuation (spreadsheet rows, wrapped lists) are cut at word boundaries.
+        while len(sentence) > MAX_SENTENCE_CHARS:
+            cut = sentence.rfind(" ", 0, MAX_SENTENCE_CHARS)
+            cut = cut if cut > 0 else MAX_SENTENCE_CHARS
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def _tfidf(sentences: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sparse TF-IDF as (sentence, term, weight) triplets, each row L2-normalized."""
+    vocabulary: dict[str, int] = {}
+    rows: list[int] = []
+    terms: list[int] = []
+    for index, sentence in enumerate(sentences):
+        for token in _TOKEN.findall(sentence.lower()):
+            rows.append(index)
+            terms.append(vocabulary.setdefault(token, len(vocabulary)))
+    if not terms:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    size = len(vocabulary)
+    pairs, counts = np.unique(np.asarray(rows, dtype=np.int64) * size + np.asarray(terms, dtype=np.int64), return_counts=True)
+    row, term = np.divmod(pairs, size)
+    frequency = np.bincount(term, minlength=size)
+    idf = np.log((len(sentences) + 1) / (frequency + 1)) + 1
+    weight = (1 + np.log(counts)) * idf[term]
+    norms = np.sqrt(np.bincount(row, weights=weight * weight, minlength=len(sentences)))
+    return row, term, weight / norms[row]
+
+
+def _textrank(row: np.ndarray, term: np.ndarray, weight: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    columns, term = np.unique(term, return_inverse=True)
+    matrix = np.zeros((count, len(columns)))
+    matrix[row, term] = weight
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    scores = _pagerank(similarity, count)
+    return scores, similarity
+
+
+def _pagerank(similarity: np.ndarray, count: int) -> np.ndarray:
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, totals, out=np.full_like(similarity, 1.0 / count), where=totals > 0)
+    scores = np.full(count, 1.0 / count)
+    for _ in range(_ITERATIONS):
+        updated = (1 - _DAMPING) / count + _DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < _TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text: str, *, max_chars: int) -> str:
+    """Pick the most central sentences, in document order, within max_chars."""
+    if len(text) <= max_chars:
+        return text
+    sentences = split_sentences(text)
+    row, term, weight = _tfidf(sentences)
+    if not len(weight):
+        return text[:max_chars]
+
+    # Stage one, linear: similarity of every sentence to the document centroid.
+    centroid = np.bincount(term, weights=weight) / len(sentences)
+    centrality = np.bincount(row, weights=weight * centroid[term], minlength=len(sentences))
+    candidates = np.sort(np.argsort(-centrality, kind="stable")[:MAX_CANDIDATES])
+
+    # Stage two, quadratic in MAX_CANDIDATES at most: TextRank over the candidates' cosine similarities.
+    position = np.full(len(sentences), -1)
+    position[candidates] = np.arange(len(candidates))
+    keep = position[row] >= 0
+    scores, similarity = _textrank(position[row[keep]], term[keep], weight[keep], len(candidates))
+
+    ranked = np.argsort(-scores, kind="stable")
+    # The most central sentence always leads, cut to fit if it is longer than the whole budget.
+    chosen = [int(ranked[0])]
+    budget = max_chars - len(sentences[candidates[ranked[0]]])
+    for index in ranked[1:]:
+        if budget <= 0 or scores[index] < 1.0 / len(candidates):
+            # Below-average centrality: off-topic sentences are not worth filling the budget with.
+            break
+        cost = len(sentences[candidates[index]]) + 1
+        if cost > budget or similarity[index, chosen].max() >= _REDUNDANCY:
+            continue
+        chosen.append(int(index))
+        budget -= cost
+    return " ".join(sentences[candidates[index]] for index in sorted(chosen))[:max_chars]
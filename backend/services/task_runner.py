@@ -1,13 +1,276 @@
-from collections.abc import Callable
-from typing import TypeVar
+import asyncio
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from time import monotonic
+from typing import Any, TypeVar
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from backend.core.config import settings
+from backend.services.errors import ServiceError
+from backend.services.logging_utils import log_event
+from backend.services.metrics_service import observe_queue_wait
+from backend.services.scheduler import FairScheduler
 
 T = TypeVar("T")
 
 
 class TaskRunner:
-    def run(self, fn: Callable[[], T]) -> T:
-        return fn()
+    """Bounded pool with tenant admission limits.
+
+    With ``scheduler="fair"`` submissions wait in a FairScheduler and are handed to the pool only
+    when a worker is free, so priority classes and tenant weights decide who runs next instead of
+    submission order. ``"fifo"`` submits straight to the executor queue.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str = "task",
+        mode: str = "thread",
+        max_workers: int = 4,
+        queue_size: int = 64,
+        tenant_max_in_flight: int = 8,
+        retry_after_s: int = 1,
+        scheduler: str = "fair",
+        tenant_weights: Mapping[str, float] | None = None,
+        tenant_max_running: int = 0,
+    ):
+        self.name = name
+        self.mode = mode
+        self.max_workers = max_workers
+        self.tenant_max_in_flight = tenant_max_in_flight
+        self.retry_after_s = retry_after_s
+        self.scheduler = scheduler
+        # 0 lets one tenant use every worker while nobody else is waiting.
+        self.tenant_max_running = tenant_max_running
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=max_workers)
+            if mode == "process"
+            else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"docuhub-{name}")
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._lock = threading.Lock()
+        self._tenant_in_flight: dict[str, int] = defaultdict(int)
+        self._queue = FairScheduler(tenant_weights)
+        self._running = 0
+        self._tenant_running: dict[str, int] = defaultdict(int)
+        self._closed = False
+
+    def _release(self, tenant_id: str) -> None:
+        with self._lock:
+            self._tenant_in_flight[tenant_id] -= 1
+            if self._tenant_in_flight[tenant_id] <= 0:
+                del self._tenant_in_flight[tenant_id]
+        self._slots.release()
+
+    def submit(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        tenant_id: str | None = None,
+        priority: str = "interactive",
+        **kwargs: Any,
+    ) -> "Future[T]":
+        tenant = tenant_id or settings.default_tenant_id
+        if self._closed:
+            raise ServiceError(code="task_runner_closed", message="Task runner is shutting down")
+        if not self._slots.acquire(blocking=False):
+            raise ServiceError(
+                code="task_queue_full",
+                message="Task queue is full",
+                details={"retry_after_s": self.retry_after_s},
+            )
+
+        with self._lock:
+            if self._tenant_in_flight[tenant] >= self.tenant_max_in_flight:
+                self._slots.release()
+                raise ServiceError(
+                    code="tenant_concurrency_limited",
+                    message="Too many concurrent tasks for tenant",
+                    details={"retry_after_s": self.retry_after_s, "tenant_max_in_flight": self.tenant_max_in_flight},
+                )
+            self._tenant_in_flight[tenant] += 1
+
+        if self.scheduler == "fair":
+            future: Future = Future()
+            future.add_done_callback(lambda _: self._release(tenant))
+            with self._lock:
+                self._queue.push(tenant, (future, fn, args, kwargs, priority, monotonic()), priority=priority)
+            self._dispatch()
+            return future
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._release(tenant)
+            raise ServiceError(code="task_runner_closed", message="Task runner is shutting down")
+        future.add_done_callback(lambda _: self._release(tenant))
+        return future
+
+    def _can_run(self, tenant_id: str) -> bool:
+        return not self.tenant_max_running or self._tenant_running[tenant_id] < self.tenant_max_running
+
+    def _dispatch(self) -> None:
+        """Hand queued tasks to the executor while workers are free."""
+        while True:
+            with self._lock:
+                if self._closed or self._running >= self.max_workers:
+                    return
+                picked = self._queue.pop(self._can_run)
+                if picked is None:
+                    return
+                tenant, (future, fn, args, kwargs, priority, queued_at) = picked
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._running += 1
+                self._tenant_running[tenant] += 1
+            observe_queue_wait(self.name, tenant, priority, (monotonic() - queued_at) * 1000)
+            try:
+                inner = self._executor.submit(fn, *args, **kwargs)
+            except RuntimeError:
+                self._finish(tenant)
+                future.set_exception(ServiceError(code="task_runner_closed", message="Task runner is shutting down"))
+                continue
+            inner.add_done_callback(lambda done, future=future, tenant=tenant: self._complete(done, future, tenant))
+
+    def _finish(self, tenant_id: str) -> None:
+        with self._lock:
+            self._running -= 1
+            self._tenant_running[tenant_id] -= 1
+            if self._tenant_running[tenant_id] <= 0:
+                del self._tenant_running[tenant_id]
+
+    def _complete(self, inner: Future, future: Future, tenant_id: str) -> None:
+        # Free the worker and start the next task before waking the caller.
+        self._finish(tenant_id)
+        self._dispatch()
+        try:
+            exc = inner.exception()
+        except CancelledError as cancelled:
+            exc = cancelled
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(inner.result())
+
+    def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        tenant_id: str | None = None,
+        priority: str = "interactive",
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> T:
+        future = self.submit(fn, *args, tenant_id=tenant_id, priority=priority, **kwargs)
+        try:
+            if in_greenlet():
+                # Called from AsyncSession.run_sync: yield to the event loop while the pool works.
+                return await_only(asyncio.wait_for(asyncio.wrap_future(future), timeout))
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self.cancel(future)
+            raise ServiceError(code="task_timeout", message="Task did not complete in time", details={"timeout_s": timeout})
+
+    def run_each(
+        self,
+        fn: Callable[..., T],
+        arg_list: Sequence[tuple],
+        *,
+        tenant_id: str | None = None,
+        priority: str = "interactive",
+        timeout: float | None = None,
+    ) -> list[T | BaseException]:
+        # Keeps at most one task per worker in flight so each timeout starts when its task does.
+        window = max(1, min(self.max_workers, self.tenant_max_in_flight))
+        results: list[Any] = [None] * len(arg_list)
+        pending: dict[Future, tuple[int, float]] = {}
+        next_index = 0
+        while next_index < len(arg_list) or pending:
+            while next_index < len(arg_list) and len(pending) < window:
+                pending[self.submit(fn, *arg_list[next_index], tenant_id=tenant_id, priority=priority)] = (next_index, monotonic())
+                next_index += 1
+
+            wait_s = None
+            if timeout is not None:
+                wait_s = max(0.0, min(started for _, started in pending.values()) + timeout - monotonic())
+            self._wait_any(list(pending), wait_s)
+
+            now = monotonic()
+            for future, (index, started) in list(pending.items()):
+                if future.done():
+                    del pending[future]
+                    results[index] = future.exception() or future.result()
+                elif timeout is not None and now - started >= timeout:
+                    del pending[future]
+                    self.cancel(future)
+                    results[index] = ServiceError(
+                        code="task_timeout",
+                        message="Task did not complete in time",
+                        details={"timeout_s": timeout},
+                    )
+        return results
+
+    def _wait_any(self, futures: list[Future], timeout: float | None) -> None:
+        if in_greenlet():
+            waiters = [asyncio.wrap_future(future) for future in futures]
+            await_only(asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED))
+            return
+        wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+
+    def cancel(self, future: Future) -> bool:
+        return future.cancel()
+
+    def in_flight(self, tenant_id: str) -> int:
+        with self._lock:
+            return self._tenant_in_flight.get(tenant_id, 0)
+
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+            queued = self._queue.drain()
+        for future, *_ in queued:
+            future.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_runner_lock = threading.Lock()
+
+
+def shutdown_task_runner(*, wait: bool = True) -> None:
+    global _parser_runner
+    with _runner_lock:
+        runner, _parser_runner = _parser_runner, None
+    if runner is not None:
+        runner.shutdown(wait=wait)
+        log_event("task_runner_stopped", mode=runner.mode)
+
+
+_parser_runner: TaskRunner | None = None
 
 
-def get_task_runner() -> TaskRunner:
-    return TaskRunner()
+def get_parser_runner() -> TaskRunner:
+    global _parser_runner
+    if _parser_runner is None:
+        with _runner_lock:
+            if _parser_runner is None:
+                _parser_runner = TaskRunner(
+                    name="parser",
+                    mode=settings.parser_runner_mode,
+                    max_workers=settings.parser_workers,
+                    queue_size=settings.parser_queue_size,
+                    tenant_max_in_flight=settings.task_tenant_max_in_flight,
+                    retry_after_s=settings.task_retry_after_s,
+                    scheduler=settings.task_scheduler,
+                    tenant_weights=settings.scheduler_tenant_weights,
+                    tenant_max_running=settings.task_tenant_max_running,
+                )
+                log_event("parser_runner_started", mode=_parser_runner.mode, max_workers=_parser_runner.max_workers)
+    return _parser_runner
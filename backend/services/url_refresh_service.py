@@ -0,0 +1,153 @@
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import partial
+
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.repositories.blob_repository import content_sha256
+from backend.repositories.source_repository import SourceRepository
+from backend.services.errors import ServiceError
+from backend.services.http_fetch import close_http_pool, gather_capped
+from backend.services.logging_utils import log_event
+from backend.services.metrics_service import observe_content_write, observe_url_refresh
+from backend.services.passage_service import invalidate_source_passages
+from backend.services.source_service import DownloadedSource, fetch_url_source, offload_indexing
+
+REFRESH_STATUSES = ("not_modified", "unchanged", "changed", "failed")
+
+
+@dataclass
+class RefreshTarget:
+    file_id: int
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_sha256: str | None
+
+
+def _repo(session: Session) -> SourceRepository:
+    return SourceRepository(session, offload=offload_indexing)
+
+
+def get_refresh_target(session: Session, *, file_id: int, tenant_id: str | None = None) -> RefreshTarget:
+    source = _repo(session).get_source(file_id, tenant_id=tenant_id or settings.default_tenant_id)
+    if not source:
+        raise ServiceError(code="file_not_found", message="Source file not found", details={"file_id": file_id})
+    if not source.source_url:
+        raise ServiceError(code="source_not_refreshable", message="Source was not downloaded from a URL", details={"file_id": file_id})
+    return RefreshTarget(
+        file_id=source.id,
+        url=source.source_url,
+        etag=source.fetch_etag,
+        last_modified=source.fetch_last_modified,
+        content_sha256=source.content_sha256,
+    )
+
+
+def list_refresh_targets(
+    session: Session,
+    *,
+    tenant_id: str,
+    after_id: int = 0,
+    max_age_s: int = 0,
+) -> list[RefreshTarget]:
+    fetched_before = datetime.now(UTC) - timedelta(seconds=max_age_s) if max_age_s else None
+    rows = _repo(session).list_refresh_targets(
+        tenant_id=tenant_id,
+        limit=settings.batch_chunk_size,
+        after_id=after_id,
+        fetched_before=fetched_before,
+    )
+    return [RefreshTarget(*row) for row in rows]
+
+
+async def refetch(target: RefreshTarget) -> DownloadedSource:
+    return await fetch_url_source(target.url, etag=target.etag, last_modified=target.last_modified)
+
+
+def apply_refreshes(
+    session: Session,
+    *,
+    targets: list[RefreshTarget],
+    fetched: list[DownloadedSource | ServiceError],
+    tenant_id: str | None = None,
+) -> list[dict]:
+    resolved_tenant = tenant_id or settings.default_tenant_id
+    repo = _repo(session)
+    items = []
+    for target, outcome in zip(targets, fetched):
+        if isinstance(outcome, ServiceError):
+            items.append({"file_id": target.file_id, "status": "failed", "error": outcome.code})
+        elif outcome.not_modified:
+            # A 304 may carry fresh validators; otherwise the ones we sent stay valid.
+            repo.mark_fetched(
+                target.file_id,
+                etag=outcome.etag or target.etag,
+                last_modified=outcome.last_modified or target.last_modified,
+            )
+            items.append({"file_id": target.file_id, "status": "not_modified", "content_sha256": target.content_sha256})
+        elif content_sha256(outcome.content.encode("utf-8")) == target.content_sha256:
+            repo.mark_fetched(target.file_id, etag=outcome.etag, last_modified=outcome.last_modified)
+            items.append({"file_id": target.file_id, "status": "unchanged", "content_sha256": target.content_sha256})
+        else:
+            blob = repo.replace_content(
+                target.file_id,
+                tenant_id=resolved_tenant,
+                content=outcome.content,
+                etag=outcome.etag,
+                last_modified=outcome.last_modified,
+            )
+            observe_content_write(blob.size_bytes, deduplicated=blob.refcount > 1)
+            items.append({"file_id": target.file_id, "status": "changed", "content_sha256": blob.sha256})
+        observe_url_refresh(items[-1]["status"])
+    session.commit()
+    for item in items:
+        if item["status"] == "changed":
+            invalidate_source_passages(item["file_id"])
+    return items
+
+
+def apply_refresh(session: Session, *, target: RefreshTarget, fetched: DownloadedSource, tenant_id: str | None = None) -> dict:
+    (item,) = apply_refreshes(session, targets=[target], fetched=[fetched], tenant_id=tenant_id)
+    log_event("source_refreshed", file_id=target.file_id, status=item["status"])
+    return item
+
+
+async def refresh_url_sources(
+    *,
+    load_chunk: Callable[[int], Awaitable[list[RefreshTarget]]],
+    save_chunk: Callable[[list[RefreshTarget], list[DownloadedSource | ServiceError]], Awaitable[list[dict]]],
+) -> dict:
+    counts: Counter[str] = Counter()
+    after_id = 0
+    while targets := await load_chunk(after_id):
+        fetched = await gather_capped([(target.url, partial(refetch, target)) for target in targets])
+        counts.update(item["status"] for item in await save_chunk(targets, fetched))
+        after_id = targets[-1].file_id
+
+    summary = {status: counts[status] for status in REFRESH_STATUSES}
+    log_event("url_refresh_completed", checked=sum(counts.values()), **summary)
+    return {"checked": sum(counts.values()), **summary}
+
+
+def run_url_source_refresh(session: Session, *, tenant_id: str | None = None, max_age_s: int = 0) -> dict:
+    # Synchronous entry point for the background worker, which has no running event loop.
+    resolved_tenant = tenant_id or settings.default_tenant_id
+
+    async def _load_chunk(after_id: int) -> list[RefreshTarget]:
+        return list_refresh_targets(session, tenant_id=resolved_tenant, after_id=after_id, max_age_s=max_age_s)
+
+    async def _save_chunk(targets: list[RefreshTarget], fetched: list[DownloadedSource | ServiceError]) -> list[dict]:
+        return apply_refreshes(session, targets=targets, fetched=fetched, tenant_id=resolved_tenant)
+
+    async def _run() -> dict:
+        try:
+            return await refresh_url_sources(load_chunk=_load_chunk, save_chunk=_save_chunk)
+        finally:
+            await close_http_pool()
+
+    return asyncio.run(_run())
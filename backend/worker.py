@@ -0,0 +1,194 @@
+import argparse
+import os
+import signal
+import socket
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime
+from time import monotonic
+from uuid import uuid4
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.core.config import settings
+from backend.db.migrations import bootstrap_schema
+from backend.db.models import BackgroundJob
+from backend.db.session import SessionLocal, engine
+from backend.repositories.background_job_repository import BackgroundJobRepository
+from backend.services.errors import ServiceError
+from backend.services.job_events import get_job_events
+from backend.services.job_service import execute_job, schedule_url_source_refreshes
+from backend.services.logging_utils import configure_logging, log_event
+from backend.services.metrics_service import observe_queue_wait
+from backend.services.scheduler import PRIORITY_CLASSES
+from backend.services.task_runner import shutdown_task_runner
+
+
+class _LeaseHeartbeat(threading.Thread):
+    def __init__(self, session_factory: sessionmaker, *, job_id: int, worker_id: str):
+        super().__init__(name=f"lease-heartbeat-{job_id}", daemon=True)
+        self._session_factory = session_factory
+        self._job_id = job_id
+        self._worker_id = worker_id
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        interval = max(1.0, settings.worker_lease_s / 3)
+        while not self._stopped.wait(interval):
+            with self._session_factory() as session:
+                renewed = BackgroundJobRepository(session).extend_lease(
+                    job_id=self._job_id,
+                    worker_id=self._worker_id,
+                    lease_seconds=settings.worker_lease_s,
+                )
+            if not renewed:
+                log_event("job_lease_lost", job_id=self._job_id, worker_id=self._worker_id)
+                return
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+_PRIORITY_NAMES = {rank: name for name, rank in PRIORITY_CLASSES.items()}
+
+
+def _observe_queue_wait(job: BackgroundJob) -> None:
+    # A re-claimed job waited on an expired lease, not in the queue.
+    if job.attempts != 1 or job.created_at is None:
+        return
+    created_at = job.created_at if job.created_at.tzinfo else job.created_at.replace(tzinfo=UTC)
+    wait_ms = max(0.0, (datetime.now(UTC) - created_at).total_seconds() * 1000)
+    observe_queue_wait("job", job.tenant_id, _PRIORITY_NAMES.get(job.priority, "batch"), wait_ms)
+
+
+def _publish_result(job_id: int, status: str, outcome: dict) -> None:
+    # The last event a job's subscribers receive; status and result match what GET /jobs/{job_id} reports.
+    get_job_events().publish(job_id, "result", {"job_id": job_id, "status": status, "result": outcome})
+
+
+def _process_job(session: Session, session_factory: sessionmaker, job: BackgroundJob, worker_id: str) -> str:
+    repo = BackgroundJobRepository(session)
+    _observe_queue_wait(job)
+    if job.attempts > settings.job_max_attempts:
+        outcome = {"error": {"code": "job_attempts_exhausted", "message": "Job exceeded maximum attempts"}}
+        repo.finish_job(
+            job_id=job.id,
+            worker_id=worker_id,
+            status="failed",
+            result=outcome,
+        )
+        _publish_result(job.id, "failed", outcome)
+        return "failed"
+
+    log_event("job_started", job_id=job.id, job_type=job.job_type, attempt=job.attempts, worker_id=worker_id)
+    get_job_events().publish(job.id, "status", {"job_id": job.id, "status": "running", "attempts": job.attempts})
+    heartbeat = _LeaseHeartbeat(session_factory, job_id=job.id, worker_id=worker_id)
+    heartbeat.start()
+    try:
+        result = execute_job(session, job)
+        status = "completed"
+        outcome = {"data": result}
+    except ServiceError as exc:
+        session.rollback()
+        status = "failed"
+        outcome = {"error": {"code": exc.code, "message": exc.message, "details": exc.details}}
+    except Exception as exc:
+        session.rollback()
+        status = "failed"
+        outcome = {"error": {"code": "internal_error", "message": "An unexpected internal error occurred"}}
+        log_event("job_internal_error", job_id=job.id, error=str(exc) if settings.app_env != "production" else "redacted")
+    finally:
+        heartbeat.stop()
+
+    if not repo.finish_job(job_id=job.id, worker_id=worker_id, status=status, result=outcome):
+        log_event("job_result_discarded", job_id=job.id, worker_id=worker_id, reason="lease_lost")
+        return "lease_lost"
+    log_event("job_finished", job_id=job.id, job_type=job.job_type, status=status, worker_id=worker_id)
+    _publish_result(job.id, status, outcome)
+    return status
+
+
+def run_worker(
+    *,
+    session_factory: sessionmaker = SessionLocal,
+    worker_id: str | None = None,
+    once: bool = False,
+    stop_event: threading.Event | None = None,
+) -> int:
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+    stop_event = stop_event or threading.Event()
+    processed = 0
+    next_refresh_at = monotonic()
+    log_event("worker_started", worker_id=worker_id, lease_s=settings.worker_lease_s)
+
+    while not stop_event.is_set():
+        if settings.url_refresh_interval_s and monotonic() >= next_refresh_at:
+            with session_factory() as session:
+                scheduled = schedule_url_source_refreshes(session)
+            if scheduled:
+                log_event("url_refresh_scheduled", worker_id=worker_id, job_ids=scheduled)
+            next_refresh_at = monotonic() + settings.url_refresh_interval_s
+        with session_factory() as session:
+            job = BackgroundJobRepository(session).claim_next_job(
+                worker_id=worker_id,
+                lease_seconds=settings.worker_lease_s,
+                tenant_weights=settings.scheduler_tenant_weights,
+                tenant_max_running=settings.job_tenant_max_running,
+            )
+            if job is not None:
+                _process_job(session, session_factory, job, worker_id)
+                processed += 1
+                continue
+        if once:
+            break
+        stop_event.wait(settings.worker_poll_interval_s)
+
+    log_event("worker_stopped", worker_id=worker_id, processed=processed)
+    return processed
+
+
+def start_embedded_workers(count: int) -> Callable[[], None]:
+    """Run worker loops as daemon threads of this process, so their job events reach its SSE subscribers.
+
+    Returns a function that stops them and waits for their current jobs.
+    """
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(target=run_worker, kwargs={"stop_event": stop_event}, name=f"docuhub-worker-{index}", daemon=True)
+        for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+
+    def stop() -> None:
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+    return stop
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="DocuHub background job worker")
+    parser.add_argument("--once", action="store_true", help="drain queued jobs and exit")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if not settings.worker_enabled:
+        log_event("worker_disabled", reason="WORKER_ENABLED is false")
+        return 1
+
+    bootstrap_schema(engine)
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+    try:
+        run_worker(once=args.once, stop_event=stop_event)
+    finally:
+        shutdown_task_runner()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
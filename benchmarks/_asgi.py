@@ -0,0 +1,101 @@
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+
+
+def configure_env(**overrides: str) -> str:
+    # Must run before any backend import: settings are read once at import time.
+    db_path = os.path.join(tempfile.mkdtemp(prefix="docuhub-bench-"), "bench.db")
+    os.environ.update(
+        {
+            "APP_ENV": "local",
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "RATE_LIMIT_REQUESTS": "100000000",
+            "CONCURRENCY_LIMIT": "10000",
+            **overrides,
+        }
+    )
+    logging.getLogger("docuhub").disabled = True
+    return db_path
+
+
+async def call(
+    app,
+    method: str,
+    path: str,
+    *,
+    body=None,
+    headers: dict | None = None,
+    chunks=None,
+) -> tuple[int, bytes]:
+    raw_body = json.dumps(body).encode("utf-8") if body is not None and not isinstance(body, bytes) else (body or b"")
+    path_only, _, query = path.partition("?")
+    if chunks is None:
+        chunks = iter([raw_body])
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(raw_body)).encode())]
+    else:
+        raw_headers = [(b"content-type", b"application/octet-stream"), (b"transfer-encoding", b"chunked")]
+    for key, value in (headers or {}).items():
+        raw_headers.append((key.lower().encode(), value.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path_only,
+        "raw_path": path_only.encode(),
+        "query_string": query.encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    pending = iter(chunks)
+    current = next(pending, b"")
+    finished = False
+    responded = asyncio.Event()
+    status = 0
+    response_chunks: list[bytes] = []
+
+    async def receive():
+        nonlocal current, finished
+        if finished:
+            await responded.wait()
+            return {"type": "http.disconnect"}
+        upcoming = next(pending, None)
+        message = {"type": "http.request", "body": current, "more_body": upcoming is not None}
+        if upcoming is None:
+            finished = True
+        else:
+            current = upcoming
+        return message
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            response_chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                responded.set()
+
+    await app(scope, receive, send)
+    return status, b"".join(response_chunks)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label: str, samples_ms: list[float]) -> str:
+    return (
+        f"{label}: n={len(samples_ms)} p50={percentile(samples_ms, 50):.2f}ms "
+        f"p99={percentile(samples_ms, 99):.2f}ms mean={statistics.fmean(samples_ms) if samples_ms else 0:.2f}ms"
+    )
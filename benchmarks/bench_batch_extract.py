@@ -0,0 +1,86 @@
+"""Batch extraction wall time and SQL statement count at 100, 1k and 10k documents.
+
+Each size runs a full batch, then an incremental one after adding a document, both with a cold extraction
+cache as in a fresh nightly process: the incremental run should only pay for the new document.
+
+Usage: python -m benchmarks.bench_batch_extract [--sizes 100,1000,10000]
+"""
+import argparse
+import hashlib
+import time
+
+from benchmarks._asgi import configure_env
+
+configure_env()
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from backend.db.migrations import bootstrap_schema  # noqa: E402
+from backend.db.models import Document, Source  # noqa: E402
+from backend.db.session import SessionLocal, engine  # noqa: E402
+from backend.services.extraction_cache import reset_extraction_cache  # noqa: E402
+from backend.services.product_service import create_project, run_project_batch_extract  # noqa: E402
+
+
+def _add_documents(session, project_id: int, start: int, count: int) -> None:
+    bodies = [
+        " ".join(f"Document {i} sentence {j} covers topic {j % 13} of the corpus." for j in range(60))
+        for i in range(start, start + count)
+    ]
+    source_ids = session.execute(
+        insert(Source).returning(Source.id),
+        [
+            {
+                "file_name": f"{start + i}.txt",
+                "file_type": "txt",
+                "legacy_content": body,
+                "content_sha256": hashlib.sha256(body.encode("utf-8")).hexdigest(),
+                "tenant_id": "default",
+            }
+            for i, body in enumerate(bodies)
+        ],
+    ).scalars().all()
+    session.execute(
+        insert(Document),
+        [{"project_id": project_id, "source_id": sid, "title": f"doc {sid}", "tenant_id": "default"} for sid in source_ids],
+    )
+    session.commit()
+
+
+def _seed(session, size: int) -> int:
+    project_id = create_project(session, name=f"bench-{size}")["project_id"]
+    _add_documents(session, project_id, 0, size)
+    return project_id
+
+
+def main(sizes: list[int]) -> None:
+    bootstrap_schema(engine)
+    statements = 0
+
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    for size in sizes:
+        with SessionLocal() as session:
+            project_id = _seed(session, size)
+            for label, incremental in (("full", False), ("incremental", True)):
+                if incremental:
+                    _add_documents(session, project_id, size, 1)
+                reset_extraction_cache()
+                statements = 0
+                started = time.perf_counter()
+                result = run_project_batch_extract(session, project_id=project_id, mode="summary", incremental=incremental)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"docs={size:>6} {label:<11} items={result['count']:>6} recomputed={result['recomputed']:>6} "
+                    f"statements={statements:>4} elapsed={elapsed * 1000:.1f}ms docs/s={result['count'] / elapsed:,.0f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000,10000")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")])
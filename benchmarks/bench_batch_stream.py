@@ -0,0 +1,93 @@
+"""Time to first result and peak Python memory of a project batch, buffered JSON vs NDJSON streaming.
+
+Both paths run the same service code; the streaming one serializes and drops each line as the NDJSON route does.
+
+Usage: python -m benchmarks.bench_batch_stream [--sizes 1000,10000,50000]
+"""
+import argparse
+import hashlib
+import json
+import time
+import tracemalloc
+
+from benchmarks._asgi import configure_env
+
+configure_env()
+
+from sqlalchemy import insert  # noqa: E402
+
+from backend.db.migrations import bootstrap_schema  # noqa: E402
+from backend.db.models import Document, Source  # noqa: E402
+from backend.db.session import SessionLocal, engine  # noqa: E402
+from backend.services.product_service import (  # noqa: E402
+    create_project,
+    execute_batch_run,
+    iter_batch_run,
+    start_project_batch,
+)
+
+
+def _seed(session, size: int) -> int:
+    project_id = create_project(session, name=f"bench-{size}")["project_id"]
+    bodies = [f"document {i} " + "body text " * 100 for i in range(size)]
+    source_ids = session.execute(
+        insert(Source).returning(Source.id),
+        [
+            {
+                "file_name": f"{i}.txt",
+                "file_type": "txt",
+                "legacy_content": body,
+                "content_sha256": hashlib.sha256(body.encode("utf-8")).hexdigest(),
+                "tenant_id": "default",
+            }
+            for i, body in enumerate(bodies)
+        ],
+    ).scalars().all()
+    session.execute(
+        insert(Document),
+        [{"project_id": project_id, "source_id": sid, "title": f"doc {sid}", "tenant_id": "default"} for sid in source_ids],
+    )
+    session.commit()
+    return project_id
+
+
+def _buffered(session, batch_id: int) -> float:
+    started = time.perf_counter()
+    json.dumps(execute_batch_run(session, batch_id=batch_id))
+    return time.perf_counter() - started
+
+
+def _streamed(session, batch_id: int) -> float:
+    started = time.perf_counter()
+    first_item = None
+    for kind, payload in iter_batch_run(session, batch_id=batch_id):
+        json.dumps({kind: payload})
+        if kind == "item" and first_item is None:
+            first_item = time.perf_counter() - started
+    return first_item or 0.0
+
+
+def main(sizes: list[int]) -> None:
+    bootstrap_schema(engine)
+    for size in sizes:
+        with SessionLocal() as session:
+            project_id = _seed(session, size)
+            for label, run in (("json", _buffered), ("ndjson", _streamed)):
+                batch_id = start_project_batch(session, project_id=project_id, mode="text")
+                tracemalloc.start()
+                started = time.perf_counter()
+                first = run(session, batch_id)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"docs={size:>6} {label:<6} first_item={first * 1000:>8.1f}ms "
+                    f"total={elapsed * 1000:>8.1f}ms peak={peak / 1_048_576:>6.1f}MiB"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    args = parser.parse_args()
+    main([int(size) for size in args.sizes.split(",")])
@@ -0,0 +1,104 @@
+"""Write/read latency and on-disk size of source bodies stored raw vs compressed.
+
+Usage: python -m benchmarks.bench_blob_compression [--corpus DIR] [--docs 300]
+
+Without --corpus a synthetic text corpus of mixed sizes (1KB to 1MB) is generated; with it, every
+.txt/.md/.csv/.json/.html file in DIR is used. Each codec writes into its own fresh SQLite file.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.config import settings
+from backend.db.migrations import bootstrap_schema
+from backend.db.models import ContentBlob
+from backend.repositories.source_repository import SourceRepository
+
+_WORDS = (
+    "contract clause party tenant invoice amount due payment term notice section schedule annex "
+    "liability warranty termination confidential agreement date signature period renewal fee"
+).split()
+_TEXT_SUFFIXES = {"txt", "md", "csv", "json", "html"}
+
+
+def _synthetic_corpus(docs: int) -> list[str]:
+    rng = random.Random(7)
+    corpus = []
+    for n in range(docs):
+        size = rng.choice([1_000, 8_000, 64_000, 256_000, 1_000_000])
+        lines = []
+        length = 0
+        while length < size:
+            line = f"{n}.{len(lines)} " + " ".join(rng.choices(_WORDS, k=12)) + f" {rng.randint(0, 99999)}\n"
+            lines.append(line)
+            length += len(line)
+        corpus.append("".join(lines))
+    return corpus
+
+
+def _load_corpus(directory: str) -> list[str]:
+    return [
+        path.read_text("utf-8", errors="replace")
+        for path in sorted(Path(directory).iterdir())
+        if path.suffix.lstrip(".").lower() in _TEXT_SUFFIXES
+    ]
+
+
+def _run(codec: str, corpus: list[str]) -> dict:
+    settings.content_compression_codec = codec
+    db_path = os.path.join(tempfile.mkdtemp(prefix="docuhub-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}", future=True)
+    bootstrap_schema(engine)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+    writes, reads = [], []
+    with Session() as session:
+        repo = SourceRepository(session)
+        ids = []
+        for n, body in enumerate(corpus):
+            started = time.perf_counter()
+            ids.append(repo.create_source(file_name=f"{n}.txt", file_type="txt", content=body, tenant_id="bench").id)
+            writes.append(time.perf_counter() - started)
+        session.expunge_all()
+        for source_id in ids:
+            started = time.perf_counter()
+            repo.get_source(source_id, tenant_id="bench").content
+            reads.append(time.perf_counter() - started)
+        stored = session.execute(select(func.sum(func.length(ContentBlob.data)))).scalar_one()
+    engine.dispose()
+    return {
+        "codec": codec,
+        "write_p50_ms": statistics.median(writes) * 1000,
+        "read_p50_ms": statistics.median(reads) * 1000,
+        "stored_mb": stored / 1e6,
+        "file_mb": os.path.getsize(db_path) / 1e6,
+    }
+
+
+def main(corpus: list[str]) -> None:
+    logical = sum(len(body.encode("utf-8")) for body in corpus)
+    print(f"corpus: {len(corpus)} docs, {logical / 1e6:.1f}MB")
+    baseline = None
+    for codec in ("identity", "zlib"):
+        result = _run(codec, corpus)
+        baseline = baseline or result
+        print(
+            f"{codec:>8}: write p50={result['write_p50_ms']:.2f}ms read p50={result['read_p50_ms']:.2f}ms "
+            f"blobs={result['stored_mb']:.1f}MB db file={result['file_mb']:.1f}MB "
+            f"({baseline['file_mb'] / result['file_mb']:.1f}x smaller)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus")
+    parser.add_argument("--docs", type=int, default=300)
+    args = parser.parse_args()
+    main(_load_corpus(args.corpus) if args.corpus else _synthetic_corpus(args.docs))
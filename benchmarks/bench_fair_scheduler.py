@@ -0,0 +1,85 @@
+"""Small-tenant task latency next to a noisy neighbour, FIFO vs the fair scheduler.
+
+A simulation on the shared TaskRunner: sleep-based tasks stand in for parses so results do not
+depend on the corpus. One noisy tenant keeps several run_each batches going at once while a few
+small tenants each submit one task at a time; we report the small tenants' submit-to-result
+latency and the noisy tenant's throughput.
+
+Usage: python -m benchmarks.bench_fair_scheduler [--seconds 3] [--workers 4] [--small-tenants 4]
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks._asgi import configure_env
+
+configure_env()
+
+from backend.services.task_runner import TaskRunner  # noqa: E402
+
+_NOISY_TASK_S = 0.02
+_SMALL_TASK_S = 0.005
+_NOISY_STREAMS = 4
+_NOISY_BATCH = 32
+
+
+def _scenario(scheduler: str, tenant_max_running: int, small_priority: str, args) -> None:
+    runner = TaskRunner(
+        name="bench",
+        max_workers=args.workers,
+        queue_size=1024,
+        tenant_max_in_flight=1024,
+        scheduler=scheduler,
+        tenant_max_running=tenant_max_running,
+    )
+    stop = threading.Event()
+    noisy_done = [0]
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def noisy() -> None:
+        while not stop.is_set():
+            results = runner.run_each(time.sleep, [(_NOISY_TASK_S,)] * _NOISY_BATCH, tenant_id="noisy", priority="batch")
+            with lock:
+                noisy_done[0] += len(results)
+
+    def small(tenant_id: str) -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            runner.run(time.sleep, _SMALL_TASK_S, tenant_id=tenant_id, priority=small_priority)
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=noisy) for _ in range(_NOISY_STREAMS)]
+    threads += [threading.Thread(target=small, args=(f"small-{i}",)) for i in range(args.small_tenants)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    runner.shutdown()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    label = f"{scheduler}{f' cap={tenant_max_running}' if tenant_max_running else ''}"
+    print(
+        f"{label:<12} small={small_priority:<11} small_p50={quantiles[49]:>7.1f}ms small_p99={quantiles[98]:>7.1f}ms "
+        f"small_tasks={len(latencies):>5} noisy_tasks/s={noisy_done[0] / args.seconds:>6.1f}"
+    )
+
+
+def main(args) -> None:
+    for small_priority in ("batch", "interactive"):
+        _scenario("fifo", 0, small_priority, args)
+        _scenario("fair", 0, small_priority, args)
+        _scenario("fair", max(1, args.workers - 1), small_priority, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--small-tenants", type=int, default=4)
+    main(parser.parse_args())
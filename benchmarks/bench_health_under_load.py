@@ -0,0 +1,87 @@
+"""p99 latency of GET /health while /extract and batch extraction run concurrently.
+
+Usage: python -m benchmarks.bench_health_under_load [--seconds 5] [--workers 8] [--docs 200]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._asgi import call, configure_env, summarize
+
+configure_env()
+
+from backend.db.migrations import bootstrap_schema  # noqa: E402
+from backend.db.session import engine  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.services.auth_service import create_access_token  # noqa: E402
+
+PREFIX = "/api/v1"
+
+
+async def _seed(docs: int, headers: dict) -> tuple[int, int]:
+    file_ids = []
+    for idx in range(docs):
+        _, body = await call(
+            app, "POST", f"{PREFIX}/upload", body={"file_name": f"d{idx}.txt", "file_type": "txt", "content": "lorem ipsum " * 400}
+        )
+        file_ids.append(int(body.split(b'"file_id":')[1].split(b",")[0]))
+    _, body = await call(app, "POST", f"{PREFIX}/projects", body={"name": "bench", "description": ""}, headers=headers)
+    project_id = int(body.split(b'"project_id":')[1].split(b",")[0])
+    for file_id in file_ids:
+        await call(
+            app,
+            "POST",
+            f"{PREFIX}/projects/{project_id}/documents",
+            body={"source_id": file_id, "title": f"doc {file_id}"},
+            headers=headers,
+        )
+    return file_ids[0], project_id
+
+
+async def _load(stop: asyncio.Event, file_id: int, project_id: int, headers: dict, worker: int) -> None:
+    while not stop.is_set():
+        if worker % 4 == 0:
+            await call(app, "POST", f"{PREFIX}/projects/{project_id}/batches/extract", body={"mode": "summary"}, headers=headers)
+        else:
+            await call(app, "POST", f"{PREFIX}/extract", body={"file_id": file_id, "mode": "text"})
+
+
+async def _probe(stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await call(app, "GET", f"{PREFIX}/health")
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def main(seconds: float, workers: int, docs: int) -> None:
+    bootstrap_schema(engine)
+    headers = {"authorization": f"Bearer {create_access_token(sub='bench', role='admin')}"}
+    file_id, project_id = await _seed(docs, headers)
+
+    idle: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, idle))
+    await asyncio.sleep(min(seconds, 2))
+    stop.set()
+    await probe
+
+    loaded: list[float] = []
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(_load(stop, file_id, project_id, headers, n)) for n in range(workers)]
+    probe = asyncio.create_task(_probe(stop, loaded))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(probe, *tasks)
+
+    print(summarize("/health idle", idle))
+    print(summarize(f"/health under load ({workers} workers, {docs} docs/batch)", loaded))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--docs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.workers, args.docs))
@@ -0,0 +1,64 @@
+"""Fan-out cost of the in-process job event hub: publish-to-delivery latency by subscriber count.
+
+A worker thread publishes item events for one job while N SSE-style subscribers read them on the
+event loop. Publishing never touches the database.
+
+Usage: python -m benchmarks.bench_job_events [--subscribers 1,100,1000] [--events 2000]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from benchmarks._asgi import configure_env, percentile
+
+configure_env()
+
+from backend.services.job_events import JobEventHub  # noqa: E402
+
+
+async def _scenario(subscribers: int, events: int) -> None:
+    hub = JobEventHub(history=events + 1)
+    subscriptions = [hub.subscribe(1) for _ in range(subscribers)]
+    latencies: list[float] = []
+
+    async def _read(subscription) -> None:
+        while True:
+            batch = await subscription.next()
+            received = time.perf_counter()
+            for _, event, data in batch:
+                if event == "result":
+                    return
+                latencies.append(received - data["sent"])
+
+    def _publish() -> None:
+        for n in range(events):
+            hub.publish(1, "item", {"n": n, "sent": time.perf_counter()})
+            if n % 50 == 0:
+                time.sleep(0.001)
+        hub.publish(1, "result", {})
+
+    started = time.perf_counter()
+    publisher = threading.Thread(target=_publish)
+    publisher.start()
+    await asyncio.gather(*(_read(subscription) for subscription in subscriptions))
+    elapsed = time.perf_counter() - started
+    publisher.join()
+    samples_ms = [latency * 1000 for latency in latencies]
+    print(
+        f"subscribers={subscribers:>5} events={events} deliveries/s={len(latencies) / elapsed:>10.0f} "
+        f"latency_p50={percentile(samples_ms, 50):>7.2f}ms latency_p99={percentile(samples_ms, 99):>7.2f}ms"
+    )
+
+
+def main(subscriber_counts: list[int], events: int) -> None:
+    for subscribers in subscriber_counts:
+        asyncio.run(_scenario(subscribers, events))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", default="1,100,1000")
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+    main([int(count) for count in args.subscribers.split(",")], args.events)
@@ -0,0 +1,73 @@
+"""MinHash signature throughput and near-duplicate lookup latency as the corpus grows.
+
+Usage: python -m benchmarks.bench_minhash [--docs 1000,10000] [--words 2000]
+
+Documents are synthetic word streams; every tenth one is a lightly edited copy of an earlier one.
+Lookup latency should stay roughly flat across corpus sizes: only LSH bucket collisions are scored.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.repositories.similarity_repository import SimilarityRepository, minhash_signature
+
+_VOCABULARY = [f"term{n}" for n in range(20000)]
+
+
+def _corpus(docs: int, words: int) -> list[str]:
+    rng = random.Random(docs)
+    corpus: list[list[str]] = []
+    for n in range(docs):
+        if n % 10 == 9:
+            tokens = list(corpus[rng.randrange(n)])
+            for _ in range(words // 50):
+                tokens[rng.randrange(words)] = rng.choice(_VOCABULARY)
+        else:
+            tokens = rng.choices(_VOCABULARY, k=words)
+        corpus.append(tokens)
+    return [" ".join(tokens) for tokens in corpus]
+
+
+def main(doc_counts: list[int], words: int) -> None:
+    for docs in doc_counts:
+        corpus = _corpus(docs, words)
+        started = time.perf_counter()
+        for body in corpus:
+            minhash_signature(body)
+        signature_s = time.perf_counter() - started
+        mb = sum(len(body) for body in corpus) / 1e6
+
+        engine = create_engine("sqlite:///:memory:", future=True)
+        bootstrap_schema(engine)
+        with sessionmaker(bind=engine, future=True)() as session:
+            repo = SimilarityRepository(session)
+            started = time.perf_counter()
+            for source_id, body in enumerate(corpus, start=1):
+                repo.index_source(source_id=source_id, tenant_id="default", body=body)
+            session.commit()
+            index_s = time.perf_counter() - started
+
+            rng = random.Random(1)
+            latencies = []
+            for source_id in rng.sample(range(1, docs + 1), min(200, docs)):
+                started = time.perf_counter()
+                repo.similar(source_id, tenant_id="default", min_score=0.5, limit=10)
+                latencies.append((time.perf_counter() - started) * 1000)
+        print(
+            f"{docs:>6} docs: signatures {docs / signature_s:.0f} docs/s ({mb / signature_s:.1f}MB/s), "
+            f"index {docs / index_s:.0f} docs/s, lookup p50 {statistics.median(latencies):.2f}ms "
+            f"p99 {statistics.quantiles(latencies, n=100)[98]:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", default="1000,10000")
+    parser.add_argument("--words", type=int, default=2000)
+    args = parser.parse_args()
+    main([int(value) for value in args.docs.split(",")], args.words)
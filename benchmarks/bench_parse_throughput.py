@@ -0,0 +1,74 @@
+"""Parser throughput in pages (pdf), blocks (docx) or rows (xlsx) per second, overall and per worker process.
+
+Usage: python -m benchmarks.bench_parse_throughput [--corpus DIR] [--workers 1,2,4]
+
+Without --corpus a synthetic corpus is generated: text-only PDFs, DOCX paragraphs and XLSX rows.
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from backend.services.extractors import iter_pages, parser_for
+from backend.services.task_runner import TaskRunner
+from tests._corpus import build_docx, build_pdf, build_xlsx
+
+_LINE = "The quick brown fox jumps over the lazy dog while the parser keeps counting pages."
+
+
+def _count_units(data: bytes, parser: str) -> int:
+    return sum(1 for _ in iter_pages(data, parser))
+
+
+def _synthetic_corpus(docs: int, pages: int) -> list[tuple[str, bytes]]:
+    page_text = "\n".join(f"{n:03d} {_LINE}" for n in range(40))
+    corpus = [(f"doc{n}.pdf", build_pdf([page_text] * pages)) for n in range(docs)]
+    corpus += [(f"doc{n}.docx", build_docx([_LINE] * pages * 20)) for n in range(docs)]
+    corpus += [(f"doc{n}.xlsx", build_xlsx([[n, row, _LINE] for row in range(pages * 20)])) for n in range(docs)]
+    return corpus
+
+
+def _load_corpus(directory: str) -> list[tuple[str, bytes]]:
+    return [
+        (path.name, path.read_bytes())
+        for path in sorted(Path(directory).iterdir())
+        if path.suffix.lstrip(".").lower() in {"pdf", "docx", "xlsx"}
+    ]
+
+
+def main(corpus: list[tuple[str, bytes]], worker_counts: list[int]) -> None:
+    by_parser: dict[str, list[bytes]] = defaultdict(list)
+    for name, data in corpus:
+        by_parser[parser_for(name.rsplit(".", 1)[-1])].append(data)
+
+    for workers in worker_counts:
+        runner = TaskRunner(mode="process", max_workers=workers, queue_size=len(corpus), tenant_max_in_flight=workers)
+        try:
+            runner.run_each(_count_units, [(b"warm", "text")] * workers)
+            for parser, documents in sorted(by_parser.items()):
+                started = time.perf_counter()
+                outcomes = runner.run_each(_count_units, [(data, parser) for data in documents])
+                elapsed = time.perf_counter() - started
+                failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+                units = sum(outcome for outcome in outcomes if not isinstance(outcome, BaseException))
+                print(
+                    f"workers={workers} parser={parser:<4} docs={len(documents):>3} units={units:>6} "
+                    f"elapsed={elapsed:.2f}s units/s={units / elapsed:,.0f} "
+                    f"units/s/core={units / elapsed / workers:,.0f} failures={len(failures)}"
+                )
+        finally:
+            runner.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="directory of .pdf/.docx/.xlsx files")
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})))
+    parser.add_argument("--docs", type=int, default=4, help="synthetic documents per type")
+    parser.add_argument("--pages", type=int, default=25, help="pages per synthetic pdf")
+    args = parser.parse_args()
+    main(
+        _load_corpus(args.corpus) if args.corpus else _synthetic_corpus(args.docs, args.pages),
+        [int(n) for n in args.workers.split(",")],
+    )
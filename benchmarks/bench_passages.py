@@ -0,0 +1,74 @@
+"""Per-project passage search latency (p50/p95) at 10k and 100k passages.
+
+Usage: python -m benchmarks.bench_passages [--passages 10000,100000] [--queries 300]
+
+Each size gets its own project of synthetic documents (Zipf-distributed vocabulary, about ten passages
+each). Reported: cold index load, warm query p50/p95 end to end through the service (freshness check,
+scoring and passage fetch included), and the cost of picking up one newly linked document.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._asgi import configure_env
+
+configure_env()
+
+from backend.core.config import settings  # noqa: E402
+from backend.db.migrations import bootstrap_schema  # noqa: E402
+from backend.db.session import SessionLocal, engine  # noqa: E402
+from backend.services.passage_service import reset_passage_index_cache, search_project_passages  # noqa: E402
+from backend.services.product_service import add_document_to_project, create_project  # noqa: E402
+from backend.services.source_service import upload_source  # noqa: E402
+
+_VOCABULARY = [f"term{n}" for n in range(30000)]
+_WEIGHTS = [1 / (rank + 1) for rank in range(len(_VOCABULARY))]
+
+
+def _document(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(_VOCABULARY, weights=_WEIGHTS, k=words))
+
+
+def _timed(session, project_id: int, query: str) -> float:
+    started = time.perf_counter()
+    search_project_passages(session, project_id=project_id, q=query, limit=10)
+    return (time.perf_counter() - started) * 1000
+
+
+def main(sizes: list[int], queries: int) -> None:
+    bootstrap_schema(engine)
+    step = settings.passage_words - settings.passage_overlap_words
+    words = step * 10 + settings.passage_overlap_words
+    for size in sizes:
+        rng = random.Random(size)
+        with SessionLocal() as session:
+            project_id = create_project(session, name=f"bench-{size}")["project_id"]
+            started = time.perf_counter()
+            for n in range(size // 10):
+                source = upload_source(session, file_name=f"{n}.txt", file_type="txt", content=_document(rng, words))
+                add_document_to_project(session, project_id=project_id, source_id=source["file_id"], title=f"doc {n}")
+            seed_s = time.perf_counter() - started
+
+            reset_passage_index_cache()
+            cold_ms = _timed(session, project_id, "term1 term50")
+            latencies = [
+                _timed(session, project_id, " ".join(rng.choices(_VOCABULARY[:5000], k=rng.randint(1, 4))))
+                for _ in range(queries)
+            ]
+            source = upload_source(session, file_name="late.txt", file_type="txt", content=_document(rng, words))
+            add_document_to_project(session, project_id=project_id, source_id=source["file_id"], title="late")
+            append_ms = _timed(session, project_id, "term1 term50")
+        p95 = statistics.quantiles(latencies, n=20)[18]
+        print(
+            f"{size:>7} passages (seeded in {seed_s:.0f}s): cold load {cold_ms:.0f}ms, "
+            f"query p50 {statistics.median(latencies):.2f}ms p95 {p95:.2f}ms, append one document {append_ms:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--passages", default="10000,100000")
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+    main([int(value) for value in args.passages.split(",")], args.queries)
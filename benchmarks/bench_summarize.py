@@ -0,0 +1,78 @@
+"""Extractive summary cost per document and for a 1k-document project batch, cold and cached.
+
+Usage: python -m benchmarks.bench_summarize [--docs 1000] [--summary-chars 400]
+
+Documents are synthetic prose from 2KB to 1MB. Per-document time should level off past the
+summarizer's input cap (200k chars) however large the document; the cached batch never re-summarizes.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._asgi import configure_env
+
+configure_env()
+
+from backend.db.migrations import bootstrap_schema  # noqa: E402
+from backend.db.session import SessionLocal, engine  # noqa: E402
+from backend.services.product_service import add_document_to_project, create_project, run_project_batch_extract  # noqa: E402
+from backend.services.source_service import upload_source  # noqa: E402
+from backend.services.summarizer import summarize  # noqa: E402
+
+_VOCABULARY = [f"term{n}" for n in range(5000)]
+_SIZES = [2_000, 20_000, 100_000, 1_000_000]
+
+
+def _document(rng: random.Random, size: int) -> str:
+    sentences = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choices(_VOCABULARY, k=rng.randint(6, 30))).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def _per_size(summary_chars: int) -> None:
+    rng = random.Random(1)
+    for size in _SIZES:
+        body = _document(rng, size)
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            summarize(body, max_chars=summary_chars)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"{size:>9} chars: summarize p50 {statistics.median(timings):.1f}ms max {max(timings):.1f}ms")
+
+
+def _batch(docs: int, summary_chars: int) -> None:
+    rng = random.Random(2)
+    bootstrap_schema(engine)
+    with SessionLocal() as session:
+        project_id = create_project(session, name="bench-summary")["project_id"]
+        for n in range(docs):
+            body = _document(rng, rng.choice(_SIZES[:3]))
+            source = upload_source(session, file_name=f"{n}.txt", file_type="txt", content=body)
+            add_document_to_project(session, project_id=project_id, source_id=source["file_id"], title=f"doc {n}")
+        for label in ("cold", "cached"):
+            started = time.perf_counter()
+            result = run_project_batch_extract(session, project_id=project_id, mode="summary", summary_chars=summary_chars)
+            elapsed = time.perf_counter() - started
+            print(
+                f"batch {label:>6}: {result['count']} docs in {elapsed:.2f}s "
+                f"({elapsed / result['count'] * 1000:.2f}ms/doc)"
+            )
+
+
+def main(docs: int, summary_chars: int) -> None:
+    _per_size(summary_chars)
+    _batch(docs, summary_chars)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--summary-chars", type=int, default=400)
+    args = parser.parse_args()
+    main(args.docs, args.summary_chars)
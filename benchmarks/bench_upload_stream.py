@@ -0,0 +1,86 @@
+"""Peak RSS and throughput of JSON POST /upload vs streamed POST /upload/stream.
+
+Usage: python -m benchmarks.bench_upload_stream [--size-mb 8] [--uploads 5]
+Each mode runs in its own subprocess so ru_maxrss is not shared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PREFIX = "/api/v1"
+CHUNK = 64 * 1024
+
+
+def _payload(size_bytes: int, seed: int) -> str:
+    line = f"upload {seed} lorem ipsum dolor sit amet consectetur\n"
+    return (line * (size_bytes // len(line) + 1))[:size_bytes]
+
+
+async def _run(mode: str, size_bytes: int, uploads: int) -> dict:
+    from benchmarks._asgi import call, configure_env
+
+    configure_env(MAX_UPLOAD_CHARS=str(size_bytes * 2), MAX_UPLOAD_BYTES=str(size_bytes * 2))
+
+    from backend.db.migrations import bootstrap_schema
+    from backend.db.session import engine
+    from backend.main import app
+
+    bootstrap_schema(engine)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    for seed in range(uploads):
+        if mode == "json":
+            body = {"file_name": f"{seed}.txt", "file_type": "txt", "content": _payload(size_bytes, seed)}
+            status, _ = await call(app, "POST", f"{PREFIX}/upload", body=body)
+            del body
+        else:
+            def _chunks(seed=seed):
+                block = _payload(CHUNK, seed).encode("utf-8")
+                remaining = size_bytes
+                while remaining > 0:
+                    yield block[:remaining]
+                    remaining -= len(block)
+
+            status, _ = await call(app, "POST", f"{PREFIX}/upload/stream?file_name={seed}.txt&file_type=txt", chunks=_chunks())
+        assert status == 200, status
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "peak_rss_growth_mb": (peak_kb - baseline_kb) / 1024,
+        "throughput_mb_s": size_bytes * uploads / elapsed / 1e6,
+    }
+
+
+def main(size_mb: float, uploads: int) -> None:
+    size_bytes = int(size_mb * 1024 * 1024)
+    for mode in ("json", "stream"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_upload_stream", "--child", mode, "--size-mb", str(size_mb), "--uploads", str(uploads)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        print(
+            f"{result['mode']:>6}: {size_bytes / 1e6:.1f}MB x {uploads} "
+            f"peak RSS growth={result['peak_rss_growth_mb']:.1f}MB throughput={result['throughput_mb_s']:.1f}MB/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--uploads", type=int, default=5)
+    parser.add_argument("--child", choices=["json", "stream"])
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(_run(args.child, int(args.size_mb * 1024 * 1024), args.uploads))))
+    else:
+        main(args.size_mb, args.uploads)
@@ -1,6 +1,7 @@
 import pytest
 
 from backend.core.config import Settings
+from backend.db.blob_codecs import codec_names
 
 
 def test_settings_from_env_success_local() -> None:
@@ -72,3 +73,20 @@ def test_settings_redis_backend_valid() -> None:
         "RATE_LIMIT_REDIS_URL": "redis://localhost:6379/0",
     })
     assert config.rate_limit_backend == "redis"
+
+
+def test_settings_compression_codec_matches_registered_codecs() -> None:
+    for name in codec_names():
+        config = Settings.from_env({"APP_ENV": "local", "DATABASE_URL": "sqlite:///./test.db", "CONTENT_COMPRESSION_CODEC": name.upper()})
+        assert config.content_compression_codec == name
+    with pytest.raises(ValueError):
+        Settings.from_env({"APP_ENV": "local", "DATABASE_URL": "sqlite:///./test.db", "CONTENT_COMPRESSION_CODEC": "lz4"})
+
+
+def test_settings_tenant_weights_parse_and_name_bad_entries() -> None:
+    env = {"APP_ENV": "local", "DATABASE_URL": "sqlite:///./test.db"}
+    config = Settings.from_env(env | {"SCHEDULER_TENANT_WEIGHTS": " tenant-a=4, tenant-b=0.5,"})
+    assert config.scheduler_tenant_weights == {"tenant-a": 4.0, "tenant-b": 0.5}
+    for raw, entry in (("tenant-a", "tenant-a"), ("a=2,b=fast", "b=fast"), ("a=0", "a=0"), ("a=-1", "a=-1"), ("=3", "=3"), ("a=nan", "a=nan")):
+        with pytest.raises(ValueError, match=f"SCHEDULER_TENANT_WEIGHTS: invalid entry '{entry}'"):
+            Settings.from_env(env | {"SCHEDULER_TENANT_WEIGHTS": raw})
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.db.session import Base, async_database_url
+from backend.services.source_service import extract_content, upload_source
+
+
+def test_async_database_url_maps_drivers() -> None:
+    assert async_database_url("sqlite:///./docuhub.db") == "sqlite+aiosqlite:///./docuhub.db"
+    assert async_database_url("postgresql://u:p@h:5432/db") == "postgresql+asyncpg://u:p@h:5432/db"
+    assert async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+
+def test_async_database_url_rejects_unknown_dialect() -> None:
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@h/db")
+
+
+def test_sync_services_run_on_async_session() -> None:
+    async def _execute():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        Session = async_sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        async with Session() as session:
+            saved = await session.run_sync(upload_source, file_name="a.txt", file_type="txt", content="hello")
+            extracted = await session.run_sync(extract_content, file_id=saved["file_id"], mode="text")
+        await engine.dispose()
+        return extracted
+
+    extracted = asyncio.run(_execute())
+    assert extracted["content"] == "hello"
@@ -0,0 +1,146 @@
+import pytest
+
+from backend.services import extraction_cache
+from backend.services.extraction_cache import (
+    InMemoryExtractionCache,
+    RedisExtractionCache,
+    cached_extract,
+    reset_extraction_cache,
+)
+from backend.services.metrics_service import metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_extraction_cache()
+    yield
+    reset_extraction_cache()
+
+
+def test_lru_evicts_least_recently_used_by_size():
+    cache = InMemoryExtractionCache(max_bytes=10)
+    evictions = metrics["extract_cache_total"]["eviction"]
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.set("c", "cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.size_bytes == 8
+    assert metrics["extract_cache_total"]["eviction"] == evictions + 1
+
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_cached_extract_hits_and_counts():
+    calls = []
+
+    def extract(size):
+        calls.append(size)
+        return "y" * size
+
+    hits = metrics["extract_cache_total"]["hit"]
+    misses = metrics["extract_cache_total"]["miss"]
+    assert len(cached_extract("sha-1", "summary", lambda: extract(400))) == 400
+    assert len(cached_extract("sha-1", "summary", lambda: extract(400))) == 400
+    assert len(cached_extract("sha-1", "text", lambda: extract(1000))) == 1000
+    assert len(cached_extract("sha-1", "text", lambda: extract(10), parser="pdf")) == 10
+
+    assert calls == [400, 1000, 10]
+    assert metrics["extract_cache_total"]["hit"] == hits + 1
+    assert metrics["extract_cache_total"]["miss"] == misses + 3
+
+
+def test_extractor_version_change_invalidates(monkeypatch):
+    calls = []
+    cached_extract("sha-1", "text", lambda: calls.append(1) or "v1")
+    monkeypatch.setattr(extraction_cache, "EXTRACTOR_VERSION", extraction_cache.EXTRACTOR_VERSION + "-next")
+    cached_extract("sha-1", "text", lambda: calls.append(1) or "v2")
+    assert len(calls) == 2
+
+
+def test_content_without_hash_is_not_cached():
+    calls = []
+    cached_extract(None, "text", lambda: calls.append(1) or "body")
+    cached_extract(None, "text", lambda: calls.append(1) or "body")
+    assert len(calls) == 2
+
+
+def test_redis_tier_falls_back_to_local(monkeypatch):
+    def unavailable(*_args, **_kwargs):
+        raise RuntimeError("redis down")
+
+    monkeypatch.setattr("backend.services.extraction_cache.redis_resp.RedisConnection.execute", unavailable)
+    cache = RedisExtractionCache(url="redis://localhost:6379/0", ttl_s=60, local=InMemoryExtractionCache(max_bytes=100))
+    assert cache.get("k") is None
+    cache.set("k", "value")
+    assert cache.get("k") == "value"
+
+
+def test_redis_tier_populates_local_on_remote_hit(monkeypatch):
+    commands = []
+
+    def fake_execute(_self, *cmds):
+        commands.extend(cmds)
+        return [["remote"] if cmd[0] == "MGET" else "OK" for cmd in cmds]
+
+    monkeypatch.setattr("backend.services.extraction_cache.redis_resp.RedisConnection.execute", fake_execute)
+    local = InMemoryExtractionCache(max_bytes=100)
+    cache = RedisExtractionCache(url="redis://localhost:6379/0", ttl_s=60, local=local)
+    assert cache.get("k") == "remote"
+    assert local.get("k") == "remote"
+    cache.set("j", "v")
+    assert commands[-1] == ("SET", "extract:j", "v", "EX", "60")
+
+
+def test_redis_tier_batches_keys_into_one_round_trip(monkeypatch):
+    round_trips = []
+
+    def fake_execute(_self, *cmds):
+        round_trips.append(cmds)
+        return [["b-remote", None] if cmd[0] == "MGET" else "OK" for cmd in cmds]
+
+    monkeypatch.setattr("backend.services.extraction_cache.redis_resp.RedisConnection.execute", fake_execute)
+    local = InMemoryExtractionCache(max_bytes=100)
+    local.set("a", "a-local")
+    cache = RedisExtractionCache(url="redis://localhost:6379/0", ttl_s=60, local=local)
+
+    assert cache.get_many(["a", "b", "c"]) == ["a-local", "b-remote", None]
+    cache.set_many([("c", "1"), ("d", "2")])
+
+    assert round_trips == [
+        (("MGET", "extract:b", "extract:c"),),
+        (("SET", "extract:c", "1", "EX", "60"), ("SET", "extract:d", "2", "EX", "60")),
+    ]
+
+
+def test_redis_tier_is_skipped_during_cooldown(monkeypatch):
+    calls = []
+
+    def unavailable(_self, *cmds):
+        calls.append(cmds)
+        raise OSError("timed out")
+
+    monkeypatch.setattr("backend.services.extraction_cache.redis_resp.RedisConnection.execute", unavailable)
+    cache = RedisExtractionCache(
+        url="redis://localhost:6379/0", ttl_s=60, local=InMemoryExtractionCache(max_bytes=100), cooldown_s=60
+    )
+    for key in ("a", "b", "c"):
+        assert cache.get(key) is None
+        cache.set(key, "v")
+
+    assert len(calls) == 1
+    assert cache.get("c") == "v"
+
+
+def test_lookup_many_skips_content_without_hash():
+    extraction_cache.store("sha-1", "text", "body")
+    hits = metrics["extract_cache_total"]["hit"]
+    misses = metrics["extract_cache_total"]["miss"]
+
+    assert extraction_cache.lookup_many([("sha-1", "text"), (None, "text"), ("sha-2", "text")], "text") == ["body", None, None]
+    assert metrics["extract_cache_total"]["hit"] == hits + 1
+    assert metrics["extract_cache_total"]["miss"] == misses + 1
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from backend.services.errors import ServiceError
+from backend.services.extractors import (
+    FILE_TYPE_PARSERS,
+    PARSERS,
+    ParseTimeout,
+    parse_document,
+    parse_error,
+    parser_for,
+    register_parser,
+)
+from tests._corpus import build_docx, build_pdf, build_xlsx
+
+
+def test_parser_registry_resolves_extensions_and_mime_types():
+    assert parser_for("PDF") == "pdf"
+    assert parser_for("application/vnd.openxmlformats-officedocument.wordprocessingml.document") == "docx"
+    assert parser_for("xlsx") == "xlsx"
+    assert parser_for("md") == "text"
+    assert parser_for(None) == "text"
+
+
+def test_pdf_pages_are_extracted_in_order():
+    pytest.importorskip("pdfplumber")
+    data = build_pdf(["first page", "second page"])
+    assert parse_document(data, "pdf", "text") == "first page\nsecond page"
+
+
+def test_summary_stops_reading_pages_once_long_enough(monkeypatch):
+    seen = []
+
+    def pages(_data):
+        for n in range(100):
+            seen.append(n)
+            yield f"Page {n} says something. " * 6
+
+    monkeypatch.setitem(PARSERS, "paged", pages)
+    monkeypatch.setattr("backend.services.extractors.MAX_INPUT_CHARS", 1000)
+    assert len(parse_document(b"", "paged", "summary", summary_chars=120)) <= 120
+    assert len(seen) == 8
+
+
+def test_docx_and_xlsx_are_parsed():
+    pytest.importorskip("docx")
+    pytest.importorskip("openpyxl")
+    assert parse_document(build_docx(["Intro", "Body"]), "docx", "text") == "Intro\nBody"
+    assert parse_document(build_xlsx([["a", 1], [None, None], ["b", 2]]), "xlsx", "text") == "a\t1\nb\t2"
+
+
+def test_text_body_with_binary_file_type_falls_back_to_text():
+    assert parse_document(b"plain words", "pdf", "text") == "plain words"
+
+
+def test_parse_deadline_interrupts_slow_parser(monkeypatch):
+    def slow(_data):
+        time.sleep(5)
+        yield "never"
+
+    monkeypatch.setitem(PARSERS, "slow", slow)
+    started = time.monotonic()
+    with pytest.raises(ParseTimeout):
+        parse_document(b"", "slow", "text", 0.2)
+    assert time.monotonic() - started < 2
+
+
+def test_register_parser_and_error_mapping(monkeypatch):
+    monkeypatch.setattr("backend.services.extractors.PARSERS", dict(PARSERS))
+    monkeypatch.setattr("backend.services.extractors.FILE_TYPE_PARSERS", dict(FILE_TYPE_PARSERS))
+    register_parser("csv", lambda data: iter([data.decode().upper()]), "text/csv")
+    assert parse_document(b"a,b", parser_for("text/csv"), "text") == "A,B"
+
+    assert parse_error(ParseTimeout(), "pdf").code == "extract_timeout"
+    assert parse_error(ValueError("broken"), "pdf").code == "parse_failed"
+    queue_full = ServiceError(code="task_queue_full", message="full")
+    assert parse_error(queue_full, "pdf") is queue_full
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+from backend.services import http_fetch
+from backend.services.errors import ServiceError
+from backend.services.security import ResolvedUrl, resolve_public_http_url
+
+
+class _Origin(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections: set = set()
+    hosts: list = []
+
+    def log_message(self, *_args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", **headers: str) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        _Origin.connections.add(self.client_address)
+        _Origin.hosts.append(self.headers["Host"])
+        if self.path == "/doc.txt":
+            self._send(200, b"hello from origin")
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for _ in range(10):
+                self.wfile.write(b"3e8\r\n" + b"x" * 1000 + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path == "/moved":
+            self._send(302, Location="/doc.txt")
+        elif self.path == "/escape":
+            self._send(302, Location="http://localhost/secret")
+        elif self.path == "/slow":
+            time.sleep(1)
+            self._send(200, b"late")
+        else:
+            self._send(404, b"missing")
+
+
+@pytest.fixture()
+def origin():
+    _Origin.connections = set()
+    _Origin.hosts = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Origin)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+async def _pinned(url: str) -> ResolvedUrl:
+    # Stands in for DNS: docs.example.test only exists as the loopback origin above.
+    parsed = urlsplit(url)
+    if parsed.hostname != "docs.example.test":
+        return await resolve_public_http_url(url)
+    return ResolvedUrl(url=url, scheme=parsed.scheme, host=parsed.hostname, port=parsed.port, addresses=("127.0.0.1",))
+
+
+def _fetch_all(*urls: str, max_bytes: int = 1_000_000, timeout_s: float = 5) -> list:
+    async def _run():
+        try:
+            return [await http_fetch.fetch(url, max_bytes=max_bytes, timeout_s=timeout_s, resolve=_pinned) for url in urls]
+        finally:
+            await http_fetch.close_http_pool()
+
+    return asyncio.run(_run())
+
+
+def test_fetch_reuses_pinned_keep_alive_connection(origin):
+    base = f"http://docs.example.test:{origin}"
+    first, second = _fetch_all(f"{base}/doc.txt", f"{base}/doc.txt")
+
+    assert first.body == second.body == b"hello from origin"
+    assert first.truncated is False
+    assert len(_Origin.connections) == 1
+    assert _Origin.hosts == [f"docs.example.test:{origin}"] * 2
+
+
+def test_fetch_streams_chunked_body_under_cap(origin):
+    (full,) = _fetch_all(f"http://docs.example.test:{origin}/chunked")
+    (capped,) = _fetch_all(f"http://docs.example.test:{origin}/chunked", max_bytes=2500)
+
+    assert len(full.body) == 10_000 and full.truncated is False
+    assert capped.body == b"x" * 2500 and capped.truncated is True
+
+
+def test_fetch_follows_redirects_and_revalidates_each_hop(origin):
+    (moved,) = _fetch_all(f"http://docs.example.test:{origin}/moved")
+    assert moved.body == b"hello from origin"
+    assert moved.url.endswith("/doc.txt")
+
+    with pytest.raises(ServiceError) as err:
+        _fetch_all(f"http://docs.example.test:{origin}/escape")
+    assert err.value.code == "blocked_host"
+
+
+def test_fetch_normalizes_http_errors_and_timeouts(origin):
+    with pytest.raises(ServiceError) as err:
+        _fetch_all(f"http://docs.example.test:{origin}/nope")
+    assert err.value.code == "network_http_error"
+    assert err.value.details == {"status": 404}
+
+    with pytest.raises(ServiceError) as err:
+        _fetch_all(f"http://docs.example.test:{origin}/slow", timeout_s=0.2)
+    assert err.value.code == "network_timeout"
+
+
+def test_fetch_does_not_block_event_loop(origin):
+    async def _run():
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_ticker())
+        try:
+            await http_fetch.fetch(f"http://docs.example.test:{origin}/slow", max_bytes=100, timeout_s=5, resolve=_pinned)
+        finally:
+            ticker.cancel()
+            await http_fetch.close_http_pool()
+        return ticks
+
+    assert asyncio.run(_run()) > 20
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.api.v1.router import _iter_job_events
+from backend.db.migrations import bootstrap_schema
+from backend.services.job_events import JobEventHub, get_job_events, reset_job_events
+from backend.services.job_service import enqueue_project_batch_extract
+from backend.services.product_service import add_document_to_project, create_project
+from backend.services.source_service import upload_source
+from backend.worker import run_worker
+
+
+@pytest.fixture(autouse=True)
+def _fresh_hub():
+    reset_job_events()
+    yield
+    reset_job_events()
+
+
+def test_publish_fans_out_to_every_subscriber():
+    hub = JobEventHub()
+
+    async def _run():
+        first, second = hub.subscribe(1), hub.subscribe(1)
+        publisher = threading.Thread(target=lambda: [hub.publish(1, "item", {"n": n}) for n in range(3)])
+        publisher.start()
+        received = {first: [], second: []}
+        while any(len(events) < 3 for events in received.values()):
+            for subscription, events in received.items():
+                events.extend(await subscription.next(timeout=1))
+        publisher.join()
+        return [[data["n"] for _, _, data in events] for events in received.values()]
+
+    assert asyncio.run(_run()) == [[0, 1, 2], [0, 1, 2]]
+
+
+def test_subscribe_replays_after_last_event_id_and_keeps_bounded_history():
+    hub = JobEventHub(history=3)
+    for n in range(5):
+        hub.publish(7, "item", {"n": n})
+    hub.publish(7, "result", {"status": "completed"})
+
+    async def _run(after):
+        return [event_id for event_id, _, _ in await hub.subscribe(7, after=after).next(timeout=0)]
+
+    assert asyncio.run(_run(4)) == [5, 6]
+    assert asyncio.run(_run(0)) == [4, 5, 6]
+
+
+def test_next_times_out_without_events():
+    async def _run():
+        return await JobEventHub().subscribe(1).next(timeout=0.01)
+
+    assert asyncio.run(_run()) == []
+
+
+def test_finished_jobs_are_evicted_first():
+    hub = JobEventHub(max_jobs=2)
+    hub.publish(1, "result", {})
+    hub.publish(2, "item", {})
+    hub.publish(3, "item", {})
+    assert sorted(hub._channels) == [2, 3]
+
+
+def test_eviction_spares_subscribed_channels_and_never_reuses_ids():
+    hub = JobEventHub(max_jobs=1)
+
+    async def _run():
+        watched = hub.subscribe(1)
+        hub.publish(1, "item", {})
+        hub.publish(2, "item", {})
+        hub.publish(2, "item", {})
+        hub.publish(3, "item", {})
+        assert sorted(hub._channels) == [1, 3]
+        hub.publish(1, "item", {})
+        assert [event_id for event_id, _, _ in await watched.next(timeout=0)] == [1, 2]
+        watched.close()
+        hub.publish(4, "item", {})
+        # Job 2 was dropped after id 2; its recreated channel continues above that.
+        return hub.publish(2, "result", {})
+
+    assert asyncio.run(_run()) == 3
+
+
+def test_worker_publishes_progress_items_and_result(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.services.job_service.settings.batch_chunk_size", 2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}", future=True)
+    bootstrap_schema(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    with session_factory() as session:
+        project = create_project(session, name="P")
+        for i in range(3):
+            source = upload_source(session, file_name=f"{i}.txt", file_type="txt", content=f"doc {i} " * 20)
+            add_document_to_project(session, project_id=project["project_id"], source_id=source["file_id"], title=f"d{i}")
+        job_id = enqueue_project_batch_extract(session, project_id=project["project_id"], mode="text")["job_id"]
+
+    run_worker(session_factory=session_factory, worker_id="w1", once=True)
+    engine.dispose()
+
+    async def _collect():
+        return await get_job_events().subscribe(job_id).next(timeout=0)
+
+    events = asyncio.run(_collect())
+    assert [event for _, event, _ in events] == ["status", "progress", "item", "item", "progress", "item", "progress", "result"]
+    assert [event_id for event_id, _, _ in events] == list(range(1, 9))
+    assert events[-2][2] == {"job_id": job_id, "done": 3, "total": 3}
+    assert events[-1][2]["status"] == "completed"
+    assert events[-1][2]["result"]["data"]["count"] == 3
+
+
+def test_stream_falls_back_to_the_stored_result_for_jobs_finished_elsewhere():
+    job = {"job_id": 5, "status": "completed", "attempts": 1, "result": {"data": {"count": 0}}}
+
+    async def _run():
+        subscription = get_job_events().subscribe(5)
+        chunks = [chunk async for chunk in _iter_job_events(subscription, job, "default")]
+        return chunks, get_job_events().subscriber_count(5)
+
+    chunks, subscribers = asyncio.run(_run())
+    assert chunks[0].startswith(b"event: status\n")
+    assert chunks[-1] == b'event: result\ndata: {"job_id": 5, "status": "completed", "result": {"data": {"count": 0}}}\n\n'
+    assert subscribers == 0
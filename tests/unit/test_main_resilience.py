@@ -40,6 +40,28 @@ def test_service_error_handler_contract() -> None:
     assert b'"success":false' in response.body
 
 
+def test_queue_full_error_maps_to_503_with_retry_after() -> None:
+    response = asyncio.run(
+        service_exception_handler(
+            _request(),
+            ServiceError(code="task_queue_full", message="Task queue is full", details={"retry_after_s": 2}),
+        )
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "2"
+
+
+def test_unsatisfiable_range_maps_to_416_with_content_range() -> None:
+    response = asyncio.run(
+        service_exception_handler(
+            _request(),
+            ServiceError(code="range_not_satisfiable", message="Requested range is outside the content", details={"size_bytes": 10}),
+        )
+    )
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+
 def test_unhandled_error_handler_contract() -> None:
     response = asyncio.run(unhandled_exception_handler(_request(), RuntimeError("boom")))
     assert response.status_code == 500
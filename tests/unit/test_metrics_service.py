@@ -1,6 +1,7 @@
 from backend.services.metrics_service import (
     inc_error_code,
     observe_batch_size,
+    observe_content_write,
     observe_extract,
     observe_request,
     render_prometheus,
@@ -17,3 +18,12 @@ def test_metrics_render_contains_expected_keys() -> None:
     assert "docuhub_request_total" in output
     assert "docuhub_extract_duration_ms_sum" in output
     assert 'docuhub_error_code_total{code="file_not_found"}' in output
+
+
+def test_metrics_render_reports_content_dedup() -> None:
+    observe_content_write(100, deduplicated=False)
+    observe_content_write(100, deduplicated=True)
+
+    output = render_prometheus()
+    assert "docuhub_content_stored_bytes_total" in output
+    assert "docuhub_content_dedup_ratio" in output
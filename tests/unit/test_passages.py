@@ -0,0 +1,182 @@
+import math
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.db.models import SourcePassage
+from backend.repositories.passage_repository import TERM_DTYPE, chunk_passages, query_hashes, term_hashes
+from backend.repositories.source_repository import SourceRepository
+from backend.services.errors import ServiceError
+from backend.services.passage_index import B, K1, MAX_SEGMENTS, PassageIndex
+from backend.services.passage_service import (
+    get_passage_index_cache,
+    invalidate_source_passages,
+    reset_passage_index_cache,
+    search_project_passages,
+)
+from backend.services.product_service import add_document_to_project, create_project
+from backend.services.reindex_service import backfill_index
+from backend.services.source_service import upload_source
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_passage_index_cache()
+    yield
+    reset_passage_index_cache()
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    bootstrap_schema(engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _add(db_session, project_id: int, name: str, content: str, tenant_id: str | None = None) -> dict:
+    source = upload_source(db_session, file_name=name, file_type="txt", content=content, tenant_id=tenant_id)
+    return add_document_to_project(
+        db_session,
+        project_id=project_id,
+        source_id=source["file_id"],
+        title=name,
+        tenant_id=tenant_id,
+    )
+
+
+def _posting(passage_id: int, tokens: list[str]) -> SimpleNamespace:
+    terms, counts = np.unique(term_hashes(tokens), return_counts=True)
+    records = np.empty(len(terms), dtype=TERM_DTYPE)
+    records["term"], records["tf"] = terms, counts
+    return SimpleNamespace(document_id=passage_id, id=passage_id, source_id=passage_id, length=len(tokens), terms=records.tobytes())
+
+
+def test_chunks_overlap_and_keep_offsets():
+    body = " ".join(f"w{n}" for n in range(25))
+    chunks = chunk_passages(body, words=10, overlap=3)
+
+    assert [len(tokens) for _, _, tokens in chunks] == [10, 10, 10, 4]
+    assert chunks[1][2][0] == "w7"
+    assert all(body[start:end].split() == tokens for start, end, tokens in chunks)
+    assert chunk_passages("...", words=10, overlap=3) == []
+
+
+def test_segmented_index_matches_brute_force_bm25():
+    rng = random.Random(5)
+    docs = [[rng.choice("abcdefghij") * rng.randint(1, 2) for _ in range(rng.randint(3, 40))] for _ in range(60)]
+    index = PassageIndex.empty()
+    for start in range(0, len(docs), 5):
+        index = index.add([_posting(n + 1, docs[n]) for n in range(start, min(start + 5, len(docs)))])
+    assert len(index.segments) <= MAX_SEGMENTS
+
+    query = ["a", "bb", "c"]
+    avgdl = sum(map(len, docs)) / len(docs)
+    expected = []
+    for n, doc in enumerate(docs):
+        score = 0.0
+        for term in query:
+            df = sum(term in other for other in docs)
+            tf = doc.count(term)
+            if tf:
+                idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * len(doc) / avgdl))
+        expected.append((score, n + 1))
+    expected = sorted((item for item in expected if item[0] > 0), key=lambda item: (-item[0], item[1]))[:7]
+
+    hits = index.search(query_hashes(" ".join(query)), limit=7)
+    assert [passage_id for passage_id, _, _ in hits] == [passage_id for _, passage_id in expected]
+    assert [score for _, _, score in hits] == pytest.approx([score for score, _ in expected], rel=1e-5)
+
+
+def test_project_passages_are_ranked_and_scoped(db_session):
+    project = create_project(db_session, name="P", description="")
+    other = create_project(db_session, name="Q", description="")
+    filler = " ".join(f"filler{n}" for n in range(300))
+    doc = _add(db_session, project["project_id"], "guide.txt", f"{filler} the turbine blade inspection schedule {filler}")
+    _add(db_session, project["project_id"], "notes.txt", "blade notes only")
+    _add(db_session, other["project_id"], "else.txt", "turbine blade inspection schedule")
+
+    result = search_project_passages(db_session, project_id=project["project_id"], q="turbine blade inspection", limit=5)
+
+    # The phrase sits where two overlapping passages of guide.txt meet; both outrank the weak match.
+    assert [item["title"] for item in result["items"]] == ["guide.txt", "guide.txt", "notes.txt"]
+    top = result["items"][0]
+    assert top["document_id"] == doc["document_id"]
+    assert "turbine blade inspection" in top["text"]
+    assert top["passage"] > 0 and top["offset"] > 0
+
+    with pytest.raises(ServiceError) as err:
+        search_project_passages(db_session, project_id=project["project_id"], q="!!")
+    assert err.value.code == "invalid_search_query"
+    with pytest.raises(ServiceError) as err:
+        search_project_passages(db_session, project_id=project["project_id"], q="blade", tenant_id="other")
+    assert err.value.code == "project_not_found"
+
+
+def test_new_documents_are_appended_without_rebuilding(db_session):
+    project = create_project(db_session, name="P", description="")
+    _add(db_session, project["project_id"], "a.txt", "alpha report")
+    search_project_passages(db_session, project_id=project["project_id"], q="alpha")
+    first = get_passage_index_cache().get("default", project["project_id"])
+
+    _add(db_session, project["project_id"], "b.txt", "beta report")
+    result = search_project_passages(db_session, project_id=project["project_id"], q="beta")
+    second = get_passage_index_cache().get("default", project["project_id"])
+
+    assert [item["title"] for item in result["items"]] == ["b.txt"]
+    assert second.built_at == first.built_at
+    assert len(second.index.segments) == 2 and second.index.segments[0] is first.index.segments[0]
+
+
+def test_rewritten_source_invalidates_cached_index(db_session):
+    project = create_project(db_session, name="P", description="")
+    doc = _add(db_session, project["project_id"], "a.txt", "old wording")
+    assert search_project_passages(db_session, project_id=project["project_id"], q="old")["count"] == 1
+
+    SourceRepository(db_session).replace_content(
+        doc["source_id"], tenant_id="default", content="new wording", etag=None, last_modified=None
+    )
+    db_session.commit()
+    invalidate_source_passages(doc["source_id"])
+
+    assert search_project_passages(db_session, project_id=project["project_id"], q="old")["count"] == 0
+    assert search_project_passages(db_session, project_id=project["project_id"], q="new")["count"] == 1
+
+
+def test_upload_computes_passages_through_offload(db_session, monkeypatch):
+    calls = []
+
+    def offload(fn, *args, tenant_id):
+        calls.append(tenant_id)
+        return fn(*args)
+
+    monkeypatch.setattr("backend.services.source_service.offload_indexing", offload)
+    project = create_project(db_session, name="P", description="")
+    _add(db_session, project["project_id"], "a.txt", "gearbox vibration report")
+
+    assert calls == ["default"]
+    assert search_project_passages(db_session, project_id=project["project_id"], q="gearbox")["count"] == 1
+
+
+def test_backfill_indexes_sources_created_before_passages(db_session):
+    project = create_project(db_session, name="P", description="")
+    _add(db_session, project["project_id"], "a.txt", "gearbox vibration report")
+    _add(db_session, project["project_id"], "b.txt", "gearbox oil change")
+    db_session.execute(delete(SourcePassage))
+    db_session.commit()
+    assert search_project_passages(db_session, project_id=project["project_id"], q="gearbox")["count"] == 0
+
+    assert backfill_index(db_session, "passages", chunk_size=1)["indexed"] == 2
+
+    result = search_project_passages(db_session, project_id=project["project_id"], q="gearbox vibration")
+    assert [item["title"] for item in result["items"]] == ["a.txt", "b.txt"]
+    assert backfill_index(db_session, "passages")["scanned"] == 0
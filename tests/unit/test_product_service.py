@@ -1,16 +1,31 @@
+from io import BytesIO
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, select, update
 from sqlalchemy.orm import sessionmaker
 
 from backend.db.migrations import bootstrap_schema
+from backend.db.models import BatchItem, BatchRun
+from backend.repositories.blob_repository import content_sha256
+from backend.repositories.product_repository import ProductRepository
+from backend.repositories.source_repository import SourceRepository
+from backend.services import product_service
 from backend.services.errors import ServiceError
 from backend.services.product_service import (
     add_document_to_project,
     create_project,
+    execute_batch_run,
+    get_batch_run,
+    iter_batch_run,
     list_project_documents,
+    list_projects,
+    resume_batch_run,
     run_project_batch_extract,
+    start_project_batch,
 )
 from backend.services.source_service import upload_source
+from backend.services.task_runner import shutdown_task_runner
+from tests._corpus import build_pdf
 
 
 @pytest.fixture()
@@ -64,3 +79,224 @@ def test_project_tenant_isolation(db_session):
     with pytest.raises(ServiceError) as err:
         list_project_documents(db_session, project_id=project["project_id"], tenant_id="tenant-b")
     assert err.value.code == "project_not_found"
+
+
+def test_projects_and_documents_are_keyset_paginated(db_session):
+    projects = [create_project(db_session, name=f"P{n}")["project_id"] for n in range(3)]
+    source = upload_source(db_session, file_name="a.txt", file_type="txt", content="hello")
+    documents = [
+        add_document_to_project(db_session, project_id=projects[0], source_id=source["file_id"], title=f"D{n}")["document_id"]
+        for n in range(3)
+    ]
+
+    page = list_projects(db_session, limit=2)
+    assert [item["project_id"] for item in page["items"]] == projects[:0:-1]
+    rest = list_projects(db_session, limit=2, cursor=page["next_cursor"])
+    assert [item["project_id"] for item in rest["items"]] == [projects[0]] and rest["next_cursor"] is None
+
+    page = list_project_documents(db_session, project_id=projects[0], limit=2)
+    rest = list_project_documents(db_session, project_id=projects[0], limit=2, cursor=page["next_cursor"])
+    assert [item["document_id"] for item in page["items"] + rest["items"]] == documents[::-1]
+
+
+def _batch_statement_count(session, project_id: int) -> int:
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        run_project_batch_extract(session, project_id=project_id, mode="text")
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return len(statements)
+
+
+def test_project_batch_extract_query_count_is_independent_of_size(db_session):
+    counts = {}
+    for size in (3, 60):
+        project = create_project(db_session, name=f"P{size}", description="")
+        for idx in range(size):
+            source = upload_source(db_session, file_name=f"{idx}.txt", file_type="txt", content="abc")
+            add_document_to_project(
+                db_session,
+                project_id=project["project_id"],
+                source_id=source["file_id"],
+                title=f"Doc {idx}",
+            )
+        counts[size] = _batch_statement_count(db_session, project["project_id"])
+
+    assert counts[3] == counts[60]
+    assert db_session.execute(select(func.count()).select_from(BatchItem)).scalar_one() == 63
+
+
+def test_project_batch_extract_parses_binary_documents_and_isolates_failures(db_session):
+    pytest.importorskip("pdfplumber")
+    project = create_project(db_session, name="P")
+    bodies = [("a.pdf", "pdf", build_pdf(["pdf body"])), ("b.pdf", "pdf", b"%PDF-1.4 broken"), ("c.txt", "txt", b"plain")]
+    for name, file_type, body in bodies:
+        source = SourceRepository(db_session).create_source_from_file(
+            file_name=name,
+            file_type=file_type,
+            fileobj=BytesIO(body),
+            sha256=content_sha256(body),
+            tenant_id="default",
+        )
+        add_document_to_project(db_session, project_id=project["project_id"], source_id=source.id, title=name)
+
+    try:
+        result = run_project_batch_extract(db_session, project_id=project["project_id"], mode="text")
+    finally:
+        shutdown_task_runner()
+
+    items = result["items"]
+    assert [item["chars"] for item in items] == [len("pdf body"), 0, len("plain")]
+    assert items[1]["error"] == "parse_failed"
+    assert "error" not in items[0]
+
+
+def _project_with_documents(session, bodies: list[str]) -> tuple[int, list[dict]]:
+    project = create_project(session, name="P", description="")
+    documents = []
+    for idx, body in enumerate(bodies):
+        source = upload_source(session, file_name=f"{idx}.txt", file_type="txt", content=body)
+        documents.append(
+            add_document_to_project(session, project_id=project["project_id"], source_id=source["file_id"], title=f"Doc {idx}")
+        )
+    return project["project_id"], documents
+
+
+def _record_measured(monkeypatch, *, fail_on_call: int | None = None) -> list[int]:
+    original = product_service._measure_extractions
+    measured: list[int] = []
+    calls = []
+
+    def _measure(rows, *args):
+        calls.append(rows)
+        if len(calls) == fail_on_call:
+            raise RuntimeError("worker lost")
+        measured.extend(row[0] for row in rows)
+        return original(rows, *args)
+
+    monkeypatch.setattr(product_service, "_measure_extractions", _measure)
+    return measured
+
+
+def test_incremental_batch_extract_only_recomputes_new_and_changed_documents(db_session, monkeypatch):
+    project_id, documents = _project_with_documents(db_session, ["one", "two", "three"])
+    first = run_project_batch_extract(db_session, project_id=project_id, mode="text", incremental=True)
+    assert (first["reused"], first["recomputed"]) == (0, 3)
+
+    SourceRepository(db_session).replace_content(
+        documents[1]["source_id"], tenant_id="default", content="two, revised", etag=None, last_modified=None
+    )
+    db_session.commit()
+    source = upload_source(db_session, file_name="new.txt", file_type="txt", content="four")
+    added = add_document_to_project(db_session, project_id=project_id, source_id=source["file_id"], title="New")
+
+    measured = _record_measured(monkeypatch)
+    second = run_project_batch_extract(db_session, project_id=project_id, mode="text", incremental=True)
+
+    assert (second["reused"], second["recomputed"]) == (2, 2)
+    assert measured == [documents[1]["document_id"], added["document_id"]]
+    assert [item["chars"] for item in second["items"]] == [3, len("two, revised"), 5, 4]
+
+
+def test_incremental_batch_extract_recomputes_when_the_result_depends_on_other_settings(db_session):
+    project_id, _ = _project_with_documents(db_session, ["First sentence here. " * 40])
+    run_project_batch_extract(db_session, project_id=project_id, mode="summary", summary_chars=100, incremental=True)
+
+    same = run_project_batch_extract(db_session, project_id=project_id, mode="summary", summary_chars=100, incremental=True)
+    longer = run_project_batch_extract(db_session, project_id=project_id, mode="summary", summary_chars=200, incremental=True)
+    text = run_project_batch_extract(db_session, project_id=project_id, mode="text", incremental=True)
+    full = run_project_batch_extract(db_session, project_id=project_id, mode="summary", summary_chars=200)
+
+    assert same["reused"] == 1
+    assert longer["reused"] == 0
+    assert text["reused"] == 0
+    assert full["reused"] == 0 and full["items"] == longer["items"]
+
+
+def test_failed_batch_resumes_from_its_last_checkpoint(db_session, monkeypatch):
+    monkeypatch.setattr("backend.services.product_service.settings.batch_chunk_size", 2)
+    project_id, documents = _project_with_documents(db_session, ["a", "bb", "ccc", "dddd", "eeeee"])
+    measured = _record_measured(monkeypatch, fail_on_call=2)
+
+    with pytest.raises(RuntimeError):
+        run_project_batch_extract(db_session, project_id=project_id, mode="text")
+    batch_id = db_session.execute(select(func.max(BatchItem.batch_id))).scalar_one()
+    failed = get_batch_run(db_session, project_id=project_id, batch_id=batch_id)
+    assert (failed["status"], failed["error"]) == ("failed", "internal_error")
+    assert (failed["total"], failed["processed"], failed["last_document_id"]) == (5, 2, documents[1]["document_id"])
+
+    result = resume_batch_run(db_session, project_id=project_id, batch_id=batch_id)
+
+    assert measured == [document["document_id"] for document in documents]
+    assert [item["chars"] for item in result["items"]] == [1, 2, 3, 4, 5]
+    assert result["status"] == "completed"
+    assert get_batch_run(db_session, project_id=project_id, batch_id=batch_id)["processed"] == 5
+    assert db_session.execute(select(func.count()).select_from(BatchItem)).scalar_one() == 5
+    with pytest.raises(ServiceError) as exc:
+        resume_batch_run(db_session, project_id=project_id, batch_id=batch_id)
+    assert exc.value.code == "batch_already_completed"
+
+
+def test_batch_checkpoint_conflict_discards_the_chunk(db_session, monkeypatch):
+    project_id, documents = _project_with_documents(db_session, ["a", "bb"])
+    batch_id = start_project_batch(db_session, project_id=project_id, mode="text")
+    original = product_service._measure_extractions
+
+    def _measure_while_another_worker_advances(rows, *args):
+        db_session.execute(update(BatchRun).where(BatchRun.id == batch_id).values(last_document_id=documents[-1]["document_id"]))
+        db_session.commit()
+        return original(rows, *args)
+
+    monkeypatch.setattr(product_service, "_measure_extractions", _measure_while_another_worker_advances)
+    with pytest.raises(ServiceError) as exc:
+        execute_batch_run(db_session, batch_id=batch_id)
+
+    assert exc.value.code == "batch_checkpoint_conflict"
+    assert get_batch_run(db_session, project_id=project_id, batch_id=batch_id)["status"] == "running"
+    assert db_session.execute(select(func.count()).select_from(BatchItem)).scalar_one() == 0
+
+
+def test_iter_batch_run_yields_each_chunk_once_committed(db_session, monkeypatch):
+    monkeypatch.setattr("backend.services.product_service.settings.batch_chunk_size", 2)
+    project_id, documents = _project_with_documents(db_session, ["a", "bb", "ccc"])
+    measured = _record_measured(monkeypatch)
+    batch_id = start_project_batch(db_session, project_id=project_id, mode="text")
+
+    events = iter_batch_run(db_session, batch_id=batch_id)
+    kind, batch = next(events)
+    assert (kind, batch["status"], batch["total"], batch["processed"]) == ("batch", "running", 3, 0)
+    kind, item = next(events)
+    assert (kind, item["document_id"]) == ("item", documents[0]["document_id"])
+    assert measured == [documents[0]["document_id"], documents[1]["document_id"]]
+    assert get_batch_run(db_session, project_id=project_id, batch_id=batch_id)["processed"] == 2
+
+    rest = list(events)
+    assert [kind for kind, _ in rest] == ["item", "item", "summary"]
+    assert rest[-1][1] == {
+        "batch_id": batch_id,
+        "project_id": project_id,
+        "mode": "text",
+        "status": "completed",
+        "count": 3,
+        "reused": 0,
+        "recomputed": 3,
+    }
+
+
+def test_project_source_chunks_are_bounded_by_bytes(db_session):
+    project_id, documents = _project_with_documents(db_session, ["aaaa", "bbbb", "c" * 10, "d", "e"])
+    ids = [document["document_id"] for document in documents]
+    repo = ProductRepository(db_session)
+
+    for with_data in (True, False):
+        chunks = list(
+            repo.iter_project_sources(project_id, tenant_id="default", chunk_size=3, max_bytes=8, with_data=with_data)
+        )
+        assert [[row[0] for row in chunk] for chunk in chunks] == [ids[:2], ids[2:3], ids[3:]]
+        assert [row[4] for row in chunks[0]] == ([b"aaaa", b"bbbb"] if with_data else [None, None])
@@ -0,0 +1,162 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.services.errors import ServiceError
+from backend.services.product_service import add_document_to_project, create_project, run_project_batch_extract
+from backend.services.redaction import Redactor, TermMatcher
+from backend.services.redaction_service import get_redactor, reset_redactor_cache, set_redaction_policy
+from backend.services.source_service import extract_content, upload_source
+from backend.services.task_runner import get_parser_runner
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_redactor_cache()
+    yield
+    reset_redactor_cache()
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    bootstrap_schema(engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _policy(db_session, **rules):
+    return set_redaction_policy(
+        db_session,
+        tenant_id="default",
+        actor_id="admin",
+        terms=rules.get("terms", []),
+        patterns=rules.get("patterns", []),
+        detectors=rules.get("detectors", []),
+    )
+
+
+def test_term_matcher_agrees_with_naive_search():
+    rng = random.Random(3)
+    terms = ["he", "she", "his", "hers", "ushe", "s"]
+    text = "".join(rng.choice("hersu ") for _ in range(2000))
+    matcher = TermMatcher(terms, whole_words=False)
+
+    ends = {end: end - start for start, end in matcher.spans(text)}
+    for end in range(1, len(text) + 1):
+        longest = max((len(term) for term in terms if text[:end].endswith(term)), default=0)
+        assert ends.get(end, 0) == longest
+
+
+def test_terms_respect_word_boundaries_and_case():
+    redactor = Redactor(terms=["Ann", "ACME corp"])
+    text, count = redactor.redact("ann wrote to acme CORP about the annual Annex; Ann.")
+    assert text == "[REDACTED] wrote to [REDACTED] about the annual Annex; [REDACTED]."
+    assert count == 3
+
+
+def test_detectors_validate_matches():
+    redactor = Redactor(detectors=["email", "iban", "phone"])
+    text, count = redactor.redact(
+        "Mail jo.smith+hr@mail.example.org, IBAN DE89 3704 0044 0532 0130 00 (not DE00370400440532013000), "
+        "phone +33 6 12 34 56 78, order 1234."
+    )
+    assert text == (
+        "Mail [REDACTED], IBAN [REDACTED] (not DE00370400440532013000), phone [REDACTED], order 1234."
+    )
+    assert count == 3
+
+
+def test_streaming_output_does_not_depend_on_chunking():
+    redactor = Redactor(terms=["alice", "bob smith"], detectors=["email", "iban"], patterns=[r"ACC-\d{6}"])
+    rng = random.Random(11)
+    words = ["alice", "bob", "smith", "x@y.io", "DE89370400440532013000", "ACC-000001", "malice", "word"]
+    text = " ".join(rng.choice(words) for _ in range(5000))
+
+    whole = redactor.redact(text, chunk_chars=len(text))
+    for chunk_chars in (1, 5, 97, 4096):
+        assert redactor.redact(text, chunk_chars=chunk_chars) == whole
+
+
+def test_policy_validation_rejects_bad_patterns(db_session):
+    with pytest.raises(ServiceError) as err:
+        _policy(db_session, patterns=["(unclosed"])
+    assert err.value.code == "invalid_redaction_policy"
+    assert err.value.details["index"] == 0
+
+    with pytest.raises(ServiceError) as err:
+        _policy(db_session, patterns=["x*"])
+    assert err.value.code == "invalid_redaction_policy"
+
+
+def test_compiled_redactor_is_cached_per_policy_version(db_session):
+    with pytest.raises(ServiceError) as err:
+        get_redactor(db_session, tenant_id="default")
+    assert err.value.code == "redaction_policy_not_found"
+
+    first = _policy(db_session, terms=["secret"])
+    redactor = get_redactor(db_session, tenant_id="default")
+    assert get_redactor(db_session, tenant_id="default") is redactor
+
+    reset_redactor_cache()
+    rebuilt = get_redactor(db_session, tenant_id="default")
+    assert rebuilt is not redactor
+    assert rebuilt.redact("a secret")[0] == "a [REDACTED]"
+
+    second = _policy(db_session, terms=["public"])
+    assert second["version"] == first["version"] + 1
+    assert get_redactor(db_session, tenant_id="default").redact("a secret in public")[0] == "a secret in [REDACTED]"
+
+
+def test_extract_redact_mode_streams_large_text(db_session, monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.redaction_chunk_chars", 1024)
+    _policy(db_session, terms=["Project Falcon"], detectors=["email"])
+    body = "".join(f"{n}: ping ops@corp.example about Project Falcon\n" for n in range(2000))
+    saved = upload_source(db_session, file_name="log.txt", file_type="txt", content=body)
+
+    result = extract_content(db_session, file_id=saved["file_id"], mode="redact")
+
+    assert result["redactions"] == 4000
+    assert result["content"].startswith("0: ping [REDACTED] about [REDACTED]\n1: ping")
+    assert "corp.example" not in result["content"]
+    assert result["chars"] == len(result["content"])
+
+
+def test_project_batch_redact_reports_counts(db_session):
+    _policy(db_session, terms=["alice"])
+    project = create_project(db_session, name="P", description="")
+    for name, content in (("a.txt", "alice and alice"), ("b.txt", "nobody")):
+        source = upload_source(db_session, file_name=name, file_type="txt", content=content)
+        add_document_to_project(db_session, project_id=project["project_id"], source_id=source["file_id"], title=name)
+
+    batch = run_project_batch_extract(db_session, project_id=project["project_id"], mode="redact")
+
+    assert [item["redactions"] for item in batch["items"]] == [2, 0]
+    assert batch["items"][0]["chars"] == len("[REDACTED] and [REDACTED]")
+
+
+def test_project_batch_redaction_runs_on_the_parser_runner(db_session, monkeypatch):
+    _policy(db_session, terms=["alice"])
+    project = create_project(db_session, name="P", description="")
+    source = upload_source(db_session, file_name="a.txt", file_type="txt", content="alice")
+    add_document_to_project(db_session, project_id=project["project_id"], source_id=source["file_id"], title="a.txt")
+    calls = []
+    runner = get_parser_runner()
+    original = runner.run_each
+
+    def run_each(fn, arg_list, **kwargs):
+        calls.append(len(arg_list))
+        return original(fn, arg_list, **kwargs)
+
+    monkeypatch.setattr(runner, "run_each", run_each)
+
+    batch = run_project_batch_extract(db_session, project_id=project["project_id"], mode="redact")
+
+    assert calls == [1]
+    assert batch["items"][0]["redactions"] == 1
@@ -0,0 +1,58 @@
+import pytest
+
+from backend.services.scheduler import FairScheduler
+
+
+def _drain(scheduler, can_run=lambda _: True):
+    order = []
+    while (picked := scheduler.pop(can_run)) is not None:
+        order.append(picked[1])
+    return order
+
+
+def test_interleaves_backlogged_tenants():
+    scheduler = FairScheduler()
+    for i in range(3):
+        scheduler.push("noisy", f"n{i}")
+    scheduler.push("quiet", "q0")
+    assert _drain(scheduler) == ["n0", "q0", "n1", "n2"]
+
+
+def test_weights_split_service():
+    scheduler = FairScheduler({"gold": 2})
+    for i in range(4):
+        scheduler.push("gold", f"g{i}")
+        scheduler.push("basic", f"b{i}")
+    assert _drain(scheduler)[:6] == ["g0", "b0", "g1", "g2", "b1", "g3"]
+
+
+def test_priority_classes_are_strict():
+    scheduler = FairScheduler()
+    scheduler.push("a", "reindex", priority="reindex")
+    scheduler.push("a", "batch", priority="batch")
+    scheduler.push("b", "interactive")
+    assert _drain(scheduler) == ["interactive", "batch", "reindex"]
+
+
+def test_idle_tenant_gets_no_banked_credit():
+    scheduler = FairScheduler()
+    for i in range(4):
+        scheduler.push("a", f"a{i}")
+    assert [scheduler.pop()[1] for _ in range(3)] == ["a0", "a1", "a2"]
+    scheduler.push("b", "b0")
+    scheduler.push("b", "b1")
+    assert _drain(scheduler) == ["a3", "b0", "b1"]
+
+
+def test_pop_skips_tenants_that_cannot_run():
+    scheduler = FairScheduler()
+    scheduler.push("busy", "x")
+    scheduler.push("free", "y")
+    assert scheduler.pop(lambda tenant: tenant != "busy") == ("free", "y")
+    assert scheduler.pop(lambda tenant: tenant != "busy") is None
+    assert len(scheduler) == 1
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        FairScheduler().push("a", "x", priority="urgent")
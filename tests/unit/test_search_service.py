@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.services.errors import ServiceError
+from backend.services.extraction_cache import reset_extraction_cache
+from backend.services.search_service import search_sources
+from backend.services.source_service import extract_content, save_spooled_upload, spool_upload, upload_source
+from backend.services.task_runner import shutdown_task_runner
+from tests._corpus import build_pdf
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    TestSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    bootstrap_schema(engine)
+    session = TestSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_search_ranks_name_matches_and_marks_snippets(db_session):
+    body = upload_source(db_session, file_name="notes.txt", file_type="txt", content="quarterly invoice totals are due")
+    named = upload_source(db_session, file_name="invoice.txt", file_type="txt", content="see the attached invoice")
+    upload_source(db_session, file_name="other.txt", file_type="txt", content="nothing relevant here")
+
+    result = search_sources(db_session, q="invoice")
+
+    assert [item["file_id"] for item in result["items"]] == [named["file_id"], body["file_id"]]
+    assert "<mark>invoice</mark>" in result["items"][1]["snippet"]
+    assert result["next_cursor"] is None
+
+
+def test_search_is_tenant_scoped(db_session):
+    upload_source(db_session, file_name="a.txt", file_type="txt", content="shared keyword", tenant_id="tenant-a")
+    own = upload_source(db_session, file_name="b.txt", file_type="txt", content="shared keyword", tenant_id="tenant-b")
+
+    result = search_sources(db_session, q="keyword", tenant_id="tenant-b")
+
+    assert [item["file_id"] for item in result["items"]] == [own["file_id"]]
+
+
+def test_search_pages_with_opaque_cursor(db_session):
+    ids = {upload_source(db_session, file_name=f"doc{i}.txt", file_type="txt", content="alpha beta")["file_id"] for i in range(5)}
+
+    seen, cursor = [], None
+    while True:
+        page = search_sources(db_session, q="alpha", limit=2, cursor=cursor)
+        seen.extend(item["file_id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+
+
+def test_search_treats_query_syntax_as_plain_terms(db_session):
+    saved = upload_source(db_session, file_name="q.txt", file_type="txt", content="foo or bar")
+
+    result = search_sources(db_session, q='"foo" OR (')
+
+    assert [item["file_id"] for item in result["items"]] == [saved["file_id"]]
+
+
+@pytest.mark.parametrize(("q", "cursor", "code"), [("!!", None, "invalid_search_query"), ("foo", "not-a-cursor", "invalid_cursor")])
+def test_search_rejects_bad_input(db_session, q, cursor, code):
+    with pytest.raises(ServiceError) as err:
+        search_sources(db_session, q=q, cursor=cursor)
+    assert err.value.code == code
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+def test_binary_sources_are_indexed_by_name_until_text_extraction(db_session):
+    pytest.importorskip("pdfplumber")
+    reset_extraction_cache()
+    upload = asyncio.run(spool_upload(_chunks(build_pdf(["hidden zebra page"])), file_type="pdf"))
+    try:
+        saved = save_spooled_upload(db_session, file_name="report.pdf", upload=upload)
+    finally:
+        upload.close()
+    assert search_sources(db_session, q="report")["count"] == 1
+    assert search_sources(db_session, q="zebra")["count"] == 0
+
+    try:
+        extract_content(db_session, file_id=saved["file_id"], mode="text")
+    finally:
+        shutdown_task_runner()
+        reset_extraction_cache()
+
+    assert [item["file_id"] for item in search_sources(db_session, q="zebra")["items"]] == [saved["file_id"]]
@@ -0,0 +1,109 @@
+import asyncio
+import ipaddress
+import socket
+
+import pytest
+
+from backend.services import security
+from backend.services.errors import ServiceError
+from backend.services.metrics_service import metrics, render_prometheus
+from backend.services.security import (
+    PRIVATE_NETS,
+    DnsCache,
+    is_private_address,
+    reset_dns_cache,
+    resolve_public_http_url,
+    validate_public_http_url,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_dns_cache()
+    yield
+    reset_dns_cache()
+
+
+@pytest.fixture()
+def fake_dns(monkeypatch):
+    answers = {"docs.example.test": "93.184.216.34", "intranet.example.test": "10.1.2.3"}
+    calls: list[str] = []
+
+    def _getaddrinfo(host, port, *args, **kwargs):
+        calls.append(host)
+        if host not in answers:
+            raise socket.gaierror(socket.EAI_NONAME, "unknown host")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (answers[host], port or 0))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", _getaddrinfo)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "address",
+    ["127.0.0.1", "10.255.255.255", "172.16.0.0", "172.31.255.255", "192.168.1.1", "169.254.169.254", "::1", "fd00::1", "fe80::1", "::ffff:127.0.0.1"],
+)
+def test_private_ranges_match(address):
+    assert is_private_address(address)
+
+
+@pytest.mark.parametrize("address", ["9.255.255.255", "11.0.0.0", "172.32.0.0", "93.184.216.34", "2606:4700::1", "::ffff:8.8.8.8"])
+def test_public_addresses_pass(address):
+    assert not is_private_address(address)
+
+
+def test_interval_lookup_agrees_with_network_scan():
+    samples = [ipaddress.ip_address(value) for value in range(0, 2**32, 2**32 // 4099)]
+    for ip in samples:
+        assert is_private_address(str(ip)) == any(ip in net for net in PRIVATE_NETS if net.version == 4)
+
+
+def test_positive_lookups_are_cached(fake_dns):
+    hits = metrics["dns_cache_total"]["hit"]
+
+    validate_public_http_url("http://docs.example.test/a")
+    resolved = asyncio.run(resolve_public_http_url("https://docs.example.test/b"))
+
+    assert resolved.addresses == ("93.184.216.34",)
+    assert resolved.port == 443
+    assert fake_dns == ["docs.example.test"]
+    assert metrics["dns_cache_total"]["hit"] == hits + 1
+
+
+def test_blocked_and_unresolvable_hosts_are_cached_negatively(fake_dns):
+    for _ in range(2):
+        with pytest.raises(ServiceError) as err:
+            validate_public_http_url("http://intranet.example.test/")
+        assert err.value.code == "blocked_private_network"
+        with pytest.raises(ServiceError) as err:
+            asyncio.run(resolve_public_http_url("http://missing.example.test/"))
+        assert err.value.code == "dns_resolution_failed"
+
+    assert fake_dns == ["intranet.example.test", "missing.example.test"]
+
+
+def test_dns_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(security, "monotonic", lambda: now[0])
+    cache = DnsCache(max_entries=2, ttl_s=60, negative_ttl_s=5)
+    cache.set("a", ("1.1.1.1",))
+    cache.set("b", ServiceError(code="blocked_private_network", message="blocked"))
+
+    now[0] += 10
+    assert cache.get("a") == ("1.1.1.1",)
+    assert cache.get("b") is None
+
+    cache.set("c", ("3.3.3.3",))
+    cache.set("d", ("4.4.4.4",))
+    assert cache.get("a") is None
+    assert len(cache) == 2
+
+
+def test_dns_metrics_are_rendered(fake_dns):
+    validate_public_http_url("http://docs.example.test/")
+    validate_public_http_url("http://docs.example.test/")
+
+    body = render_prometheus()
+    assert 'docuhub_dns_cache_total{event="hit"}' in body
+    assert "docuhub_dns_cache_hit_ratio" in body
+    assert "docuhub_dns_resolve_duration_ms_count" in body
@@ -0,0 +1,129 @@
+import random
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.db.models import SourceLshBand, SourceSignature
+from backend.repositories.similarity_repository import (
+    BANDS,
+    NUM_PERM,
+    SimilarityRepository,
+    band_buckets,
+    minhash_signature,
+)
+from backend.repositories.source_repository import SourceRepository
+from backend.services.errors import ServiceError
+from backend.services.reindex_service import backfill_index
+from backend.services.similarity_service import find_similar_sources
+from backend.services.source_service import upload_source
+
+_WORDS = [f"w{n}" for n in range(500)]
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    bootstrap_schema(engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _text(seed: int, words: int = 400) -> list[str]:
+    rng = random.Random(seed)
+    return [rng.choice(_WORDS) for _ in range(words)]
+
+
+def _edit(tokens: list[str], changes: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    edited = list(tokens)
+    for _ in range(changes):
+        edited[rng.randrange(len(edited))] = rng.choice(_WORDS)
+    return edited
+
+
+def test_signature_is_deterministic_and_compact():
+    body = " ".join(_text(1))
+    signature = minhash_signature(body)
+
+    assert signature.dtype == np.uint32 and signature.shape == (NUM_PERM,)
+    assert np.array_equal(signature, minhash_signature(body.upper()))
+    assert len(band_buckets(signature)) == BANDS
+    assert minhash_signature("  ... ") is None
+
+
+def test_signature_agreement_tracks_jaccard():
+    tokens = _text(2)
+    near = minhash_signature(" ".join(_edit(tokens, 5, seed=3)))
+    unrelated = minhash_signature(" ".join(_text(4)))
+    original = minhash_signature(" ".join(tokens))
+
+    assert (original == near).mean() > 0.8
+    assert (original == unrelated).mean() < 0.1
+
+
+def test_similar_returns_near_duplicates_only(db_session):
+    tokens = _text(5)
+    base = upload_source(db_session, file_name="base.txt", file_type="txt", content=" ".join(tokens))
+    near = upload_source(db_session, file_name="near.txt", file_type="txt", content=" ".join(_edit(tokens, 4, seed=6)))
+    copy = upload_source(db_session, file_name="copy.txt", file_type="txt", content=" ".join(tokens))
+    for seed in range(10, 20):
+        upload_source(db_session, file_name=f"other{seed}.txt", file_type="txt", content=" ".join(_text(seed)))
+
+    result = find_similar_sources(db_session, file_id=base["file_id"])
+
+    assert [item["file_id"] for item in result["items"]] == [copy["file_id"], near["file_id"]]
+    assert result["items"][0]["score"] == 1.0
+    assert result["count"] == 2
+    strict = find_similar_sources(db_session, file_id=base["file_id"], min_score=1.0)
+    assert [item["file_name"] for item in strict["items"]] == ["copy.txt"]
+
+
+def test_similar_is_tenant_scoped_and_checks_source(db_session):
+    body = " ".join(_text(7))
+    mine = upload_source(db_session, file_name="a.txt", file_type="txt", content=body)
+    upload_source(db_session, file_name="b.txt", file_type="txt", content=body, tenant_id="other")
+
+    assert find_similar_sources(db_session, file_id=mine["file_id"])["items"] == []
+    with pytest.raises(ServiceError) as err:
+        find_similar_sources(db_session, file_id=mine["file_id"], tenant_id="other")
+    assert err.value.code == "file_not_found"
+
+
+def test_reindex_replaces_bands(db_session):
+    saved = upload_source(db_session, file_name="a.txt", file_type="txt", content=" ".join(_text(8)))
+    repo = SourceRepository(db_session)
+    source = repo.get_source(saved["file_id"], tenant_id="default")
+    before = SimilarityRepository(db_session).get_signature(source.id, tenant_id="default").copy()
+
+    repo.reindex_source(source, search_text=" ".join(_text(9)))
+
+    count = select(func.count()).select_from(SourceLshBand).where(SourceLshBand.source_id == source.id)
+    assert db_session.execute(count).scalar_one() == BANDS
+    assert not np.array_equal(SimilarityRepository(db_session).get_signature(source.id, tenant_id="default"), before)
+
+
+def test_backfill_signs_sources_created_before_the_index(db_session):
+    tokens = _text(10)
+    base = upload_source(db_session, file_name="base.txt", file_type="txt", content=" ".join(tokens))
+    copy = upload_source(db_session, file_name="copy.txt", file_type="txt", content=" ".join(tokens))
+    upload_source(db_session, file_name="other.txt", file_type="txt", content=" ".join(_text(11)), tenant_id="other")
+    db_session.execute(delete(SourceLshBand))
+    db_session.execute(delete(SourceSignature))
+    db_session.commit()
+    assert find_similar_sources(db_session, file_id=base["file_id"])["items"] == []
+
+    assert backfill_index(db_session, "signatures", tenant_id="default", chunk_size=1) == {
+        "index": "signatures",
+        "scanned": 2,
+        "indexed": 2,
+    }
+
+    assert [item["file_id"] for item in find_similar_sources(db_session, file_id=base["file_id"])["items"]] == [copy["file_id"]]
+    assert backfill_index(db_session, "signatures")["indexed"] == 1
+    assert backfill_index(db_session, "signatures")["scanned"] == 0
@@ -1,7 +1,13 @@
-from sqlalchemy import create_engine
+import os
+import zlib
+from io import BytesIO
+
+from sqlalchemy import create_engine, func, select
 from sqlalchemy.orm import sessionmaker
 
 from backend.db.migrations import bootstrap_schema
+from backend.db.models import ContentBlob
+from backend.repositories.blob_repository import content_sha256
 from backend.repositories.source_repository import SourceRepository
 
 
@@ -16,7 +22,7 @@ def test_repository_create_get_list() -> None:
         created = repo.create_source(file_name="a.txt", file_type="txt", content="hello", tenant_id="tenant-a")
 
         fetched = repo.get_source(created.id, tenant_id="tenant-a")
-        listed = repo.list_sources(tenant_id="tenant-a")
+        listed = repo.list_sources(tenant_id="tenant-a", limit=10)
 
         assert fetched is not None
         assert fetched.file_name == "a.txt"
@@ -36,6 +42,105 @@ def test_repository_tenant_isolation() -> None:
         repo = SourceRepository(session)
         created = repo.create_source(file_name="a.txt", file_type="txt", content="hello", tenant_id="tenant-a")
         assert repo.get_source(created.id, tenant_id="tenant-b") is None
-        assert repo.list_sources(tenant_id="tenant-b") == []
+        assert repo.list_sources(tenant_id="tenant-b", limit=10) == []
+    finally:
+        session.close()
+
+
+def test_repository_deduplicates_content_per_tenant() -> None:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    bootstrap_schema(engine)
+
+    session = Session()
+    try:
+        repo = SourceRepository(session)
+        first = repo.create_source(file_name="a.pdf", file_type="txt", content="same body", tenant_id="tenant-a")
+        second = repo.create_source(file_name="b.pdf", file_type="txt", content="same body", tenant_id="tenant-a")
+        other_tenant = repo.create_source(file_name="c.pdf", file_type="txt", content="same body", tenant_id="tenant-b")
+
+        assert first.blob_id == second.blob_id
+        assert second.blob.refcount == 2
+        assert other_tenant.blob_id != first.blob_id
+        assert session.execute(select(func.count()).select_from(ContentBlob)).scalar_one() == 2
+        assert repo.get_source(second.id, tenant_id="tenant-a").content == "same body"
+    finally:
+        session.close()
+
+
+def test_repository_reads_content_ranges_without_loading_blob() -> None:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    bootstrap_schema(engine)
+
+    session = Session()
+    try:
+        repo = SourceRepository(session)
+        source = repo.create_source(file_name="a.txt", file_type="txt", content="0123456789", tenant_id="tenant-a")
+
+        assert repo.get_content_info(source.id, tenant_id="tenant-a") == ("txt", 10)
+        assert repo.get_content_info(source.id, tenant_id="tenant-b") is None
+        assert repo.read_content_range(source.id, tenant_id="tenant-a", offset=3, length=4) == b"3456"
+        assert repo.read_content_range(source.id, tenant_id="tenant-a", offset=8, length=10) == b"89"
+        assert repo.read_content_range(source.id, tenant_id="tenant-b", offset=0, length=4) == b""
+    finally:
+        session.close()
+
+
+def test_repository_compresses_large_bodies_transparently() -> None:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    bootstrap_schema(engine)
+
+    session = Session()
+    try:
+        repo = SourceRepository(session)
+        body = "".join(f"line {n:05d} of a fairly repetitive report\n" for n in range(2000))
+        large = repo.create_source(file_name="big.txt", file_type="txt", content=body, tenant_id="tenant-a")
+        small = repo.create_source(file_name="small.txt", file_type="txt", content="tiny", tenant_id="tenant-a")
+
+        codec, stored = session.execute(
+            select(ContentBlob.codec, func.length(ContentBlob.data)).where(ContentBlob.id == large.blob_id)
+        ).one()
+        assert codec == "zlib"
+        assert stored < len(body) // 4
+        assert small.blob.codec == "identity"
+
+        assert repo.get_source(large.id, tenant_id="tenant-a").content == body
+        assert repo.get_content_info(large.id, tenant_id="tenant-a") == ("txt", len(body))
+        assert repo.read_content_range(large.id, tenant_id="tenant-a", offset=41_000, length=50) == body[41_000:41_050].encode()
+        streamed = repo.iter_content_range(large.id, tenant_id="tenant-a", offset=100, length=70_000, chunk_bytes=4096)
+        chunks = list(streamed)
+        assert b"".join(chunks) == body[100:70_100].encode()
+        assert max(len(chunk) for chunk in chunks) <= 4096
+    finally:
+        session.close()
+
+
+def test_repository_compresses_files_chunk_by_chunk() -> None:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    bootstrap_schema(engine)
+
+    session = Session()
+    try:
+        repo = SourceRepository(session)
+        text = b"".join(f"row {n:06d} of a long export\n".encode() for n in range(20_000))
+        noise = os.urandom(200_000)
+        created = {}
+        for name, body in (("text.csv", text), ("noise.bin", noise)):
+            created[name] = repo.create_source_from_file(
+                file_name=name,
+                file_type="txt",
+                fileobj=BytesIO(body),
+                sha256=content_sha256(body),
+                tenant_id="tenant-a",
+            )
+
+        text_blob, noise_blob = created["text.csv"].blob, created["noise.bin"].blob
+        assert text_blob.codec == "zlib" and text_blob.size_bytes == len(text)
+        assert zlib.decompress(text_blob.data) == text
+        # Incompressible bodies give up on encoding and are stored raw.
+        assert noise_blob.codec == "identity" and noise_blob.data == noise
     finally:
         session.close()
@@ -1,19 +1,36 @@
-from urllib.error import URLError
+import asyncio
+import hashlib
+import tracemalloc
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.orm import sessionmaker
 
 from backend.db.migrations import bootstrap_schema
+from backend.db.models import Source
 from backend.services.errors import ServiceError
+from backend.services.extraction_cache import reset_extraction_cache
+from backend.services.security import ResolvedUrl
 from backend.services.source_service import (
+    DownloadedSource,
     ai_assist,
-    download_from_url,
     extract_content,
+    fetch_url_source,
+    fetch_url_sources,
     get_source,
+    get_source_content_info,
+    ingest_url_batch,
     list_sources,
+    read_source_content,
+    resolve_content_window,
+    run_url_batch_ingest,
+    save_downloaded_source,
+    save_spooled_upload,
+    spool_upload,
     upload_source,
 )
+from backend.services.task_runner import shutdown_task_runner
+from tests._corpus import build_pdf
 
 
 @pytest.fixture()
@@ -54,23 +71,35 @@ def test_ai_assist_disabled_error():
     assert err.value.code == "api_key_disabled"
 
 
-def test_download_blocks_localhost(db_session):
+def test_download_blocks_localhost():
     with pytest.raises(ServiceError) as err:
-        download_from_url(db_session, url="http://localhost/test.txt")
+        asyncio.run(fetch_url_source("http://localhost/test.txt"))
     assert err.value.code in {"blocked_host", "blocked_private_network"}
 
 
-def test_download_network_error_is_normalized(db_session, monkeypatch):
-    def _raise(*args, **kwargs):
-        raise URLError("offline")
+def test_download_network_error_is_normalized(monkeypatch):
+    async def _raise(*args, **kwargs):
+        raise ConnectionRefusedError("offline")
 
-    monkeypatch.setattr("backend.services.source_service.urlopen", _raise)
+    async def _resolve(url):
+        return ResolvedUrl(url=url, scheme="https", host="example.com", port=443, addresses=("93.184.216.34",))
+
+    monkeypatch.setattr("backend.services.http_fetch.resolve_public_http_url", _resolve)
+    monkeypatch.setattr("backend.services.http_fetch.asyncio.open_connection", _raise)
 
     with pytest.raises(ServiceError) as err:
-        download_from_url(db_session, url="https://example.com/file.txt")
+        asyncio.run(fetch_url_source("https://example.com/file.txt"))
     assert err.value.code == "network_url_error"
 
 
+def test_save_downloaded_source_stores_text(db_session):
+    download = DownloadedSource(url="https://example.com/notes.txt", content="fetched body", truncated=False)
+    saved = save_downloaded_source(db_session, download=download)
+    assert saved["source_url"] == "https://example.com/notes.txt"
+    assert saved["bytes_previewed"] == 12
+    assert get_source(db_session, file_id=saved["file_id"])["content"] == "fetched body"
+
+
 def test_upload_too_large(db_session, monkeypatch):
     monkeypatch.setattr("backend.services.source_service.settings.max_upload_chars", 3)
     with pytest.raises(ServiceError) as err:
@@ -82,3 +111,206 @@ def test_upload_unsupported_type(db_session):
     with pytest.raises(ServiceError) as err:
         upload_source(db_session, file_name="doc.bin", file_type="application/octet-stream", content="abc")
     assert err.value.code == "unsupported_file_type"
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def test_streamed_upload_hashes_and_stores_binary(db_session):
+    body = b"%PDF-1.7\x00\xff" * 1000
+    upload = asyncio.run(spool_upload(_chunks(body[:5000], body[5000:]), file_type="PDF"))
+    try:
+        saved = save_spooled_upload(db_session, file_name="doc.pdf", upload=upload)
+    finally:
+        upload.close()
+
+    assert saved["file_type"] == "pdf"
+    assert saved["size_bytes"] == len(body)
+    assert saved["sha256"] == hashlib.sha256(body).hexdigest()
+
+
+def test_streamed_upload_enforces_byte_limit_while_streaming(monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.max_upload_bytes", 8)
+    with pytest.raises(ServiceError) as err:
+        asyncio.run(spool_upload(_chunks(b"12345", b"67890"), file_type="txt"))
+    assert err.value.code == "upload_too_large"
+    assert err.value.details["upload_bytes"] == 10
+
+
+def test_streamed_upload_rejects_declared_oversize_and_bad_type(monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.max_upload_bytes", 8)
+    with pytest.raises(ServiceError) as err:
+        asyncio.run(spool_upload(_chunks(), file_type="txt", declared_length=9))
+    assert err.value.code == "upload_too_large"
+    with pytest.raises(ServiceError) as err:
+        asyncio.run(spool_upload(_chunks(b"x"), file_type="exe"))
+    assert err.value.code == "unsupported_file_type"
+
+
+def test_resolve_content_window_ranges():
+    assert resolve_content_window(10) == (0, 9, False)
+    assert resolve_content_window(10, range_header="bytes=2-5") == (2, 5, True)
+    assert resolve_content_window(10, range_header="bytes=7-") == (7, 9, True)
+    assert resolve_content_window(10, range_header="bytes=-3") == (7, 9, True)
+    assert resolve_content_window(10, range_header="bytes=4-99") == (4, 9, True)
+    assert resolve_content_window(10, offset=4, limit=3) == (4, 6, False)
+    assert resolve_content_window(10, offset=0, limit=50) == (0, 9, False)
+
+
+@pytest.mark.parametrize("header", ["bytes=5-2", "items=0-1", "bytes=0-1,4-5", "bytes=a-b", "bytes=-", "bytes 0-1"])
+def test_resolve_content_window_ignores_invalid_and_multi_ranges(header):
+    assert resolve_content_window(10, range_header=header) == (0, 9, False)
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=12-15", "bytes=-0"])
+def test_resolve_content_window_rejects_unsatisfiable(header):
+    with pytest.raises(ServiceError) as err:
+        resolve_content_window(10, range_header=header)
+    assert err.value.code == "range_not_satisfiable"
+
+
+def test_read_source_content_slices(db_session):
+    saved = upload_source(db_session, file_name="doc.txt", file_type="txt", content="hello world")
+    info = get_source_content_info(db_session, file_id=saved["file_id"])
+    assert info["size_bytes"] == 11
+    assert info["media_type"].startswith("text/plain")
+    assert read_source_content(db_session, file_id=saved["file_id"], offset=6, length=5) == b"world"
+    with pytest.raises(ServiceError) as err:
+        get_source_content_info(db_session, file_id=999)
+    assert err.value.code == "file_not_found"
+
+
+def test_extract_reuses_cached_result_for_identical_content(db_session, monkeypatch):
+    reset_extraction_cache()
+    first = upload_source(db_session, file_name="a.txt", file_type="txt", content="shared body")
+    second = upload_source(db_session, file_name="b.txt", file_type="txt", content="shared body")
+    extract_content(db_session, file_id=first["file_id"], mode="text")
+
+    calls = []
+    monkeypatch.setattr(
+        "backend.services.source_service.parse_document",
+        lambda data, parser, mode: calls.append(data) or data.decode(),
+    )
+    assert extract_content(db_session, file_id=second["file_id"], mode="text")["content"] == "shared body"
+    assert calls == []
+    reset_extraction_cache()
+
+
+def _save_bytes(db_session, file_name: str, data: bytes, file_type: str) -> int:
+    upload = asyncio.run(spool_upload(_chunks(data), file_type=file_type))
+    try:
+        return save_spooled_upload(db_session, file_name=file_name, upload=upload)["file_id"]
+    finally:
+        upload.close()
+
+
+def test_extract_parses_pdf_in_parser_pool(db_session):
+    pytest.importorskip("pdfplumber")
+    good = _save_bytes(db_session, "doc.pdf", build_pdf(["alpha page", "beta page"]), "pdf")
+    broken = _save_bytes(db_session, "broken.pdf", b"%PDF-1.4 not really a pdf", "pdf")
+    try:
+        assert extract_content(db_session, file_id=good, mode="text")["content"] == "alpha page\nbeta page"
+        with pytest.raises(ServiceError) as err:
+            extract_content(db_session, file_id=broken, mode="text")
+        assert err.value.code == "parse_failed"
+    finally:
+        shutdown_task_runner()
+
+
+def test_list_sources_pages_with_cursor(db_session):
+    ids = [upload_source(db_session, file_name=f"{n}.txt", file_type="txt", content=str(n))["file_id"] for n in range(5)]
+
+    first = list_sources(db_session, limit=2)
+    second = list_sources(db_session, limit=2, cursor=first["next_cursor"])
+    last = list_sources(db_session, limit=2, cursor=second["next_cursor"])
+
+    assert [item["file_id"] for item in first["items"] + second["items"] + last["items"]] == ids[::-1]
+    assert last["next_cursor"] is None
+    assert last["count"] == 1
+
+
+def test_list_sources_memory_is_constant_per_page_at_100k_rows(db_session):
+    db_session.execute(
+        insert(Source),
+        [{"file_name": f"{n}.txt", "file_type": "txt", "content": "x" * 200, "tenant_id": "default"} for n in range(100_000)],
+    )
+    db_session.commit()
+    statements = []
+    event.listen(db_session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def peak_bytes(cursor):
+        tracemalloc.start()
+        try:
+            page = list_sources(db_session, limit=100, cursor=cursor)
+            return page, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    first, first_peak = peak_bytes(None)
+    deep, deep_peak = peak_bytes(500)
+
+    assert first["count"] == 100 and first["next_cursor"] == 99_901
+    assert [item["file_id"] for item in deep["items"]][:2] == [499, 498]
+    assert first_peak < 512 * 1024 and deep_peak < 512 * 1024
+    assert all("sources.content" not in statement for statement in statements)
+
+
+def test_fetch_url_sources_caps_global_and_per_host_concurrency(monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.url_batch_concurrency", 3)
+    monkeypatch.setattr("backend.services.source_service.settings.url_batch_per_host_concurrency", 2)
+    active: dict[str, int] = {}
+    peaks: dict[str, int] = {}
+
+    async def _fake_fetch(url):
+        host = url.split("/")[2]
+        active[host] = active.get(host, 0) + 1
+        peaks[host] = max(peaks.get(host, 0), active[host])
+        peaks["*"] = max(peaks.get("*", 0), sum(active.values()))
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        if url.endswith("/bad"):
+            raise ServiceError(code="network_http_error", message="HTTP error while downloading")
+        return DownloadedSource(url=url, content=url, truncated=False)
+
+    monkeypatch.setattr("backend.services.source_service.fetch_url_source", _fake_fetch)
+    urls = [f"https://a.example/{n}" for n in range(6)] + [f"https://b.example/{n}" for n in range(6)] + ["https://c.example/bad"]
+    fetched = asyncio.run(fetch_url_sources(urls))
+
+    assert peaks["a.example"] == 2 and peaks["b.example"] == 2
+    assert peaks["*"] == 3
+    assert [outcome.url for outcome in fetched[:12]] == urls[:12]
+    assert isinstance(fetched[12], ServiceError)
+
+
+def test_url_batch_ingest_commits_once_per_chunk(db_session, monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.batch_chunk_size", 2)
+
+    async def _fake_fetch(url):
+        if url.endswith("/bad"):
+            raise ServiceError(code="blocked_private_network", message="Private network addresses are blocked")
+        return DownloadedSource(url=url, content=f"body of {url}", truncated=False)
+
+    commits = []
+    event.listen(db_session.get_bind(), "commit", lambda _: commits.append(1))
+    monkeypatch.setattr("backend.services.source_service.fetch_url_source", _fake_fetch)
+    urls = ["https://docs.example/a", "https://docs.example/bad", "https://docs.example/c"]
+    result = run_url_batch_ingest(db_session, urls=urls)
+
+    assert (result["count"], result["stored"], result["failed"]) == (3, 2, 1)
+    assert result["items"][1] == {"url": urls[1], "downloaded": False, "error": "blocked_private_network"}
+    assert len(commits) == 2
+    stored = get_source(db_session, file_id=result["items"][2]["file_id"])
+    assert stored["file_name"] == "c" and stored["content"] == "body of https://docs.example/c"
+
+
+def test_url_batch_rejects_oversized_list(monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.url_batch_max_urls", 1)
+
+    async def _never(*_args):
+        raise AssertionError("nothing should be fetched or saved")
+
+    with pytest.raises(ServiceError) as err:
+        asyncio.run(ingest_url_batch(["https://a.example/1", "https://a.example/2"], save_chunk=_never))
+    assert err.value.code == "url_batch_too_large"
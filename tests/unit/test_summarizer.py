@@ -0,0 +1,76 @@
+import hashlib
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.services import extraction_cache
+from backend.services.extraction_cache import reset_extraction_cache
+from backend.services.source_service import extract_content, upload_source
+from backend.services.summarizer import MAX_INPUT_CHARS, MAX_SENTENCE_CHARS, split_sentences, summarize
+
+_ARTICLE = (
+    "Solar panels convert sunlight into electricity for homes. "
+    "The city council met on Tuesday. "
+    "Rooftop solar panels cut household electricity bills. "
+    "Solar electricity from panels is now cheaper than coal. "
+    "A local bakery won a prize for its bread. "
+    "Homes with solar panels sell electricity back to the grid. "
+    "Rooftop solar panels cut household electricity bills. "
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_extraction_cache()
+    yield
+    reset_extraction_cache()
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    bootstrap_schema(engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_split_sentences_bounds_input_and_sentence_length():
+    assert split_sentences("One. Two?  Three!\n\nFour\nwrapped line.") == ["One.", "Two?", "Three!", "Four wrapped line."]
+
+    rows = split_sentences("cell " * 1000)
+    assert all(len(row) <= MAX_SENTENCE_CHARS for row in rows)
+    assert sum(len(row) + 1 for row in split_sentences("word. " * MAX_INPUT_CHARS)) <= MAX_INPUT_CHARS + 1
+
+
+def test_summary_keeps_central_sentences_in_order_without_repeats():
+    summary = summarize(_ARTICLE, max_chars=160)
+
+    assert len(summary) <= 160
+    assert "bakery" not in summary and "council" not in summary
+    assert summary.count("Rooftop solar panels cut household electricity bills.") <= 1
+    sentences = split_sentences(summary)
+    assert sorted(sentences, key=_ARTICLE.index) == sentences
+
+
+def test_summary_of_short_or_wordless_text():
+    assert summarize("Already short.", max_chars=400) == "Already short."
+    assert summarize("-" * 1000, max_chars=50) == "-" * 50
+    assert summarize("x" * 1000, max_chars=50) == "x" * 50
+
+
+def test_summaries_are_cached_per_length(db_session):
+    body = _ARTICLE * 3
+    saved = upload_source(db_session, file_name="a.txt", file_type="txt", content=body)
+    sha256 = hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    short = extract_content(db_session, file_id=saved["file_id"], mode="summary", summary_chars=60)
+    longer = extract_content(db_session, file_id=saved["file_id"], mode="summary", summary_chars=200)
+
+    assert short["chars"] <= 60 < longer["chars"] <= 200
+    assert extraction_cache.lookup(sha256, "summary", "text", 60) == short["content"]
+    assert extraction_cache.lookup(sha256, "summary", "text", 200) == longer["content"]
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+from concurrent.futures import wait
+from operator import mul
+
+import pytest
+from sqlalchemy.util.concurrency import greenlet_spawn
+
+from backend.services.errors import ServiceError
+from backend.services.metrics_service import metrics
+from backend.services.task_runner import TaskRunner
+
+
+def test_run_returns_result_and_releases_slot():
+    runner = TaskRunner(max_workers=1, queue_size=0)
+    try:
+        assert runner.run(mul, 6, 7, tenant_id="t1") == 42
+        assert runner.in_flight("t1") == 0
+    finally:
+        runner.shutdown()
+
+
+def test_queue_full_raises_with_retry_hint():
+    runner = TaskRunner(max_workers=1, queue_size=1, retry_after_s=3)
+    gate = threading.Event()
+    try:
+        runner.submit(gate.wait, tenant_id="a")
+        runner.submit(gate.wait, tenant_id="b")
+        with pytest.raises(ServiceError) as err:
+            runner.submit(gate.wait, tenant_id="c")
+        assert err.value.code == "task_queue_full"
+        assert err.value.details["retry_after_s"] == 3
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_tenant_cap_rejects_noisy_tenant_only():
+    runner = TaskRunner(max_workers=2, queue_size=4, tenant_max_in_flight=1)
+    gate = threading.Event()
+    try:
+        runner.submit(gate.wait, tenant_id="noisy")
+        with pytest.raises(ServiceError) as err:
+            runner.submit(gate.wait, tenant_id="noisy")
+        assert err.value.code == "tenant_concurrency_limited"
+        runner.submit(gate.wait, tenant_id="quiet")
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_cancel_pending_task():
+    runner = TaskRunner(max_workers=1, queue_size=1)
+    gate = threading.Event()
+    try:
+        runner.submit(gate.wait)
+        pending = runner.submit(gate.wait)
+        assert runner.cancel(pending) is True
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_run_timeout_is_normalized():
+    runner = TaskRunner(max_workers=1, queue_size=0)
+    gate = threading.Event()
+    try:
+        with pytest.raises(ServiceError) as err:
+            runner.run(gate.wait, timeout=0.05)
+        assert err.value.code == "task_timeout"
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_shutdown_rejects_new_work():
+    runner = TaskRunner(max_workers=1)
+    runner.shutdown()
+    with pytest.raises(ServiceError) as err:
+        runner.submit(mul, 1, 2)
+    assert err.value.code == "task_runner_closed"
+
+
+def test_process_mode_runs_picklable_callables():
+    runner = TaskRunner(mode="process", max_workers=1)
+    try:
+        assert runner.run(mul, 3, 5) == 15
+    finally:
+        runner.shutdown()
+
+
+def test_run_inside_greenlet_does_not_block_event_loop():
+    runner = TaskRunner(max_workers=1)
+    gate = threading.Event()
+
+    async def _execute():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, gate.set)
+        return await greenlet_spawn(runner.run, lambda: gate.wait(1) and "done")
+
+    try:
+        assert asyncio.run(_execute()) == "done"
+    finally:
+        runner.shutdown()
+
+
+def test_run_each_keeps_order_and_returns_exceptions():
+    runner = TaskRunner(max_workers=2, queue_size=4)
+    try:
+        results = runner.run_each(divmod, [(7, 2), (1, 0), (9, 3)], tenant_id="t1")
+        assert results[0] == (3, 1)
+        assert isinstance(results[1], ZeroDivisionError)
+        assert results[2] == (3, 0)
+        assert runner.in_flight("t1") == 0
+    finally:
+        runner.shutdown()
+
+
+def test_run_each_times_out_stuck_items():
+    runner = TaskRunner(max_workers=2, queue_size=2)
+    gate = threading.Event()
+    try:
+        results = runner.run_each(lambda block: gate.wait() if block else "ok", [(True,), (False,)], timeout=0.2)
+        assert isinstance(results[0], ServiceError) and results[0].code == "task_timeout"
+        assert results[1] == "ok"
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def _blocked_runner(**kwargs):
+    """A one-worker runner whose worker is held by tenant "noisy" until the returned gate opens."""
+    runner = TaskRunner(max_workers=1, queue_size=8, **kwargs)
+    gate = threading.Event()
+    runner.submit(gate.wait, tenant_id="noisy", priority="batch")
+    return runner, gate
+
+
+def test_fair_scheduler_serves_waiting_tenant_before_backlog():
+    runner, gate = _blocked_runner()
+    order = []
+    try:
+        futures = [runner.submit(order.append, f"noisy-{i}", tenant_id="noisy", priority="batch") for i in range(3)]
+        futures.append(runner.submit(order.append, "quiet-0", tenant_id="quiet", priority="batch"))
+        assert runner.queued() == 4
+        gate.set()
+        wait(futures)
+        assert order == ["noisy-0", "quiet-0", "noisy-1", "noisy-2"]
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_interactive_tasks_jump_batch_backlog():
+    runner, gate = _blocked_runner()
+    order = []
+    try:
+        futures = [runner.submit(order.append, f"batch-{i}", tenant_id="noisy", priority="batch") for i in range(2)]
+        futures.append(runner.submit(order.append, "interactive", tenant_id="noisy"))
+        gate.set()
+        wait(futures)
+        assert order == ["interactive", "batch-0", "batch-1"]
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_fifo_scheduler_keeps_submission_order():
+    runner, gate = _blocked_runner(scheduler="fifo")
+    order = []
+    try:
+        futures = [runner.submit(order.append, f"noisy-{i}", tenant_id="noisy") for i in range(2)]
+        futures.append(runner.submit(order.append, "quiet-0", tenant_id="quiet"))
+        gate.set()
+        wait(futures)
+        assert order == ["noisy-0", "noisy-1", "quiet-0"]
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_tenant_max_running_keeps_a_worker_for_others():
+    runner = TaskRunner(max_workers=2, queue_size=4, tenant_max_running=1)
+    gate = threading.Event()
+    try:
+        runner.submit(gate.wait, tenant_id="noisy")
+        held = runner.submit(gate.wait, tenant_id="noisy")
+        assert runner.queued() == 1
+        assert runner.run(mul, 2, 3, tenant_id="quiet", timeout=1) == 6
+        assert not held.running()
+    finally:
+        gate.set()
+        runner.shutdown()
+
+
+def test_queue_wait_is_recorded_per_tenant():
+    runner = TaskRunner(name="test-wait", max_workers=1)
+    try:
+        runner.run(mul, 1, 1, tenant_id="t1", priority="batch")
+        assert sum(metrics["queue_wait_ms_bucket"][("test-wait", "t1", "batch")]) == 1
+    finally:
+        runner.shutdown()
+
+
+def test_shutdown_cancels_queued_tasks():
+    runner, gate = _blocked_runner()
+    queued = runner.submit(mul, 1, 2, tenant_id="quiet")
+    runner.shutdown(wait=False)
+    gate.set()
+    assert queued.cancelled()
+    assert runner.in_flight("quiet") == 0
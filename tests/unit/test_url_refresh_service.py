@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.db.models import ContentBlob, Source
+from backend.repositories.background_job_repository import BackgroundJobRepository
+from backend.services import http_fetch
+from backend.services.errors import ServiceError
+from backend.services.job_service import schedule_url_source_refreshes
+from backend.services.metrics_service import metrics
+from backend.services.security import ResolvedUrl
+from backend.services.source_service import fetch_url_source, get_source, save_downloaded_source, upload_source
+from backend.services.url_refresh_service import apply_refresh, get_refresh_target, refetch, run_url_source_refresh
+
+
+class _Origin(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b"edition one"
+    etag = '"v1"'
+    requests: list = []
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        _Origin.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/feed" and self.headers.get("If-None-Match") == _Origin.etag:
+            self.send_response(304)
+            self.send_header("ETag", _Origin.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.path == "/feed":
+            self.send_header("ETag", _Origin.etag)
+            self.send_header("Last-Modified", "Wed, 01 Apr 2026 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(_Origin.body)))
+        self.end_headers()
+        self.wfile.write(_Origin.body)
+
+
+@pytest.fixture()
+def origin(monkeypatch):
+    _Origin.body, _Origin.etag, _Origin.requests = b"edition one", '"v1"', []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Origin)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    async def _pinned(url):
+        parsed = urlsplit(url)
+        return ResolvedUrl(url=url, scheme="http", host=parsed.hostname, port=parsed.port, addresses=("127.0.0.1",))
+
+    monkeypatch.setattr("backend.services.http_fetch.resolve_public_http_url", _pinned)
+    try:
+        yield f"http://news.example.test:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    bootstrap_schema(engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _run(coro):
+    async def _wrapped():
+        try:
+            return await coro
+        finally:
+            await http_fetch.close_http_pool()
+
+    return asyncio.run(_wrapped())
+
+
+def _download(db_session, url: str) -> int:
+    return save_downloaded_source(db_session, download=_run(fetch_url_source(url)))["file_id"]
+
+
+def _refresh(db_session, file_id: int) -> dict:
+    target = get_refresh_target(db_session, file_id=file_id)
+    return apply_refresh(db_session, target=target, fetched=_run(refetch(target)))
+
+
+def test_refresh_sends_validators_and_skips_write_on_304(db_session, origin):
+    file_id = _download(db_session, f"{origin}/feed")
+    target = get_refresh_target(db_session, file_id=file_id)
+    assert (target.etag, target.last_modified) == ('"v1"', "Wed, 01 Apr 2026 00:00:00 GMT")
+
+    not_modified = metrics["url_refresh_total"]["not_modified"]
+    result = _refresh(db_session, file_id)
+
+    assert result["status"] == "not_modified"
+    assert result["content_sha256"] == target.content_sha256
+    assert _Origin.requests[-1] == ("/feed", '"v1"')
+    assert metrics["url_refresh_total"]["not_modified"] == not_modified + 1
+
+
+def test_refresh_replaces_changed_content_and_releases_old_blob(db_session, origin):
+    file_id = _download(db_session, f"{origin}/feed")
+    _Origin.body, _Origin.etag = b"edition two", '"v2"'
+
+    result = _refresh(db_session, file_id)
+
+    assert result["status"] == "changed"
+    assert get_source(db_session, file_id=file_id)["content"] == "edition two"
+    assert get_refresh_target(db_session, file_id=file_id).etag == '"v2"'
+    assert db_session.execute(select(func.count()).select_from(ContentBlob)).scalar_one() == 1
+
+
+def test_refresh_without_validators_compares_content_hash(db_session, origin):
+    file_id = _download(db_session, f"{origin}/plain")
+    assert get_refresh_target(db_session, file_id=file_id).etag is None
+
+    assert _refresh(db_session, file_id)["status"] == "unchanged"
+    _Origin.body = b"edition three"
+    assert _refresh(db_session, file_id)["status"] == "changed"
+
+
+def test_refresh_rejects_uploaded_sources(db_session):
+    uploaded = upload_source(db_session, file_name="a.txt", file_type="txt", content="local")
+    with pytest.raises(ServiceError) as err:
+        get_refresh_target(db_session, file_id=uploaded["file_id"])
+    assert err.value.code == "source_not_refreshable"
+
+
+def test_bulk_refresh_counts_outcomes(db_session, origin, monkeypatch):
+    monkeypatch.setattr("backend.services.url_refresh_service.settings.batch_chunk_size", 2)
+    feed = _download(db_session, f"{origin}/feed")
+    _download(db_session, f"{origin}/plain")
+    _download(db_session, f"{origin}/other")
+    _Origin.body = b"edition four"
+
+    summary = run_url_source_refresh(db_session)
+
+    assert summary == {"checked": 3, "not_modified": 1, "unchanged": 0, "changed": 2, "failed": 0}
+    assert get_source(db_session, file_id=feed)["content"] == "edition one"
+
+
+def test_scheduler_enqueues_one_job_per_due_tenant(db_session, origin, monkeypatch):
+    monkeypatch.setattr("backend.services.job_service.settings.url_refresh_interval_s", 3600)
+    save_downloaded_source(db_session, download=_run(fetch_url_source(f"{origin}/feed")), tenant_id="tenant-a")
+    assert schedule_url_source_refreshes(db_session) == []
+
+    db_session.execute(update(Source).values(fetched_at=datetime.now(UTC) - timedelta(hours=2)))
+    db_session.commit()
+    first = schedule_url_source_refreshes(db_session)
+    assert len(first) == 1
+    assert schedule_url_source_refreshes(db_session) == []
+    assert BackgroundJobRepository(db_session).has_pending_job(tenant_id="tenant-a", job_type="url_source_refresh")
@@ -0,0 +1,211 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.migrations import bootstrap_schema
+from backend.db.models import BackgroundJob, Source
+from backend.repositories.background_job_repository import BackgroundJobRepository
+from backend.services.errors import ServiceError
+from backend.services import product_service
+from backend.services.job_service import enqueue_project_batch_extract, enqueue_url_batch_ingest, execute_job, get_job
+from backend.services.product_service import add_document_to_project, create_project, get_batch_run, list_batch_items
+from backend.services.source_service import DownloadedSource, upload_source
+from backend.worker import run_worker
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'worker.db'}", future=True)
+    bootstrap_schema(engine)
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    engine.dispose()
+
+
+def test_worker_runs_enqueued_batch(session_factory):
+    with session_factory() as session:
+        project = create_project(session, name="P")
+        source = upload_source(session, file_name="a.txt", file_type="txt", content="x" * 800)
+        add_document_to_project(session, project_id=project["project_id"], source_id=source["file_id"], title="Doc")
+        queued = enqueue_project_batch_extract(session, project_id=project["project_id"], mode="summary")
+        assert queued["status"] == "queued"
+
+    assert run_worker(session_factory=session_factory, worker_id="w1", once=True) == 1
+
+    with session_factory() as session:
+        job = get_job(session, job_id=queued["job_id"])
+        items = list_batch_items(session, project_id=project["project_id"], batch_id=queued["batch_id"])
+    assert job["status"] == "completed"
+    assert job["attempts"] == 1
+    assert "items" not in job["result"]["data"] and job["result"]["data"]["count"] == 1
+    assert items["items"][0]["chars"] == 400
+
+
+def test_worker_records_service_errors(session_factory):
+    with session_factory() as session:
+        job = BackgroundJobRepository(session).create_job(
+            tenant_id="default",
+            job_type="project_batch_extract",
+            payload={"project_id": 999, "mode": "text"},
+        )
+
+    run_worker(session_factory=session_factory, worker_id="w1", once=True)
+
+    with session_factory() as session:
+        result = get_job(session, job_id=job.id)
+    assert result["status"] == "failed"
+    assert result["result"]["error"]["code"] == "project_not_found"
+
+
+def test_claim_is_exclusive_until_lease_expires(session_factory):
+    with session_factory() as session:
+        repo = BackgroundJobRepository(session)
+        job = repo.create_job(tenant_id="default", job_type="noop", payload={})
+        claimed = repo.claim_next_job(worker_id="w1", lease_seconds=60)
+        assert claimed is not None and claimed.id == job.id
+        assert repo.claim_next_job(worker_id="w2", lease_seconds=60) is None
+
+        session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .values(lease_expires_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+        session.commit()
+
+        reclaimed = repo.claim_next_job(worker_id="w2", lease_seconds=60)
+        assert reclaimed is not None and reclaimed.attempts == 2
+        assert repo.finish_job(job_id=job.id, worker_id="w1", status="completed", result={}) is False
+        assert repo.finish_job(job_id=job.id, worker_id="w2", status="completed", result={}) is True
+
+
+def test_claim_prefers_higher_priority_then_least_busy_tenant(session_factory):
+    with session_factory() as session:
+        repo = BackgroundJobRepository(session)
+        refresh = repo.create_job(tenant_id="quiet", job_type="noop", payload={}, priority=2)
+        noisy = [repo.create_job(tenant_id="noisy", job_type="noop", payload={}) for _ in range(3)]
+        quiet = repo.create_job(tenant_id="quiet", job_type="noop", payload={})
+
+        claimed = [repo.claim_next_job(worker_id=f"w{i}", lease_seconds=60).id for i in range(4)]
+        assert claimed == [noisy[0].id, quiet.id, noisy[1].id, noisy[2].id]
+        assert repo.claim_next_job(worker_id="w4", lease_seconds=60).id == refresh.id
+
+
+def test_claim_weights_tenants(session_factory):
+    with session_factory() as session:
+        repo = BackgroundJobRepository(session)
+        gold = [repo.create_job(tenant_id="gold", job_type="noop", payload={}) for _ in range(4)]
+        basic = [repo.create_job(tenant_id="basic", job_type="noop", payload={}) for _ in range(2)]
+
+        claimed = [repo.claim_next_job(worker_id=f"w{i}", lease_seconds=60, tenant_weights={"gold": 2}).id for i in range(6)]
+        assert claimed == [gold[0].id, basic[0].id, gold[1].id, gold[2].id, basic[1].id, gold[3].id]
+
+
+def test_claim_respects_tenant_running_cap(session_factory):
+    with session_factory() as session:
+        repo = BackgroundJobRepository(session)
+        first, _ = [repo.create_job(tenant_id="noisy", job_type="noop", payload={}) for _ in range(2)]
+        assert repo.claim_next_job(worker_id="w1", lease_seconds=60, tenant_max_running=1).id == first.id
+        assert repo.claim_next_job(worker_id="w2", lease_seconds=60, tenant_max_running=1) is None
+        assert repo.finish_job(job_id=first.id, worker_id="w1", status="completed", result={})
+        assert repo.claim_next_job(worker_id="w2", lease_seconds=60, tenant_max_running=1) is not None
+
+
+def test_get_job_is_tenant_scoped(session_factory):
+    with session_factory() as session:
+        job = BackgroundJobRepository(session).create_job(tenant_id="tenant-a", job_type="noop", payload={})
+        with pytest.raises(ServiceError) as err:
+            get_job(session, job_id=job.id, tenant_id="tenant-b")
+    assert err.value.code == "job_not_found"
+
+
+class _WorkerDied(BaseException):
+    pass
+
+
+def test_reclaimed_batch_job_resumes_from_checkpoint(session_factory, monkeypatch):
+    monkeypatch.setattr("backend.services.product_service.settings.batch_chunk_size", 2)
+    with session_factory() as session:
+        project = create_project(session, name="P")
+        for idx in range(5):
+            source = upload_source(session, file_name=f"{idx}.txt", file_type="txt", content="x" * (idx + 1))
+            add_document_to_project(session, project_id=project["project_id"], source_id=source["file_id"], title=f"Doc {idx}")
+        queued = enqueue_project_batch_extract(session, project_id=project["project_id"], mode="text")
+
+    original = product_service._measure_extractions
+    chunks: list[list[int]] = []
+
+    def _measure(rows, *args):
+        chunks.append([row[0] for row in rows])
+        if len(chunks) == 2:
+            raise _WorkerDied()
+        return original(rows, *args)
+
+    monkeypatch.setattr(product_service, "_measure_extractions", _measure)
+    with session_factory() as session:
+        job = BackgroundJobRepository(session).claim_next_job(worker_id="w1", lease_seconds=60)
+        with pytest.raises(_WorkerDied):
+            execute_job(session, job)
+    with session_factory() as session:
+        batch = get_batch_run(session, project_id=project["project_id"], batch_id=queued["batch_id"])
+        assert (batch["status"], batch["processed"]) == ("running", 2)
+        session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == queued["job_id"])
+            .values(lease_expires_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+        session.commit()
+
+    assert run_worker(session_factory=session_factory, worker_id="w2", once=True) == 1
+
+    with session_factory() as session:
+        job = get_job(session, job_id=queued["job_id"])
+        first = list_batch_items(session, project_id=project["project_id"], batch_id=queued["batch_id"], limit=3)
+        rest = list_batch_items(
+            session, project_id=project["project_id"], batch_id=queued["batch_id"], cursor=first["next_cursor"]
+        )
+    assert (job["status"], job["attempts"]) == ("completed", 2)
+    assert job["result"]["data"]["count"] == 5
+    assert [item["chars"] for item in first["items"] + rest["items"]] == [1, 2, 3, 4, 5]
+    assert rest["next_cursor"] is None
+    assert chunks == [[1, 2], [3, 4], [3, 4], [5]]
+
+
+def test_reclaimed_url_ingest_job_skips_committed_chunks(session_factory, monkeypatch):
+    monkeypatch.setattr("backend.services.source_service.settings.batch_chunk_size", 2)
+    urls = [f"https://docs.example/{n}" for n in range(5)]
+    fetched: list[str] = []
+    die_at = [3]
+
+    async def _fake_fetch(url):
+        fetched.append(url)
+        if len(fetched) == die_at[0]:
+            raise _WorkerDied()
+        return DownloadedSource(url=url, content=f"body of {url}", truncated=False)
+
+    monkeypatch.setattr("backend.services.source_service.fetch_url_source", _fake_fetch)
+    with session_factory() as session:
+        queued = enqueue_url_batch_ingest(session, urls=urls)
+    with session_factory() as session:
+        job = BackgroundJobRepository(session).claim_next_job(worker_id="w1", lease_seconds=60)
+        with pytest.raises(_WorkerDied):
+            execute_job(session, job)
+    with session_factory() as session:
+        session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == queued["job_id"])
+            .values(lease_expires_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+        session.commit()
+
+    die_at[0] = 0
+    assert run_worker(session_factory=session_factory, worker_id="w2", once=True) == 1
+
+    with session_factory() as session:
+        job = get_job(session, job_id=queued["job_id"])
+        assert session.execute(select(func.count()).select_from(Source)).scalar_one() == 5
+        assert not BackgroundJobRepository(session).checkpoint_job(job_id=queued["job_id"], worker_id="w1", checkpoint={})
+    assert (job["status"], job["attempts"]) == ("completed", 2)
+    assert [item["url"] for item in job["result"]["data"]["items"]] == urls
+    assert job["result"]["data"]["stored"] == 5
+    assert fetched == urls[:4] + urls[2:]